@@ -0,0 +1,25 @@
+from pathlib import Path
+from typing import Union
+
+
+def celery_broker_config(*, broker_path: Union[Path, str]) -> dict:
+    """
+    Obtain Celery configuration for a filesystem broker and results at broker_path.
+
+    server_celery and server_flask must use the same broker, so both obtain it here.
+    Folders of the broker and results must exist, so they are created.
+    """
+
+    broker_path = Path(broker_path)
+    for folder_current in ["data", "processed", "results"]:
+        Path(broker_path, folder_current).mkdir(parents=True, exist_ok=True)
+
+    return {
+        "broker_url": "filesystem://localhost//",
+        "broker_transport_options": {
+            "data_folder_in": str(Path(broker_path, "data")),
+            "data_folder_out": str(Path(broker_path, "data")),
+            "data_folder_processed": str(Path(broker_path, "processed")),
+        },
+        "result_backend": "file://{}".format(Path(broker_path, "results")),
+    }
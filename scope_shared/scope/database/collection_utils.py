@@ -2,8 +2,11 @@ import base64
 import copy
 from dataclasses import dataclass
 import hashlib
+import pymongo
 import pymongo.collection
-from typing import List, Optional
+import pymongo.errors
+import pymongo.results
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import uuid
 
 import scope.database.document_utils as document_utils
@@ -15,6 +18,46 @@ PRIMARY_COLLECTION_INDEX = [
 ]
 PRIMARY_COLLECTION_INDEX_NAME = "_primary"
 
+CURRENT_COLLECTION_INDEX = [
+    ("_type", pymongo.ASCENDING),
+    ("_current", pymongo.ASCENDING),
+]
+CURRENT_COLLECTION_INDEX_NAME = "_current"
+
+# Maximum number of documents updated by each command of ensure_current_revisions
+CURRENT_REVISIONS_BATCH_SIZE = 1000
+
+# Indices expected on every collection, with whether each is unique
+COLLECTION_INDICES = {
+    PRIMARY_COLLECTION_INDEX_NAME: (PRIMARY_COLLECTION_INDEX, True),
+    CURRENT_COLLECTION_INDEX_NAME: (CURRENT_COLLECTION_INDEX, False),
+}
+
+COGNITO_ID_COLLECTION_INDEX = [
+    ("cognitoAccount.cognitoId", pymongo.ASCENDING),
+    ("_current", pymongo.ASCENDING),
+]
+COGNITO_ID_COLLECTION_INDEX_NAME = "_cognito_id"
+
+# Indices expected on identity collections, which are also queried by Cognito id
+IDENTITY_COLLECTION_INDICES = {
+    **COLLECTION_INDICES,
+    COGNITO_ID_COLLECTION_INDEX_NAME: (COGNITO_ID_COLLECTION_INDEX, False),
+}
+
+DUE_DATETIME_COLLECTION_INDEX = [
+    ("_type", pymongo.ASCENDING),
+    ("_current", pymongo.ASCENDING),
+    ("dueDateTime", pymongo.ASCENDING),
+]
+DUE_DATETIME_COLLECTION_INDEX_NAME = "_due_datetime"
+
+# Indices expected on patient collections, whose scheduled items are also queried by due datetime
+PATIENT_COLLECTION_INDICES = {
+    **COLLECTION_INDICES,
+    DUE_DATETIME_COLLECTION_INDEX_NAME: (DUE_DATETIME_COLLECTION_INDEX, False),
+}
+
 
 @dataclass(frozen=True)
 class PutResult:
@@ -39,6 +82,12 @@ class SetPutResult:
     document: dict
 
 
+@dataclass(frozen=True)
+class SetPageResult:
+    documents: List[dict]
+    next_set_id: Optional[str]
+
+
 def generate_set_id() -> str:
     """
     Generates an id that:
@@ -83,85 +132,222 @@ def delete_set_element(
     return result.deleted_count > 0
 
 
+def ensure_current_revisions(
+    *,
+    collection: pymongo.collection.Collection,
+    batch_size: int = CURRENT_REVISIONS_BATCH_SIZE,
+) -> None:
+    """
+    Ensure "_current" marks exactly the latest revision of each singleton and set element.
+
+    Writes through this module maintain "_current" as they go.
+    This is needed only for documents written by other means,
+    such as collections created before "_current" was maintained or restored from an archive.
+    Updates are issued in batches of at most batch_size documents,
+    so no command grows with the size of the collection.
+    This function should be idempotent.
+    """
+
+    def _update_batches(
+        *,
+        pipeline: List[dict],
+        update_ids: Callable[[dict], List],
+        update: dict,
+    ) -> None:
+        # Obtain the "_id" of documents to update from each pipeline result
+        with collection.aggregate(pipeline) as pipeline_result:
+            batch = []
+            for result_current in pipeline_result:
+                batch.extend(update_ids(result_current))
+                if len(batch) >= batch_size:
+                    collection.update_many(
+                        filter={"_id": {"$in": batch}},
+                        update=update,
+                    )
+                    batch = []
+            if batch:
+                collection.update_many(
+                    filter={"_id": {"$in": batch}},
+                    update=update,
+                )
+
+    # Mark the latest revision of every document, as done by a write
+    _update_batches(
+        pipeline=[
+            {"$sort": {"_rev": pymongo.DESCENDING}},
+            {
+                "$group": {
+                    "_id": {
+                        "_type": "$_type",
+                        "_set_id": "$_set_id",
+                    },
+                    "current_id": {"$first": "$_id"},
+                    "current_marked": {"$first": {"$ifNull": ["$_current", False]}},
+                }
+            },
+            {"$match": {"current_marked": {"$ne": True}}},
+        ],
+        update_ids=lambda result: [result["current_id"]],
+        update={"$set": {"_current": True}},
+    )
+
+    # Every latest revision is now marked,
+    # so any other marked revision of the same document has been replaced
+    _update_batches(
+        pipeline=[
+            {"$match": {"_current": True}},
+            {"$sort": {"_rev": pymongo.DESCENDING}},
+            {
+                "$group": {
+                    "_id": {
+                        "_type": "$_type",
+                        "_set_id": "$_set_id",
+                    },
+                    "marked_ids": {"$push": "$_id"},
+                }
+            },
+            {"$match": {"marked_ids.1": {"$exists": True}}},
+        ],
+        update_ids=lambda result: result["marked_ids"][1:],
+        update={"$unset": {"_current": ""}},
+    )
+
+
 def ensure_index(
     *,
     collection: pymongo.collection.Collection,
+    indices: Optional[Dict[str, Tuple[List[Tuple[str, int]], bool]]] = None,
 ):
     """
-    Ensure the expected index is present on this collection.
+    Ensure the expected indices are present on this collection.
+
+    indices maps each index name to its keys and whether it is unique,
+    defaulting to COLLECTION_INDICES.
     """
 
+    if indices is None:
+        indices = COLLECTION_INDICES
+
     # Examine existing indices
     index_information = collection.index_information()
 
     # Remove any indices that are not expected
-    indices_unexpected = set(index_information.keys()) - {
-        "_id_",
-        PRIMARY_COLLECTION_INDEX_NAME,
-    }
+    indices_unexpected = set(index_information.keys()) - (
+        {"_id_"} | set(indices.keys())
+    )
     for index_unexpected in indices_unexpected:
         del index_information[index_unexpected]
         collection.drop_index(index_unexpected)
 
-    # Determine if an existing index needs replaced
-    if PRIMARY_COLLECTION_INDEX_NAME in index_information:
-        existing_index = index_information[PRIMARY_COLLECTION_INDEX_NAME]
-
-        replace_index = False
-        if not replace_index:
-            replace_index = existing_index.keys() != {"key", "ns", "unique", "valid"}
-        if not replace_index:
-            replace_index = existing_index["key"] != PRIMARY_COLLECTION_INDEX
-        if not replace_index:
-            replace_index = existing_index["unique"] is not True
-
-        if replace_index:
-            del index_information[PRIMARY_COLLECTION_INDEX_NAME]
-            collection.drop_index(PRIMARY_COLLECTION_INDEX_NAME)
-
-    # Create the index
-    if PRIMARY_COLLECTION_INDEX_NAME not in index_information:
-        collection.create_index(
-            PRIMARY_COLLECTION_INDEX,
-            unique=True,
-            name=PRIMARY_COLLECTION_INDEX_NAME,
-        )
+    for (index_name, (index_keys, index_unique)) in indices.items():
+        # Determine if an existing index needs replaced
+        if index_name in index_information:
+            existing_index = index_information[index_name]
+
+            expected_properties = {"key", "ns", "valid"}
+            if index_unique:
+                expected_properties.add("unique")
+
+            replace_index = False
+            if not replace_index:
+                replace_index = existing_index.keys() != expected_properties
+            if not replace_index:
+                replace_index = existing_index["key"] != index_keys
+            if not replace_index:
+                replace_index = existing_index.get("unique", False) is not index_unique
+
+            if replace_index:
+                del index_information[index_name]
+                collection.drop_index(index_name)
+
+        # Create the index
+        if index_name not in index_information:
+            collection.create_index(
+                index_keys,
+                unique=index_unique,
+                name=index_name,
+            )
+
+
+def _current_documents(
+    *,
+    documents: List[dict],
+) -> List[dict]:
+    """
+    Reduce a list of documents marked "_current" to the latest revision of each.
+
+    A write marks its new revision before it unmarks the revision it replaces,
+    so a concurrent read may briefly observe both.
+    """
+
+    current_documents = {}
+    for document_current in documents:
+        key_current = (document_current["_type"], document_current.get("_set_id"))
+        if (key_current not in current_documents) or (
+            document_current["_rev"] > current_documents[key_current]["_rev"]
+        ):
+            current_documents[key_current] = document_current
+
+    return list(current_documents.values())
 
 
 def get_set(
     *,
     collection: pymongo.collection.Collection,
     document_type: str,
+    element_query: Optional[dict] = None,
 ) -> Optional[List[dict]]:
     """
     Retrieve all elements of set with "_type" of document_type.
 
+    If provided, element_query filters the current revision of each element within the database,
+    such as to exclude elements marked "_deleted".
     If none exist, return None.
+    If elements exist but none match element_query, return an empty list.
     """
 
-    # Parameters in query pipeline
-    query_document_type = document_type
-
-    # Query pipeline
-    pipeline = [
-        {"$match": {"_type": query_document_type}},
-        {"$sort": {"_rev": pymongo.DESCENDING}},
-        {
-            "$group": {
-                "_id": "$_set_id",
-                "result": {"$first": "$$ROOT"},
-            }
-        },
-        {"$replaceRoot": {"newRoot": "$result"}},
-    ]
+    # Query only the current revision of each element
+    query = {
+        "_type": document_type,
+        "_current": True,
+    }
 
-    # Execute pipeline, obtain list of results
-    with collection.aggregate(pipeline) as pipeline_result:
-        # Confirm a result was found
-        if not pipeline_result.alive:
-            return None
+    if element_query:
+        # A concurrent write may briefly leave a replaced revision marked "_current",
+        # so reduce to the latest revision of each element before applying element_query.
+        # Otherwise a replaced revision could match while its replacement does not.
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"_rev": pymongo.DESCENDING}},
+            {
+                "$group": {
+                    "_id": "$_set_id",
+                    "result": {"$first": "$$ROOT"},
+                }
+            },
+            {"$replaceRoot": {"newRoot": "$result"}},
+            {"$match": element_query},
+            {"$project": {"_current": False}},
+        ]
+        with collection.aggregate(pipeline) as pipeline_result:
+            documents = list(pipeline_result)
+
+        # Distinguish a set whose elements were all filtered from a set that does not exist
+        if not documents:
+            if collection.find_one(filter=query, projection={"_id": True}):
+                return []
+    else:
+        documents = list(
+            collection.find(
+                filter=query,
+                projection={"_current": False},
+            )
+        )
+        documents = _current_documents(documents=documents)
 
-        documents = list(pipeline_result)
+    # Confirm a result was found
+    if not documents:
+        return None
 
     # Normalize the list of documents
     documents = document_utils.normalize_documents(documents=documents)
@@ -169,50 +355,134 @@ def get_set(
     return documents
 
 
-def get_set_element(
+def get_set_element_by_field(
     *,
     collection: pymongo.collection.Collection,
     document_type: str,
-    set_id: str,
+    field: str,
+    value,
 ) -> Optional[dict]:
     """
-    Retrieve all elements of set with "_type" document_type.
+    Retrieve current document for a set element with "_type" document_type and field equal to value.
 
-    If none exist, return None.
+    Field may be a dotted path, and is expected to be indexed together with "_current".
+    If none exists, return None.
+    If multiple exist, return the element with the lowest "_set_id".
     """
 
-    # Parameters in query pipeline
-    query_document_type = document_type
-    query_set_id = set_id
+    # Query only the current revision of elements
+    query = {
+        field: value,
+        "_type": document_type,
+        "_current": True,
+    }
 
-    # Query pipeline
-    pipeline = [
-        {
-            "$match": {
-                "_type": query_document_type,
-                "_set_id": query_set_id,
-            }
-        },
-        {"$sort": {"_rev": pymongo.DESCENDING}},
-        {
-            "$group": {
-                "_id": None,
-                "result": {"$first": "$$ROOT"},
-            }
-        },
-        {"$replaceRoot": {"newRoot": "$result"}},
+    documents = list(
+        collection.find(
+            filter=query,
+            projection={"_current": False},
+            sort=[("_set_id", pymongo.ASCENDING), ("_rev", pymongo.DESCENDING)],
+            limit=1,
+        )
+    )
+
+    # Confirm a result was found
+    if not documents:
+        return None
+
+    # Normalize the document
+    document = document_utils.normalize_document(document=documents[0])
+
+    return document
+
+
+def get_set_page(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    limit: int,
+    after_set_id: Optional[str],
+) -> SetPageResult:
+    """
+    Retrieve a page of elements of set with "_type" of document_type, ordered by "_set_id".
+
+    Page includes up to limit elements with "_set_id" after after_set_id.
+    If after_set_id is None, page starts from the first element.
+    """
+
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    # Query only the current revision of each element
+    query = {
+        "_type": document_type,
+        "_current": True,
+    }
+    if after_set_id is not None:
+        query["_set_id"] = {"$gt": after_set_id}
+
+    documents = list(
+        collection.find(
+            filter=query,
+            projection={"_current": False},
+            sort=[("_set_id", pymongo.ASCENDING), ("_rev", pymongo.DESCENDING)],
+            limit=limit,
+        )
+    )
+
+    # A full page indicates more elements may follow
+    next_set_id = None
+    if len(documents) == limit:
+        next_set_id = documents[-1]["_set_id"]
+
+    documents = _current_documents(documents=documents)
+
+    # Normalize each document, retaining the order of the page
+    documents = [
+        document_utils.normalize_document(document=document_current)
+        for document_current in documents
     ]
 
-    # Execute pipeline, obtain single result
-    with collection.aggregate(pipeline) as pipeline_result:
-        # Confirm a result was found
-        if not pipeline_result.alive:
-            return None
+    return SetPageResult(
+        documents=documents,
+        next_set_id=next_set_id,
+    )
+
+
+def get_set_element(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    set_id: str,
+) -> Optional[dict]:
+    """
+    Retrieve current document for set element with "_type" document_type and "_set_id" set_id.
+
+    If none exists, return None.
+    """
+
+    # Query only the current revision of the element
+    query = {
+        "_type": document_type,
+        "_set_id": set_id,
+        "_current": True,
+    }
+
+    documents = list(
+        collection.find(
+            filter=query,
+            projection={"_current": False},
+            sort=[("_rev", pymongo.DESCENDING)],
+            limit=1,
+        )
+    )
 
-        document = pipeline_result.next()
+    # Confirm a result was found
+    if not documents:
+        return None
 
     # Normalize the document
-    document = document_utils.normalize_document(document=document)
+    document = document_utils.normalize_document(document=documents[0])
 
     return document
 
@@ -228,52 +498,197 @@ def get_singleton(
     If none exists, return None.
     """
 
-    # Parameters in query pipeline
-    query_document_type = document_type
-
-    # Query pipeline
-    pipeline = [
-        {"$match": {"_type": query_document_type}},
-        {"$sort": {"_rev": pymongo.DESCENDING}},
-        {
-            "$group": {
-                "_id": None,
-                "result": {"$first": "$$ROOT"},
-            }
-        },
-        {"$replaceRoot": {"newRoot": "$result"}},
-    ]
+    # Query only the current revision of the singleton
+    query = {
+        "_type": document_type,
+        "_current": True,
+    }
 
-    # Execute pipeline, obtain single result
-    with collection.aggregate(pipeline) as pipeline_result:
-        # Confirm a result was found
-        if not pipeline_result.alive:
-            return None
+    documents = list(
+        collection.find(
+            filter=query,
+            projection={"_current": False},
+            sort=[("_rev", pymongo.DESCENDING)],
+            limit=1,
+        )
+    )
 
-        document = pipeline_result.next()
+    # Confirm a result was found
+    if not documents:
+        return None
 
     # Normalize the document
-    document = document_utils.normalize_document(document=document)
+    document = document_utils.normalize_document(document=documents[0])
 
     return document
 
 
-def post_set_element(
+def get_types(
     *,
     collection: pymongo.collection.Collection,
+    singleton_types: List[str],
+    set_types: List[str],
+) -> Dict[str, Union[Optional[dict], Optional[List[dict]]]]:
+    """
+    Retrieve current documents for multiple singleton and set types in a single query.
+
+    Returns a dict keyed by document type.
+    Each singleton type maps to the same result as get_singleton.
+    Each set type maps to the same result as get_set.
+    """
+
+    if set(singleton_types) & set(set_types):
+        raise ValueError("A document type cannot be both a singleton and a set")
+
+    document_types = list(singleton_types) + list(set_types)
+    if not document_types:
+        return {}
+
+    # Match every requested type using the index on "_current",
+    # then group the documents by type
+    documents = collection.find(
+        filter={
+            "_type": {"$in": document_types},
+            "_current": True,
+        },
+        projection={"_current": False},
+    )
+    documents_by_type: Dict[str, List[dict]] = {
+        document_type_current: [] for document_type_current in document_types
+    }
+    for document_current in documents:
+        documents_by_type[document_current["_type"]].append(document_current)
+
+    results = {}
+    for document_type_current in document_types:
+        documents = _current_documents(
+            documents=documents_by_type[document_type_current]
+        )
+
+        if not documents:
+            results[document_type_current] = None
+        elif document_type_current in singleton_types:
+            results[document_type_current] = document_utils.normalize_document(
+                document=documents[0]
+            )
+        else:
+            results[document_type_current] = document_utils.normalize_documents(
+                documents=documents
+            )
+
+    return results
+
+
+def _replaced_revisions_query(
+    *,
+    document: dict,
+) -> dict:
+    """
+    Query for revisions marked "_current" that are replaced by document.
+    """
+
+    query_replaced = {
+        "_type": document["_type"],
+        "_rev": {"$lt": document["_rev"]},
+        "_current": True,
+    }
+    if "_set_id" in document:
+        query_replaced["_set_id"] = document["_set_id"]
+
+    return query_replaced
+
+
+def _insert_current_revision(
+    *,
+    collection: pymongo.collection.Collection,
+    document: dict,
+) -> pymongo.results.InsertOneResult:
+    """
+    Insert a document as the current revision of its singleton or set element.
+    - Like insert_one, will modify the document to insert an "_id".
+    - Document is stored marked "_current", then revisions it replaces are unmarked.
+    """
+
+    result = collection.insert_one(document=dict(document, _current=True))
+    document["_id"] = result.inserted_id
+
+    # Unmark the revisions this document replaces
+    collection.update_many(
+        filter=_replaced_revisions_query(document=document),
+        update={"$unset": {"_current": ""}},
+    )
+
+    return result
+
+
+def _unmark_replaced_revisions(
+    *,
+    collection: pymongo.collection.Collection,
+    documents: List[dict],
+) -> None:
+    """
+    Unmark the revisions replaced by documents, using a single bulk write.
+    """
+
+    # A first revision cannot replace anything
+    requests = [
+        pymongo.UpdateMany(
+            filter=_replaced_revisions_query(document=document_current),
+            update={"$unset": {"_current": ""}},
+        )
+        for document_current in documents
+        if document_current["_rev"] > 1
+    ]
+    if requests:
+        collection.bulk_write(requests=requests, ordered=False)
+
+
+def _insert_current_revisions(
+    *,
+    collection: pymongo.collection.Collection,
+    documents: List[dict],
+) -> None:
+    """
+    Insert documents as current revisions of their set elements, using a single insert_many.
+    - Like insert_many, will modify each document to insert an "_id".
+    - Documents are stored marked "_current", then revisions they replace are unmarked.
+    - Documents are inserted unordered, so a failed document does not prevent insert of others.
+      Revisions replaced by inserted documents are unmarked before the failure is raised.
+    """
+
+    documents_current = [
+        dict(document_current, _current=True) for document_current in documents
+    ]
+
+    # Insert will assign an "_id" to every document, including any that fail
+    try:
+        collection.insert_many(documents=documents_current, ordered=False)
+    except pymongo.errors.BulkWriteError as e:
+        failed_indices = {error["index"] for error in e.details["writeErrors"]}
+        _unmark_replaced_revisions(
+            collection=collection,
+            documents=[
+                document_current
+                for index_current, document_current in enumerate(documents_current)
+                if index_current not in failed_indices
+            ],
+        )
+        raise
+
+    for document_current, document_inserted in zip(documents, documents_current):
+        document_current["_id"] = document_inserted["_id"]
+
+    _unmark_replaced_revisions(collection=collection, documents=documents_current)
+
+
+def _prepare_post_set_element(
+    *,
     document_type: str,
     semantic_set_id: Optional[str],
     document: dict,
-) -> SetPostResult:
+) -> dict:
     """
-    Put a set element document.
-    - Document must not already include an "_id".
-    - An existing "_type" must match document_type.
-    - Document must not already include an "_set_id".
-    - Document must not already include an "_rev".
-    - semantic_set_id may indicate a field that will be treated like "_set_id".
-      - Document must not already include an "semantic_set_id".
-      - "semantic_set_id" will additionally be set to "_set_id".
+    Prepare a copy of a set element document for post, generating its "_set_id" and "_rev".
     """
 
     # Work with a copy
@@ -317,37 +732,18 @@ def post_set_element(
 
         document[semantic_set_id] = generated_set_id
 
-    # insert_one will modify the document to insert an "_id"
-    document = document_utils.normalize_document(document=document)
-    result = collection.insert_one(document=document)
-    document = document_utils.normalize_document(document=document)
-
-    return SetPostResult(
-        inserted_count=1,
-        inserted_id=str(result.inserted_id),
-        inserted_set_id=generated_set_id,
-        document=document,
-    )
+    return document_utils.normalize_document(document=document)
 
 
-def put_set_element(
+def _prepare_put_set_element(
     *,
-    collection: pymongo.collection.Collection,
     document_type: str,
     semantic_set_id: Optional[str],
     set_id: str,
     document: dict,
-) -> SetPutResult:
+) -> dict:
     """
-    Put a set element document.
-    - Document must not already include an "_id".
-    - An existing "_type" must match document_type.
-    - An existing "_set_id" must match set_id.
-    - An existing "_rev" will be incremented.
-    - semantic_set_id may indicate a field that will be treated like "_set_id".
-      - An existing "semantic_set_id" must match set_id.
-      - An existing "semantic_set_id" must match an existing "_set_id".
-      - "semantic_set_id" will additionally be set to "_set_id".
+    Prepare a copy of a set element document for put, incrementing its "_rev".
     """
 
     # Work with a copy
@@ -394,9 +790,117 @@ def put_set_element(
             # Set the "semantic_set_id"
             document[semantic_set_id] = set_id
 
-    # insert_one will modify the document to insert an "_id"
+    return document_utils.normalize_document(document=document)
+
+
+def post_set_element(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    semantic_set_id: Optional[str],
+    document: dict,
+) -> SetPostResult:
+    """
+    Put a set element document.
+    - Document must not already include an "_id".
+    - An existing "_type" must match document_type.
+    - Document must not already include an "_set_id".
+    - Document must not already include an "_rev".
+    - semantic_set_id may indicate a field that will be treated like "_set_id".
+      - Document must not already include an "semantic_set_id".
+      - "semantic_set_id" will additionally be set to "_set_id".
+    """
+
+    document = _prepare_post_set_element(
+        document_type=document_type,
+        semantic_set_id=semantic_set_id,
+        document=document,
+    )
+
+    # Insert will modify the document to insert an "_id"
+    result = _insert_current_revision(collection=collection, document=document)
     document = document_utils.normalize_document(document=document)
-    result = collection.insert_one(document=document)
+
+    return SetPostResult(
+        inserted_count=1,
+        inserted_id=str(result.inserted_id),
+        inserted_set_id=document["_set_id"],
+        document=document,
+    )
+
+
+def post_set_elements(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    semantic_set_id: Optional[str],
+    documents: List[dict],
+) -> List[SetPostResult]:
+    """
+    Post multiple set element documents in a single insert.
+    - Each document is subject to the same requirements as post_set_element.
+    - All documents are validated before any is inserted.
+    - Results are in the same order as documents.
+    """
+
+    documents = [
+        _prepare_post_set_element(
+            document_type=document_type,
+            semantic_set_id=semantic_set_id,
+            document=document_current,
+        )
+        for document_current in documents
+    ]
+    if not documents:
+        return []
+
+    # Insert will modify the documents to insert an "_id"
+    _insert_current_revisions(collection=collection, documents=documents)
+    documents = [
+        document_utils.normalize_document(document=document_current)
+        for document_current in documents
+    ]
+
+    return [
+        SetPostResult(
+            inserted_count=1,
+            inserted_id=document_current["_id"],
+            inserted_set_id=document_current["_set_id"],
+            document=document_current,
+        )
+        for document_current in documents
+    ]
+
+
+def put_set_element(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    semantic_set_id: Optional[str],
+    set_id: str,
+    document: dict,
+) -> SetPutResult:
+    """
+    Put a set element document.
+    - Document must not already include an "_id".
+    - An existing "_type" must match document_type.
+    - An existing "_set_id" must match set_id.
+    - An existing "_rev" will be incremented.
+    - semantic_set_id may indicate a field that will be treated like "_set_id".
+      - An existing "semantic_set_id" must match set_id.
+      - An existing "semantic_set_id" must match an existing "_set_id".
+      - "semantic_set_id" will additionally be set to "_set_id".
+    """
+
+    document = _prepare_put_set_element(
+        document_type=document_type,
+        semantic_set_id=semantic_set_id,
+        set_id=set_id,
+        document=document,
+    )
+
+    # Insert will modify the document to insert an "_id"
+    result = _insert_current_revision(collection=collection, document=document)
     document = document_utils.normalize_document(document=document)
 
     return SetPutResult(
@@ -407,6 +911,58 @@ def put_set_element(
     )
 
 
+def put_set_elements(
+    *,
+    collection: pymongo.collection.Collection,
+    document_type: str,
+    semantic_set_id: Optional[str],
+    documents: List[dict],
+) -> List[SetPutResult]:
+    """
+    Put multiple set element documents in a single insert.
+    - Each document must already include an "_set_id".
+    - Each document is otherwise subject to the same requirements as put_set_element.
+    - All documents are validated before any is inserted.
+    - A revision that conflicts with an existing revision fails without preventing insert of others,
+      then the failure is raised as a BulkWriteError.
+    - Results are in the same order as documents.
+    """
+
+    prepared_documents = []
+    for document_current in documents:
+        if "_set_id" not in document_current:
+            raise ValueError('Document must have existing "_set_id"')
+
+        prepared_documents.append(
+            _prepare_put_set_element(
+                document_type=document_type,
+                semantic_set_id=semantic_set_id,
+                set_id=document_current["_set_id"],
+                document=document_current,
+            )
+        )
+    documents = prepared_documents
+    if not documents:
+        return []
+
+    # Insert will modify the documents to insert an "_id"
+    _insert_current_revisions(collection=collection, documents=documents)
+    documents = [
+        document_utils.normalize_document(document=document_current)
+        for document_current in documents
+    ]
+
+    return [
+        SetPutResult(
+            inserted_count=1,
+            inserted_id=document_current["_id"],
+            inserted_set_id=document_current["_set_id"],
+            document=document_current,
+        )
+        for document_current in documents
+    ]
+
+
 def put_singleton(
     *,
     collection: pymongo.collection.Collection,
@@ -444,9 +1000,9 @@ def put_singleton(
     else:
         document["_rev"] = 1
 
-    # insert_one will modify the document to insert an "_id"
+    # Insert will modify the document to insert an "_id"
     document = document_utils.normalize_document(document=document)
-    result = collection.insert_one(document=document)
+    result = _insert_current_revision(collection=collection, document=document)
     document = document_utils.normalize_document(document=document)
 
     return PutResult(
@@ -0,0 +1,42 @@
+import threading
+from typing import Callable, List
+
+IdentityWriteCallback = Callable[[dict], None]
+
+_callbacks: List[IdentityWriteCallback] = []
+_callbacks_lock = threading.Lock()
+
+
+def register_identity_write_callback(callback: IdentityWriteCallback) -> None:
+    """
+    Register a callback to be notified after any write of a patient or provider identity.
+
+    Callbacks are notified only of writes within this process,
+    so a cache relying on them must also bound how long it retains a result.
+    """
+
+    with _callbacks_lock:
+        if callback not in _callbacks:
+            _callbacks.append(callback)
+
+
+def unregister_identity_write_callback(callback: IdentityWriteCallback) -> None:
+    with _callbacks_lock:
+        if callback in _callbacks:
+            _callbacks.remove(callback)
+
+
+def notify_identity_write(*, identity: dict) -> None:
+    """
+    Notify callbacks that an identity was written.
+
+    identity includes at least "_type" and "_set_id".
+    For a put, it is the document that was written.
+    For a delete, it may include only those fields.
+    """
+
+    with _callbacks_lock:
+        callbacks = list(_callbacks)
+
+    for callback_current in callbacks:
+        callback_current(identity)
@@ -62,6 +62,35 @@ def ensure_database_initialized(
 
     _initialize_patient_identity_collection(database=database)
     _initialize_provider_identity_collection(database=database)
+    _initialize_patient_collections(database=database)
+
+
+def _initialize_patient_collections(*, database: pymongo.database.Database):
+    """
+    Initialize every existing patient collection.
+
+    Brings collections created by earlier versions up to date,
+    including marking the current revision of each document.
+
+    Initialization should be idempotent.
+    """
+
+    patient_identities = scope.database.patients.get_patient_identities(
+        database=database,
+    )
+    for patient_identity_current in patient_identities or []:
+        patient_collection = database.get_collection(
+            patient_identity_current["collection"]
+        )
+
+        # Ensure the expected index
+        collection_utils.ensure_index(
+            collection=patient_collection,
+            indices=collection_utils.PATIENT_COLLECTION_INDICES,
+        )
+
+        # Ensure current revisions are marked
+        collection_utils.ensure_current_revisions(collection=patient_collection)
 
 
 def _initialize_patient_identity_collection(*, database: pymongo.database.Database):
@@ -77,7 +106,13 @@ def _initialize_patient_identity_collection(*, database: pymongo.database.Databa
     )
 
     # Ensure the expected index
-    collection_utils.ensure_index(collection=patient_identity_collection)
+    collection_utils.ensure_index(
+        collection=patient_identity_collection,
+        indices=collection_utils.IDENTITY_COLLECTION_INDICES,
+    )
+
+    # Ensure current revisions are marked
+    collection_utils.ensure_current_revisions(collection=patient_identity_collection)
 
     # Ensure a sentinel document in that collection
     result = collection_utils.get_singleton(
@@ -105,7 +140,13 @@ def _initialize_provider_identity_collection(*, database: pymongo.database.Datab
     )
 
     # Ensure the expected index
-    collection_utils.ensure_index(collection=provider_identity_collection)
+    collection_utils.ensure_index(
+        collection=provider_identity_collection,
+        indices=collection_utils.IDENTITY_COLLECTION_INDICES,
+    )
+
+    # Ensure current revisions are marked
+    collection_utils.ensure_current_revisions(collection=provider_identity_collection)
 
     # Ensure a sentinel document in that collection
     result = collection_utils.get_singleton(
@@ -1,18 +1,23 @@
 from scope.database.patient.activities import (
+    extend_scheduled_activities,
     get_activities,
     get_activity,
+    maintain_scheduled_activities,
     post_activity,
     put_activity,
 )
 from scope.database.patient.assessments import (
+    extend_scheduled_assessments,
     get_assessments,
     get_assessment,
+    maintain_scheduled_assessments,
     put_assessment,
 )
 from scope.database.patient.case_reviews import (
     get_case_reviews,
     get_case_review,
     post_case_review,
+    post_case_reviews,
     put_case_review,
 )
 from scope.database.patient.clinical_history import (
@@ -23,6 +28,7 @@ from scope.database.patient.mood_logs import (
     get_mood_logs,
     get_mood_log,
     post_mood_log,
+    post_mood_logs,
     put_mood_log,
 )
 from scope.database.patient.patient_profile import (
@@ -37,6 +43,7 @@ from scope.database.patient.sessions import (
     get_sessions,
     get_session,
     post_session,
+    post_sessions,
     put_session,
 )
 from scope.database.patient.values_inventory import (
@@ -7,6 +7,7 @@ import pytz
 import scope.database.collection_utils
 import scope.database.date_utils as date_utils
 import scope.database.patient.scheduled_activities
+import scope.database.scheduled_item_maintenance as scheduled_item_maintenance
 import scope.database.scheduled_item_utils as scheduled_item_utils
 import scope.enums
 import scope.schema
@@ -21,6 +22,7 @@ def _calculate_scheduled_activities_to_create(
     activity_id: str,
     activity: dict,
     maintenance_datetime: datetime.datetime,
+    horizon_datetime: datetime.datetime,
 ) -> List[dict]:
     # Temporarily assume everybody is always in local timezone
     timezone = pytz.timezone("America/Los_Angeles")
@@ -30,11 +32,11 @@ def _calculate_scheduled_activities_to_create(
 
     if activity["hasRepetition"]:
         frequency = scope.enums.ScheduledItemFrequency.Weekly.value
-        months = 3
+        until_datetime = horizon_datetime
         repeat_day_flags = activity["repeatDayFlags"]
     else:
         frequency = None
-        months = None
+        until_datetime = None
         repeat_day_flags = None
 
     if activity["hasReminder"]:
@@ -54,7 +56,7 @@ def _calculate_scheduled_activities_to_create(
         reminder=activity["hasReminder"],
         reminder_time_of_day=reminder_time_of_day,
         timezone=timezone,
-        months=months,
+        until_datetime=until_datetime,
     )
 
     # Fill in additional data needed for scheduled activities
@@ -102,50 +104,82 @@ def _maintain_pending_scheduled_activities(
     activity: dict,
     maintenance_datetime: datetime.datetime,
     delete_existing: bool,
+    horizon: Optional[datetime.timedelta] = None,
+    existing_scheduled_activities: Optional[List[dict]] = None,
 ):
+    if horizon is None:
+        horizon = scheduled_item_utils.write_horizon()
+
     # Delete existing will be False if we are already certain
     # that no existing scheduled activities need deleted as part of maintenance.
     # This would be the case in a post of a new activity.
+    existing_items = []
+    pending_items = []
     if delete_existing:
-        # Remove existing scheduled activities as necessary
-        existing_scheduled_activities = (
-            scope.database.patient.scheduled_activities.get_scheduled_activities(
-                collection=collection
+        if existing_scheduled_activities is None:
+            existing_scheduled_activities = (
+                scope.database.patient.scheduled_activities.get_scheduled_activities(
+                    collection=collection
+                )
             )
-        )
         if existing_scheduled_activities:
-            delete_items = _calculate_scheduled_activities_to_delete(
-                scheduled_activities=existing_scheduled_activities,
+            existing_items = [
+                scheduled_activity_current
+                for scheduled_activity_current in existing_scheduled_activities
+                if scheduled_activity_current[SEMANTIC_SET_ID] == activity_id
+            ]
+            pending_items = _calculate_scheduled_activities_to_delete(
+                scheduled_activities=existing_items,
                 activity_id=activity_id,
                 maintenance_datetime=maintenance_datetime,
             )
 
-            # Mark all of them as deleted
-            for delete_item_current in delete_items:
-                scope.database.patient.scheduled_activities.delete_scheduled_activity(
-                    collection=collection,
-                    scheduled_activity=delete_item_current,
-                    set_id=delete_item_current[
-                        scope.database.patient.scheduled_activities.SEMANTIC_SET_ID
-                    ],
-                )
-
-    # Create new scheduled activities as necessary
-    create_items = _calculate_scheduled_activities_to_create(
+    # Calculate the current schedule
+    scheduled_items = _calculate_scheduled_activities_to_create(
         activity_id=activity_id,
         activity=activity,
         maintenance_datetime=maintenance_datetime,
+        horizon_datetime=scheduled_item_utils.horizon_datetime(
+            start_datetime=date_utils.parse_datetime(activity["startDateTime"]),
+            effective_datetime=maintenance_datetime,
+            horizon=horizon,
+            pending_items=pending_items,
+        ),
     )
-    if create_items:
-        for create_item_current in create_items:
-            schema_utils.assert_schema(
-                data=create_item_current,
-                schema=scope.schema.scheduled_activity_schema,
-            )
 
-            scope.database.patient.scheduled_activities.post_scheduled_activity(
-                collection=collection, scheduled_activity=create_item_current
-            )
+    # Write only the difference between pending items and the current schedule
+    scheduled_items_diff = scheduled_item_utils.diff_scheduled_items(
+        pending_items=pending_items,
+        scheduled_items=scheduled_items,
+        semantic_set_id=scope.database.patient.scheduled_activities.SEMANTIC_SET_ID,
+        existing_items=existing_items,
+    )
+
+    if scheduled_items_diff.delete_items:
+        scope.database.patient.scheduled_activities.delete_scheduled_activities(
+            collection=collection,
+            scheduled_activities=scheduled_items_diff.delete_items,
+        )
+
+    for item_current in (
+        scheduled_items_diff.update_items + scheduled_items_diff.create_items
+    ):
+        schema_utils.raise_for_invalid_generated_schema(
+            data=item_current,
+            schema=scope.schema.scheduled_activity_schema,
+        )
+
+    if scheduled_items_diff.update_items:
+        scope.database.patient.scheduled_activities.put_scheduled_activities(
+            collection=collection,
+            scheduled_activities=scheduled_items_diff.update_items,
+        )
+
+    if scheduled_items_diff.create_items:
+        scope.database.patient.scheduled_activities.post_scheduled_activities(
+            collection=collection,
+            scheduled_activities=scheduled_items_diff.create_items,
+        )
 
 
 def get_activities(
@@ -195,13 +229,24 @@ def post_activity(
     )
 
     if activity_set_post_result.inserted_count == 1:
-        _maintain_pending_scheduled_activities(
-            collection=collection,
-            activity_id=activity_set_post_result.inserted_set_id,
-            activity=activity_set_post_result.document,
-            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
-            delete_existing=False,
-        )
+        dispatcher = scheduled_item_maintenance.scheduled_item_maintenance_dispatcher()
+        if dispatcher:
+            dispatcher(
+                scheduled_item_maintenance.ScheduledItemMaintenance(
+                    collection_name=collection.name,
+                    document_type=DOCUMENT_TYPE,
+                    set_id=activity_set_post_result.inserted_set_id,
+                    rev=activity_set_post_result.document["_rev"],
+                )
+            )
+        else:
+            _maintain_pending_scheduled_activities(
+                collection=collection,
+                activity_id=activity_set_post_result.inserted_set_id,
+                activity=activity_set_post_result.document,
+                maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+                delete_existing=False,
+            )
 
     return activity_set_post_result
 
@@ -229,12 +274,87 @@ def put_activity(
     #
 
     if activity_set_put_result.inserted_count == 1:
+        dispatcher = scheduled_item_maintenance.scheduled_item_maintenance_dispatcher()
+        if dispatcher:
+            dispatcher(
+                scheduled_item_maintenance.ScheduledItemMaintenance(
+                    collection_name=collection.name,
+                    document_type=DOCUMENT_TYPE,
+                    set_id=set_id,
+                    rev=activity_set_put_result.document["_rev"],
+                )
+            )
+        else:
+            _maintain_pending_scheduled_activities(
+                collection=collection,
+                activity_id=set_id,
+                activity=activity_set_put_result.document,
+                maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+                delete_existing=True,
+            )
+
+    return activity_set_put_result
+
+
+def maintain_scheduled_activities(
+    *,
+    collection: pymongo.collection.Collection,
+    set_id: str,
+    rev: int,
+    maintenance_datetime: datetime.datetime,
+) -> bool:
+    """
+    Maintain the scheduled activities of an activity, as dispatched by a write of revision rev.
+
+    If the activity has since been replaced, its later write is responsible for maintenance.
+    Return whether maintenance was performed.
+    """
+
+    activity = get_activity(collection=collection, set_id=set_id)
+    if activity is None or activity["_rev"] != rev:
+        return False
+
+    _maintain_pending_scheduled_activities(
+        collection=collection,
+        activity_id=set_id,
+        activity=activity,
+        maintenance_datetime=maintenance_datetime,
+        delete_existing=True,
+    )
+
+    return True
+
+
+def extend_scheduled_activities(
+    *,
+    collection: pymongo.collection.Collection,
+    maintenance_datetime: datetime.datetime,
+    horizon: datetime.timedelta = scheduled_item_utils.EXTENDED_HORIZON,
+) -> None:
+    """
+    Extend the scheduled activities of every activity through a horizon.
+
+    Pending scheduled activities are unchanged, so only newly scheduled activities are written.
+    """
+
+    activities = get_activities(collection=collection)
+    if not activities:
+        return
+
+    existing_scheduled_activities = (
+        scope.database.patient.scheduled_activities.get_scheduled_activities(
+            collection=collection
+        )
+        or []
+    )
+
+    for activity_current in activities:
         _maintain_pending_scheduled_activities(
             collection=collection,
-            activity_id=set_id,
-            activity=activity_set_put_result.document,
-            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+            activity_id=activity_current["_set_id"],
+            activity=activity_current,
+            maintenance_datetime=maintenance_datetime,
             delete_existing=True,
+            horizon=horizon,
+            existing_scheduled_activities=existing_scheduled_activities,
         )
-
-    return activity_set_put_result
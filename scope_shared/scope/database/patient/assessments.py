@@ -7,6 +7,7 @@ from typing import List, Optional
 import scope.database.collection_utils
 import scope.database.date_utils as date_utils
 import scope.database.patient.scheduled_assessments
+import scope.database.scheduled_item_maintenance as scheduled_item_maintenance
 import scope.database.scheduled_item_utils as scheduled_item_utils
 import scope.schema
 import scope.schema_utils as schema_utils
@@ -19,11 +20,11 @@ def _calculate_scheduled_assessments_to_create(
     assessment_id: str,
     assessment: dict,
     maintenance_datetime: datetime.datetime,
+    horizon_datetime: datetime.datetime,
 ) -> List[dict]:
     # Temporarily assume everybody is always in local timezone
     timezone = pytz.timezone("America/Los_Angeles")
     # Temporarily assume assessments are due at 8am, receive a reminder at 8am
-    # Temporarily assume we should populate for the next 3 months
 
     if not assessment["assigned"]:
         return []
@@ -40,7 +41,7 @@ def _calculate_scheduled_assessments_to_create(
         reminder=True,
         reminder_time_of_day=8,
         timezone=timezone,
-        months=3,
+        until_datetime=horizon_datetime,
     )
 
     # Fill in additional data needed for scheduled assessments
@@ -86,46 +87,79 @@ def _maintain_pending_scheduled_assessments(
     assessment_id: str,
     assessment: dict,
     maintenance_datetime: datetime.datetime,
+    horizon: Optional[datetime.timedelta] = None,
+    existing_scheduled_assessments: Optional[List[dict]] = None,
 ):
-    # Remove existing scheduled assessments as necessary
-    existing_scheduled_assessments = (
-        scope.database.patient.scheduled_assessments.get_scheduled_assessments(
-            collection=collection
+    if horizon is None:
+        horizon = scheduled_item_utils.write_horizon()
+
+    # Find existing pending scheduled assessments
+    existing_items = []
+    pending_items = []
+    if existing_scheduled_assessments is None:
+        existing_scheduled_assessments = (
+            scope.database.patient.scheduled_assessments.get_scheduled_assessments(
+                collection=collection
+            )
         )
-    )
     if existing_scheduled_assessments:
-        delete_items = _calculate_scheduled_assessments_to_delete(
+        existing_items = [
+            scheduled_assessment_current
+            for scheduled_assessment_current in existing_scheduled_assessments
+            if scheduled_assessment_current[SEMANTIC_SET_ID] == assessment_id
+        ]
+        pending_items = _calculate_scheduled_assessments_to_delete(
             assessment_id=assessment_id,
-            scheduled_assessments=existing_scheduled_assessments,
+            scheduled_assessments=existing_items,
             maintenance_datetime=maintenance_datetime,
         )
 
-        for delete_item_current in delete_items:
-            scope.database.patient.scheduled_assessments.delete_scheduled_assessment(
-                collection=collection,
-                scheduled_assessment=delete_item_current,
-                set_id=delete_item_current[
-                    scope.database.patient.scheduled_assessments.SEMANTIC_SET_ID
-                ],
-            )
-
-    # Create new scheduled assessments as necessary
-    create_items = _calculate_scheduled_assessments_to_create(
+    # Calculate the current schedule
+    scheduled_items = _calculate_scheduled_assessments_to_create(
         assessment_id=assessment_id,
         assessment=assessment,
         maintenance_datetime=maintenance_datetime,
+        horizon_datetime=scheduled_item_utils.horizon_datetime(
+            start_datetime=date_utils.parse_datetime(assessment["assignedDateTime"]),
+            effective_datetime=maintenance_datetime,
+            horizon=horizon,
+            pending_items=pending_items,
+        ),
     )
-    if create_items:
-        for create_item_current in create_items:
-            schema_utils.assert_schema(
-                data=create_item_current,
-                schema=scope.schema.scheduled_assessment_schema,
-            )
 
-            scope.database.patient.scheduled_assessments.post_scheduled_assessment(
-                collection=collection,
-                scheduled_assessment=create_item_current,
-            )
+    # Write only the difference between pending items and the current schedule
+    scheduled_items_diff = scheduled_item_utils.diff_scheduled_items(
+        pending_items=pending_items,
+        scheduled_items=scheduled_items,
+        semantic_set_id=scope.database.patient.scheduled_assessments.SEMANTIC_SET_ID,
+        existing_items=existing_items,
+    )
+
+    if scheduled_items_diff.delete_items:
+        scope.database.patient.scheduled_assessments.delete_scheduled_assessments(
+            collection=collection,
+            scheduled_assessments=scheduled_items_diff.delete_items,
+        )
+
+    for item_current in (
+        scheduled_items_diff.update_items + scheduled_items_diff.create_items
+    ):
+        schema_utils.raise_for_invalid_generated_schema(
+            data=item_current,
+            schema=scope.schema.scheduled_assessment_schema,
+        )
+
+    if scheduled_items_diff.update_items:
+        scope.database.patient.scheduled_assessments.put_scheduled_assessments(
+            collection=collection,
+            scheduled_assessments=scheduled_items_diff.update_items,
+        )
+
+    if scheduled_items_diff.create_items:
+        scope.database.patient.scheduled_assessments.post_scheduled_assessments(
+            collection=collection,
+            scheduled_assessments=scheduled_items_diff.create_items,
+        )
 
 
 def get_assessments(
@@ -187,11 +221,84 @@ def put_assessment(
     # Update the corresponding scheduled assessments
     #
     if assessment_set_put_result.inserted_count == 1:
+        dispatcher = scheduled_item_maintenance.scheduled_item_maintenance_dispatcher()
+        if dispatcher:
+            dispatcher(
+                scheduled_item_maintenance.ScheduledItemMaintenance(
+                    collection_name=collection.name,
+                    document_type=DOCUMENT_TYPE,
+                    set_id=set_id,
+                    rev=assessment_set_put_result.document["_rev"],
+                )
+            )
+        else:
+            _maintain_pending_scheduled_assessments(
+                collection=collection,
+                assessment_id=set_id,
+                assessment=assessment_set_put_result.document,
+                maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+            )
+
+    return assessment_set_put_result
+
+
+def maintain_scheduled_assessments(
+    *,
+    collection: pymongo.collection.Collection,
+    set_id: str,
+    rev: int,
+    maintenance_datetime: datetime.datetime,
+) -> bool:
+    """
+    Maintain the scheduled assessments of an assessment, as dispatched by a write of revision rev.
+
+    If the assessment has since been replaced, its later write is responsible for maintenance.
+    Return whether maintenance was performed.
+    """
+
+    assessment = get_assessment(collection=collection, set_id=set_id)
+    if assessment is None or assessment["_rev"] != rev:
+        return False
+
+    _maintain_pending_scheduled_assessments(
+        collection=collection,
+        assessment_id=set_id,
+        assessment=assessment,
+        maintenance_datetime=maintenance_datetime,
+    )
+
+    return True
+
+
+def extend_scheduled_assessments(
+    *,
+    collection: pymongo.collection.Collection,
+    maintenance_datetime: datetime.datetime,
+    horizon: datetime.timedelta = scheduled_item_utils.EXTENDED_HORIZON,
+) -> None:
+    """
+    Extend the scheduled assessments of every assessment through a horizon.
+
+    Pending scheduled assessments are unchanged, so only newly scheduled assessments are written.
+    """
+
+    assessments = get_assessments(collection=collection)
+    if not assessments:
+        return
+
+    existing_scheduled_assessments = (
+        scope.database.patient.scheduled_assessments.get_scheduled_assessments(
+            collection=collection
+        )
+        or []
+    )
+
+    for assessment_current in assessments:
         _maintain_pending_scheduled_assessments(
             collection=collection,
-            assessment_id=set_id,
-            assessment=assessment_set_put_result.document,
-            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+            assessment_id=assessment_current["_set_id"],
+            assessment=assessment_current,
+            maintenance_datetime=maintenance_datetime,
+            horizon=horizon,
+            existing_scheduled_assessments=existing_scheduled_assessments,
         )
-
-    return assessment_set_put_result
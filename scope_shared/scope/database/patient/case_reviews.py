@@ -54,6 +54,23 @@ def post_case_review(
     )
 
 
+def post_case_reviews(
+    *,
+    collection: pymongo.collection.Collection,
+    case_reviews: List[dict],
+) -> List[scope.database.collection_utils.SetPostResult]:
+    """
+    Post multiple "caseReview" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=case_reviews,
+    )
+
+
 def put_case_review(
     *,
     collection: pymongo.collection.Collection,
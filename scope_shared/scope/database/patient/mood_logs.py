@@ -54,6 +54,23 @@ def post_mood_log(
     )
 
 
+def post_mood_logs(
+    *,
+    collection: pymongo.collection.Collection,
+    mood_logs: List[dict],
+) -> List[scope.database.collection_utils.SetPostResult]:
+    """
+    Post multiple "moodLog" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=mood_logs,
+    )
+
+
 def put_mood_log(
     *,
     collection: pymongo.collection.Collection,
@@ -1,10 +1,12 @@
 import copy
+import datetime
 from typing import List, Optional
 import pymongo.collection
 import pytest
 
 import scope.database.collection_utils
 import scope.database.patient.activities
+import scope.database.scheduled_item_utils as scheduled_item_utils
 import scope.schema
 import scope.schema_utils as schema_utils
 
@@ -12,29 +14,36 @@ import scope.schema_utils as schema_utils
 DOCUMENT_TYPE = "scheduledActivity"
 SEMANTIC_SET_ID = "scheduledActivityId"
 
+# Maintenance of scheduled activities leaves behind elements marked "_deleted"
+EXCLUDE_DELETED_QUERY = {"_deleted": {"$ne": True}}
+
 
 def get_scheduled_activities(
     *,
     collection: pymongo.collection.Collection,
+    due_after: Optional[datetime.datetime] = None,
+    due_before: Optional[datetime.datetime] = None,
+    completed: Optional[bool] = None,
 ) -> Optional[List[dict]]:
     """
     Get list of "scheduledAactivity" documents.
+
+    Optionally only those due within a range of "dueDateTime", or by whether they are completed.
     """
 
-    scheduled_activities = scope.database.collection_utils.get_set(
+    return scope.database.collection_utils.get_set(
         collection=collection,
         document_type=DOCUMENT_TYPE,
+        element_query={
+            **EXCLUDE_DELETED_QUERY,
+            **scheduled_item_utils.due_query(
+                due_after=due_after,
+                due_before=due_before,
+                completed=completed,
+            ),
+        },
     )
 
-    if scheduled_activities:
-        scheduled_activities = [
-            scheduled_activity_current
-            for scheduled_activity_current in scheduled_activities
-            if not scheduled_activity_current.get("_deleted", False)
-        ]
-
-    return scheduled_activities
-
 
 def delete_scheduled_activity(
     *,
@@ -47,7 +56,7 @@ def delete_scheduled_activity(
     scheduled_activity["_deleted"] = True
     del scheduled_activity["_id"]
 
-    schema_utils.assert_schema(
+    schema_utils.raise_for_invalid_generated_schema(
         data=scheduled_activity,
         schema=scope.schema.scheduled_activity_schema,
     )
@@ -59,6 +68,37 @@ def delete_scheduled_activity(
     )
 
 
+def delete_scheduled_activities(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_activities: List[dict],
+) -> List[scope.database.collection_utils.SetPutResult]:
+    """
+    Mark multiple "scheduledActivity" documents as deleted, in a single insert.
+    """
+
+    deleted_scheduled_activities = []
+    for scheduled_activity_current in scheduled_activities:
+        scheduled_activity_current = copy.deepcopy(scheduled_activity_current)
+
+        scheduled_activity_current["_deleted"] = True
+        del scheduled_activity_current["_id"]
+
+        schema_utils.raise_for_invalid_generated_schema(
+            data=scheduled_activity_current,
+            schema=scope.schema.scheduled_activity_schema,
+        )
+
+        deleted_scheduled_activities.append(scheduled_activity_current)
+
+    return scope.database.collection_utils.put_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=deleted_scheduled_activities,
+    )
+
+
 def get_scheduled_activity(
     *,
     collection: pymongo.collection.Collection,
@@ -98,6 +138,23 @@ def post_scheduled_activity(
     )
 
 
+def post_scheduled_activities(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_activities: List[dict],
+) -> List[scope.database.collection_utils.SetPostResult]:
+    """
+    Post multiple "scheduledActivity" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=scheduled_activities,
+    )
+
+
 def put_scheduled_activity(
     *,
     collection: pymongo.collection.Collection,
@@ -115,3 +172,20 @@ def put_scheduled_activity(
         set_id=set_id,
         document=scheduled_activity,
     )
+
+
+def put_scheduled_activities(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_activities: List[dict],
+) -> List[scope.database.collection_utils.SetPutResult]:
+    """
+    Put multiple "scheduledActivity" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.put_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=scheduled_activities,
+    )
@@ -1,9 +1,11 @@
 import copy
+import datetime
 from typing import List, Optional
 
 import pymongo.collection
 import scope.database.collection_utils
 import scope.database.patient.assessments
+import scope.database.scheduled_item_utils as scheduled_item_utils
 import scope.enums
 import scope.schema
 import scope.schema_utils as schema_utils
@@ -11,29 +13,36 @@ import scope.schema_utils as schema_utils
 DOCUMENT_TYPE = "scheduledAssessment"
 SEMANTIC_SET_ID = "scheduledAssessmentId"
 
+# Maintenance of scheduled assessments leaves behind elements marked "_deleted"
+EXCLUDE_DELETED_QUERY = {"_deleted": {"$ne": True}}
+
 
 def get_scheduled_assessments(
     *,
     collection: pymongo.collection.Collection,
+    due_after: Optional[datetime.datetime] = None,
+    due_before: Optional[datetime.datetime] = None,
+    completed: Optional[bool] = None,
 ) -> Optional[List[dict]]:
     """
     Get list of "scheduledAssessment" documents.
+
+    Optionally only those due within a range of "dueDateTime", or by whether they are completed.
     """
 
-    scheduled_assessments = scope.database.collection_utils.get_set(
+    return scope.database.collection_utils.get_set(
         collection=collection,
         document_type=DOCUMENT_TYPE,
+        element_query={
+            **EXCLUDE_DELETED_QUERY,
+            **scheduled_item_utils.due_query(
+                due_after=due_after,
+                due_before=due_before,
+                completed=completed,
+            ),
+        },
     )
 
-    if scheduled_assessments:
-        scheduled_assessments = [
-            scheduled_assessment_current
-            for scheduled_assessment_current in scheduled_assessments
-            if not scheduled_assessment_current.get("_deleted", False)
-        ]
-
-    return scheduled_assessments
-
 
 def delete_scheduled_assessment(
     *,
@@ -46,7 +55,7 @@ def delete_scheduled_assessment(
     scheduled_assessment["_deleted"] = True
     del scheduled_assessment["_id"]
 
-    schema_utils.assert_schema(
+    schema_utils.raise_for_invalid_generated_schema(
         data=scheduled_assessment,
         schema=scope.schema.scheduled_assessment_schema,
     )
@@ -58,6 +67,37 @@ def delete_scheduled_assessment(
     )
 
 
+def delete_scheduled_assessments(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_assessments: List[dict],
+) -> List[scope.database.collection_utils.SetPutResult]:
+    """
+    Mark multiple "scheduledAssessment" documents as deleted, in a single insert.
+    """
+
+    deleted_scheduled_assessments = []
+    for scheduled_assessment_current in scheduled_assessments:
+        scheduled_assessment_current = copy.deepcopy(scheduled_assessment_current)
+
+        scheduled_assessment_current["_deleted"] = True
+        del scheduled_assessment_current["_id"]
+
+        schema_utils.raise_for_invalid_generated_schema(
+            data=scheduled_assessment_current,
+            schema=scope.schema.scheduled_assessment_schema,
+        )
+
+        deleted_scheduled_assessments.append(scheduled_assessment_current)
+
+    return scope.database.collection_utils.put_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=deleted_scheduled_assessments,
+    )
+
+
 def get_scheduled_assessment(
     *,
     collection: pymongo.collection.Collection,
@@ -97,6 +137,23 @@ def post_scheduled_assessment(
     )
 
 
+def post_scheduled_assessments(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_assessments: List[dict],
+) -> List[scope.database.collection_utils.SetPostResult]:
+    """
+    Post multiple "scheduledAssessment" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=scheduled_assessments,
+    )
+
+
 def put_scheduled_assessment(
     *,
     collection: pymongo.collection.Collection,
@@ -114,3 +171,20 @@ def put_scheduled_assessment(
         set_id=set_id,
         document=scheduled_assessment,
     )
+
+
+def put_scheduled_assessments(
+    *,
+    collection: pymongo.collection.Collection,
+    scheduled_assessments: List[dict],
+) -> List[scope.database.collection_utils.SetPutResult]:
+    """
+    Put multiple "scheduledAssessment" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.put_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=scheduled_assessments,
+    )
@@ -54,6 +54,23 @@ def post_session(
     )
 
 
+def post_sessions(
+    *,
+    collection: pymongo.collection.Collection,
+    sessions: List[dict],
+) -> List[scope.database.collection_utils.SetPostResult]:
+    """
+    Post multiple "session" documents, in a single insert.
+    """
+
+    return scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type=DOCUMENT_TYPE,
+        semantic_set_id=SEMANTIC_SET_ID,
+        documents=sessions,
+    )
+
+
 def put_session(
     *,
     collection: pymongo.collection.Collection,
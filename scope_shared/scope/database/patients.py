@@ -5,6 +5,7 @@ from typing import List, Optional
 
 import scope.database.date_utils as date_utils
 import scope.database.collection_utils as collection_utils
+import scope.database.identity_events
 import scope.database.patient.assessments
 import scope.database.patient.clinical_history
 import scope.database.patient.patient_profile
@@ -110,6 +111,9 @@ def delete_patient(
             set_id=patient_id,
             destructive=destructive,
         )
+        scope.database.identity_events.notify_identity_write(
+            identity=patient_identity_document
+        )
 
     # If the patient collection exists, delete it.
     if patient_identity_document:
@@ -150,7 +154,10 @@ def ensure_patient_collection(
         )
 
     # Ensure the collection has the desired index
-    scope.database.collection_utils.ensure_index(collection=patient_collection)
+    scope.database.collection_utils.ensure_index(
+        collection=patient_collection,
+        indices=scope.database.collection_utils.PATIENT_COLLECTION_INDICES,
+    )
 
     return patient_collection
 
@@ -321,6 +328,25 @@ def get_patient_identity(
     )
 
 
+def get_patient_identity_by_cognito_id(
+    *,
+    database: pymongo.database.Database,
+    cognito_id: str,
+) -> Optional[dict]:
+    """
+    Retrieve the patient identity document associated with a Cognito account.
+    """
+
+    patient_identity_collection = database.get_collection(PATIENT_IDENTITY_COLLECTION)
+
+    return scope.database.collection_utils.get_set_element_by_field(
+        collection=patient_identity_collection,
+        document_type=PATIENT_IDENTITY_DOCUMENT_TYPE,
+        field="cognitoAccount.cognitoId",
+        value=cognito_id,
+    )
+
+
 def put_patient_identity(
     *,
     database: pymongo.database.Database,
@@ -340,7 +366,7 @@ def put_patient_identity(
     # Put the document
     patient_identity_collection = database.get_collection(PATIENT_IDENTITY_COLLECTION)
 
-    return scope.database.collection_utils.put_set_element(
+    result = scope.database.collection_utils.put_set_element(
         collection=patient_identity_collection,
         document_type=PATIENT_IDENTITY_DOCUMENT_TYPE,
         semantic_set_id=PATIENT_IDENTITY_SEMANTIC_SET_ID,
@@ -348,6 +374,10 @@ def put_patient_identity(
         document=patient_identity,
     )
 
+    scope.database.identity_events.notify_identity_write(identity=result.document)
+
+    return result
+
 
 def get_patient_identities(
     *,
@@ -363,3 +393,23 @@ def get_patient_identities(
         collection=patient_identity_collection,
         document_type=PATIENT_IDENTITY_DOCUMENT_TYPE,
     )
+
+
+def get_patient_identities_page(
+    *,
+    database: pymongo.database.Database,
+    limit: int,
+    after_patient_id: Optional[str],
+) -> scope.database.collection_utils.SetPageResult:
+    """
+    Retrieve a page of patient identity documents, ordered by patient id.
+    """
+
+    patient_identity_collection = database.get_collection(PATIENT_IDENTITY_COLLECTION)
+
+    return scope.database.collection_utils.get_set_page(
+        collection=patient_identity_collection,
+        document_type=PATIENT_IDENTITY_DOCUMENT_TYPE,
+        limit=limit,
+        after_set_id=after_patient_id,
+    )
@@ -3,6 +3,7 @@ import scope.database.collection_utils as collection_utils
 from typing import List, Optional
 
 import scope.database.collection_utils
+import scope.database.identity_events
 
 PROVIDER_IDENTITY_COLLECTION = "providers"
 
@@ -85,6 +86,9 @@ def delete_provider(
         set_id=provider_id,
         destructive=destructive,
     )
+    scope.database.identity_events.notify_identity_write(
+        identity=provider_identity_document
+    )
 
     return True
 
@@ -107,6 +111,25 @@ def get_provider_identity(
     )
 
 
+def get_provider_identity_by_cognito_id(
+    *,
+    database: pymongo.database.Database,
+    cognito_id: str,
+) -> Optional[dict]:
+    """
+    Retrieve the provider identity document associated with a Cognito account.
+    """
+
+    provider_identity_collection = database.get_collection(PROVIDER_IDENTITY_COLLECTION)
+
+    return scope.database.collection_utils.get_set_element_by_field(
+        collection=provider_identity_collection,
+        document_type=PROVIDER_IDENTITY_DOCUMENT_TYPE,
+        field="cognitoAccount.cognitoId",
+        value=cognito_id,
+    )
+
+
 def put_provider_identity(
     *,
     database: pymongo.database.Database,
@@ -119,7 +142,7 @@ def put_provider_identity(
 
     provider_identity_collection = database.get_collection(PROVIDER_IDENTITY_COLLECTION)
 
-    return scope.database.collection_utils.put_set_element(
+    result = scope.database.collection_utils.put_set_element(
         collection=provider_identity_collection,
         document_type=PROVIDER_IDENTITY_DOCUMENT_TYPE,
         semantic_set_id=PROVIDER_IDENTITY_SEMANTIC_SET_ID,
@@ -127,6 +150,10 @@ def put_provider_identity(
         document=provider_identity,
     )
 
+    scope.database.identity_events.notify_identity_write(identity=result.document)
+
+    return result
+
 
 def get_provider_identities(
     *,
@@ -0,0 +1,54 @@
+import dataclasses
+import threading
+from typing import Callable, Optional
+
+
+@dataclasses.dataclass(frozen=True)
+class ScheduledItemMaintenance:
+    """
+    Maintenance of the scheduled items of an activity or assessment.
+
+    Identifies the revision that was written, so maintenance of a replaced revision can be dropped.
+    """
+
+    collection_name: str
+    document_type: str
+    set_id: str
+    rev: int
+
+    @property
+    def key(self) -> str:
+        return "{}:{}:{}:{}".format(
+            self.collection_name,
+            self.document_type,
+            self.set_id,
+            self.rev,
+        )
+
+
+ScheduledItemMaintenanceDispatcher = Callable[[ScheduledItemMaintenance], None]
+
+_dispatcher: Optional[ScheduledItemMaintenanceDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def set_scheduled_item_maintenance_dispatcher(
+    dispatcher: Optional[ScheduledItemMaintenanceDispatcher],
+) -> None:
+    """
+    Set a dispatcher to perform maintenance outside a write, such as by enqueuing a task.
+
+    If None, maintenance is performed within the write.
+    """
+
+    global _dispatcher
+
+    with _dispatcher_lock:
+        _dispatcher = dispatcher
+
+
+def scheduled_item_maintenance_dispatcher() -> Optional[
+    ScheduledItemMaintenanceDispatcher
+]:
+    with _dispatcher_lock:
+        return _dispatcher
@@ -1,7 +1,11 @@
+import dataclasses
 import datetime as _datetime
 import dateutil.relativedelta
 import dateutil.rrule
+import functools
+import numpy as np
 import pytz
+import threading
 from typing import List, Dict, Optional, Tuple
 
 import scope.database.date_utils as date_utils
@@ -20,6 +24,33 @@ DATEUTIL_WEEKDAYS_MAP = {
     scope.enums.DayOfWeek.Sunday.value: dateutil.rrule.SU,
 }
 
+# Items are extended through this horizon by periodic maintenance
+EXTENDED_HORIZON = _datetime.timedelta(weeks=13)
+# Items can be written through this shorter horizon if periodic maintenance extends them
+SHORT_WRITE_HORIZON = _datetime.timedelta(weeks=2)
+
+# Items are scheduled through this horizon whenever a schedule is written
+_write_horizon: _datetime.timedelta = EXTENDED_HORIZON
+_write_horizon_lock = threading.Lock()
+
+
+def set_write_horizon(horizon: _datetime.timedelta) -> None:
+    """
+    Set the horizon through which items are scheduled whenever a schedule is written.
+
+    A horizon shorter than EXTENDED_HORIZON requires periodic maintenance to extend schedules.
+    """
+
+    global _write_horizon
+
+    with _write_horizon_lock:
+        _write_horizon = horizon
+
+
+def write_horizon() -> _datetime.timedelta:
+    with _write_horizon_lock:
+        return _write_horizon
+
 
 def _convert_byweekday(repeat_day_flags: dict) -> Tuple:
     """
@@ -58,6 +89,132 @@ def _localized_datetime(
     return utc_datetime
 
 
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    """
+    Obtain the weekday of each datetime64[D], with Monday as 0.
+    """
+
+    # 1970-01-01 was a Thursday
+    return (days.astype(np.int64) + 3) % 7
+
+
+@functools.lru_cache(maxsize=None)
+def _timezone_transitions(zone: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Obtain the UTC times at which a timezone's offset changes,
+    and the UTC offset in seconds beginning at each of those times.
+    """
+
+    timezone = pytz.timezone(zone)
+
+    if not getattr(timezone, "_utc_transition_times", None):
+        # A timezone without transitions has a fixed offset
+        return (
+            np.array([_datetime.datetime.min], dtype="datetime64[s]"),
+            np.array(
+                [timezone.utcoffset(_datetime.datetime.min).total_seconds()],
+                dtype=np.int64,
+            ),
+        )
+
+    return (
+        np.array(timezone._utc_transition_times, dtype="datetime64[s]"),
+        np.array(
+            [
+                transition_info_current[0].total_seconds()
+                for transition_info_current in timezone._transition_info
+            ],
+            dtype=np.int64,
+        ),
+    )
+
+
+def _localized_datetimes(
+    *,
+    days: np.ndarray,
+    time_of_day: int,
+    timezone: pytz.timezone,
+) -> np.ndarray:
+    """
+    Obtain the UTC datetime64[s] of a time_of_day on each datetime64[D] in a timezone.
+
+    Equivalent to _localized_datetime for each date,
+    but applies offsets by transition interval rather than localizing each date.
+    """
+
+    transition_times, offsets = _timezone_transitions(timezone.zone)
+
+    local_datetimes = days.astype("datetime64[s]") + np.timedelta64(time_of_day, "h")
+
+    # Follow pytz in finding the interval of the local time plus and minus one day.
+    # If they differ, the local time is near a transition and may be ambiguous or skipped.
+    index_before = np.maximum(
+        np.searchsorted(
+            transition_times, local_datetimes - np.timedelta64(1, "D"), side="right"
+        )
+        - 1,
+        0,
+    )
+    index_after = np.maximum(
+        np.searchsorted(
+            transition_times, local_datetimes + np.timedelta64(1, "D"), side="right"
+        )
+        - 1,
+        0,
+    )
+
+    utc_datetimes = local_datetimes - offsets[index_before].astype("timedelta64[s]")
+
+    # Localize any local time near a transition exactly as pytz does
+    for index_current in np.flatnonzero(index_before != index_after):
+        utc_datetimes[index_current] = np.datetime64(
+            _localized_datetime(
+                date=days[index_current].item(),
+                time_of_day=time_of_day,
+                timezone=timezone,
+            ).replace(tzinfo=None),
+            "s",
+        )
+
+    return utc_datetimes
+
+
+def _format_datetimes(datetimes: np.ndarray) -> List[str]:
+    """
+    Format each UTC datetime64 into our format, matching date_utils.format_datetime.
+    """
+
+    return np.datetime_as_string(
+        datetimes.astype("datetime64[s]"), unit="s", timezone="UTC"
+    ).tolist()
+
+
+def _first_occurrence_on_or_after(
+    *,
+    start_date: _datetime.date,
+    effective_date: _datetime.date,
+    day_of_week: str,
+    interval_weeks: int,
+) -> _datetime.date:
+    """
+    Beginning with the first day_of_week on/after start_date, repeating every interval_weeks,
+    find the first occurrence on/after effective_date.
+
+    Computed directly, so the cost does not grow with the time since start_date.
+    """
+
+    first_date = start_date + dateutil.relativedelta.relativedelta(
+        weekday=DATEUTIL_WEEKDAYS_MAP[day_of_week]
+    )
+    if first_date >= effective_date:
+        return first_date
+
+    interval_days = 7 * interval_weeks
+    intervals = -(-(effective_date - first_date).days // interval_days)
+
+    return first_date + _datetime.timedelta(days=intervals * interval_days)
+
+
 def _initial_date(
     *,
     start_date: _datetime.date,
@@ -100,26 +257,28 @@ def _initial_date(
     elif frequency == scope.enums.ScheduledItemFrequency.Biweekly.value:
         # Beginning with start_date, happens on day_of_week every two weeks
         # Find the first such day on/after the effective date
-        initial_date = start_date + dateutil.relativedelta.relativedelta(
-            weekday=DATEUTIL_WEEKDAYS_MAP[day_of_week]
+        initial_date = _first_occurrence_on_or_after(
+            start_date=start_date,
+            effective_date=effective_date,
+            day_of_week=day_of_week,
+            interval_weeks=2,
         )
-        while initial_date < effective_date:
-            initial_date = initial_date + dateutil.relativedelta.relativedelta(weeks=2)
     elif frequency == scope.enums.ScheduledItemFrequency.Monthly.value:
         # Beginning with start_date, happens on day_of_week every four weeks
         # Find the first such day on/after the effective date
-        initial_date = start_date + dateutil.relativedelta.relativedelta(
-            weekday=DATEUTIL_WEEKDAYS_MAP[day_of_week]
+        initial_date = _first_occurrence_on_or_after(
+            start_date=start_date,
+            effective_date=effective_date,
+            day_of_week=day_of_week,
+            interval_weeks=4,
         )
-        while initial_date < effective_date:
-            initial_date = initial_date + dateutil.relativedelta.relativedelta(weeks=4)
     else:
         raise ValueError()
 
     return initial_date
 
 
-def _scheduled_dates(
+def _scheduled_days(
     *,
     start_date: _datetime.date,  # Scheduled date of first/only item
     has_repetition: bool,  # Whether to repeat
@@ -130,7 +289,12 @@ def _scheduled_dates(
         str
     ],  # For frequencies beyond weekly, day of week to start/repeat
     months: Optional[int],  # How many months of items to generate
-) -> List[_datetime.date]:
+    until_date: Optional[_datetime.date] = None,  # Alternatively, the last date
+) -> np.ndarray:
+    """
+    Obtain scheduled dates as an array of numpy datetime64[D].
+    """
+
     #
     # Check allowable parameter combinations
     #
@@ -143,6 +307,7 @@ def _scheduled_dates(
                 repeat_day_flags is not None,
                 day_of_week is not None,
                 months is not None,
+                until_date is not None,
             ]
         ):
             raise ValueError(
@@ -151,8 +316,10 @@ def _scheduled_dates(
     if has_repetition:
         if frequency is None:
             raise ValueError("If has_repetition is True, frequency must be provided")
-        if months is None:
-            raise ValueError("If has_repetition is True, months must be provided")
+        if (months is None) == (until_date is None):
+            raise ValueError(
+                "If has_repetition is True, either months or until_date must be provided"
+            )
     if frequency is scope.enums.ScheduledItemFrequency.Daily.value:
         if any([repeat_day_flags is not None, day_of_week is not None]):
             raise ValueError(
@@ -189,7 +356,7 @@ def _scheduled_dates(
     # If there was no repetition, the start_date is our one and only date.
     #
     if not has_repetition:
-        return [start_date]
+        return np.array([start_date], dtype="datetime64[D]")
 
     #
     # Calculate our first occurrence on/after both the start date and the effective date
@@ -202,50 +369,57 @@ def _scheduled_dates(
         day_of_week=day_of_week,
     )
 
-    until_date: _datetime.date = initial_date + dateutil.relativedelta.relativedelta(
-        months=months
-    )
+    if until_date is None:
+        until_date = initial_date + dateutil.relativedelta.relativedelta(months=months)
+
+    # Dates are inclusive of the until date
+    initial_day = np.datetime64(initial_date, "D")
+    until_day = np.datetime64(until_date, "D") + np.timedelta64(1, "D")
 
     if frequency == scope.enums.ScheduledItemFrequency.Daily.value:
-        repeat_rule = dateutil.rrule.rrule(
-            dateutil.rrule.DAILY,
-            interval=1,
-            dtstart=initial_date,
-            until=until_date,
-        )
+        return np.arange(initial_day, until_day, np.timedelta64(1, "D"))
     elif frequency == scope.enums.ScheduledItemFrequency.Weekly.value:
         if repeat_day_flags:
-            repeat_rule = dateutil.rrule.rrule(
-                dateutil.rrule.WEEKLY,
-                dtstart=initial_date,
-                until=until_date,
-                byweekday=_convert_byweekday(repeat_day_flags),
-            )
+            days = np.arange(initial_day, until_day, np.timedelta64(1, "D"))
+            weekdays = [
+                weekday_current.weekday
+                for weekday_current in _convert_byweekday(repeat_day_flags)
+            ]
+
+            return days[np.isin(_weekdays(days), weekdays)]
         else:
-            repeat_rule = dateutil.rrule.rrule(
-                dateutil.rrule.WEEKLY,
-                interval=1,
-                dtstart=initial_date,
-                until=until_date,
-            )
+            return np.arange(initial_day, until_day, np.timedelta64(7, "D"))
     elif frequency == scope.enums.ScheduledItemFrequency.Biweekly.value:
-        repeat_rule = dateutil.rrule.rrule(
-            dateutil.rrule.WEEKLY,
-            interval=2,
-            dtstart=initial_date,
-            until=until_date,
-        )
+        return np.arange(initial_day, until_day, np.timedelta64(14, "D"))
     elif frequency == scope.enums.ScheduledItemFrequency.Monthly.value:
-        repeat_rule = dateutil.rrule.rrule(
-            dateutil.rrule.WEEKLY,
-            interval=4,
-            dtstart=initial_date,
-            until=until_date,
-        )
+        return np.arange(initial_day, until_day, np.timedelta64(28, "D"))
     else:
         raise ValueError()
 
-    return [repeat_datetime.date() for repeat_datetime in repeat_rule]
+
+def _scheduled_dates(
+    *,
+    start_date: _datetime.date,  # Scheduled date of first/only item
+    has_repetition: bool,  # Whether to repeat
+    effective_date: _datetime.date,  # Date from which we want to schedule
+    frequency: Optional[str],  # Frequency to repeat
+    repeat_day_flags: Optional[dict],  # For weekly frequency, days of week to repeat
+    day_of_week: Optional[
+        str
+    ],  # For frequencies beyond weekly, day of week to start/repeat
+    months: Optional[int],  # How many months of items to generate
+    until_date: Optional[_datetime.date] = None,  # Alternatively, the last date
+) -> List[_datetime.date]:
+    return _scheduled_days(
+        start_date=start_date,
+        has_repetition=has_repetition,
+        effective_date=effective_date,
+        frequency=frequency,
+        repeat_day_flags=repeat_day_flags,
+        day_of_week=day_of_week,
+        months=months,
+        until_date=until_date,
+    ).tolist()
 
 
 def create_scheduled_items(
@@ -260,10 +434,13 @@ def create_scheduled_items(
     reminder: bool,
     reminder_time_of_day: Optional[int] = None,
     timezone: pytz.timezone,
-    months: int,
+    months: Optional[int] = None,
+    until_datetime: Optional[_datetime.datetime] = None,
 ) -> List[dict]:
     """
     Create a list of scheduled items based on a schedule.
+
+    Repeating items are created for a number of months, or through the date of until_datetime.
     """
     date_utils.raise_on_not_datetime_utc_aware(start_datetime)
     date_utils.raise_on_not_datetime_utc_aware(effective_datetime)
@@ -278,7 +455,11 @@ def create_scheduled_items(
     # Obtain a start date in the patient's scheduling time zone
     start_date = start_datetime.astimezone(timezone).date()
     effective_date = effective_datetime.astimezone(timezone).date()
-    scheduled_dates = _scheduled_dates(
+    until_date = None
+    if until_datetime is not None:
+        date_utils.raise_on_not_datetime_utc_aware(until_datetime)
+        until_date = until_datetime.astimezone(timezone).date()
+    scheduled_days = _scheduled_days(
         start_date=start_date,
         effective_date=effective_date,
         has_repetition=has_repetition,
@@ -286,44 +467,47 @@ def create_scheduled_items(
         day_of_week=day_of_week,
         frequency=frequency,
         months=months,
+        until_date=until_date,
     )
 
-    result_scheduled_items = []
-    for scheduled_date_current in scheduled_dates:
-        scheduled_item_current = {}
-
-        scheduled_item_current.update(
-            {
-                "dueDate": date_utils.format_date(scheduled_date_current),
-                "dueTimeOfDay": due_time_of_day,
-                "dueDateTime": date_utils.format_datetime(
-                    _localized_datetime(
-                        date=scheduled_date_current,
-                        time_of_day=due_time_of_day,
-                        timezone=timezone,
-                    )
-                ),
-            }
+    # Compute and format all datetimes at once
+    formatted_dates = _format_datetimes(scheduled_days)
+    formatted_due_datetimes = _format_datetimes(
+        _localized_datetimes(
+            days=scheduled_days,
+            time_of_day=due_time_of_day,
+            timezone=timezone,
+        )
+    )
+    if reminder:
+        formatted_reminder_datetimes = _format_datetimes(
+            _localized_datetimes(
+                days=scheduled_days,
+                time_of_day=reminder_time_of_day,
+                timezone=timezone,
+            )
         )
 
+    result_scheduled_items = []
+    for index_current, formatted_date_current in enumerate(formatted_dates):
+        scheduled_item_current = {
+            "dueDate": formatted_date_current,
+            "dueTimeOfDay": due_time_of_day,
+            "dueDateTime": formatted_due_datetimes[index_current],
+        }
+
         if reminder:
             scheduled_item_current.update(
                 {
-                    "reminderDate": date_utils.format_date(scheduled_date_current),
+                    "reminderDate": formatted_date_current,
                     "reminderTimeOfDay": reminder_time_of_day,
-                    "reminderDateTime": date_utils.format_datetime(
-                        _localized_datetime(
-                            date=scheduled_date_current,
-                            time_of_day=reminder_time_of_day,
-                            timezone=timezone,
-                        )
-                    ),
+                    "reminderDateTime": formatted_reminder_datetimes[index_current],
                 }
             )
 
         scheduled_item_current["completed"] = False
 
-        schema_utils.raise_for_invalid_schema(
+        schema_utils.raise_for_invalid_generated_schema(
             data=scheduled_item_current, schema=scope.schema.scheduled_item_schema
         )
 
@@ -349,7 +533,7 @@ def pending_scheduled_items(
 
     result_pending_scheduled_items = []
     for scheduled_item_current in scheduled_items:
-        schema_utils.raise_for_invalid_schema(
+        schema_utils.raise_for_invalid_generated_schema(
             data=scheduled_item_current, schema=scope.schema.scheduled_item_schema
         )
 
@@ -364,3 +548,153 @@ def pending_scheduled_items(
             result_pending_scheduled_items.append(scheduled_item_current)
 
     return result_pending_scheduled_items
+
+
+def horizon_datetime(
+    *,
+    start_datetime: _datetime.datetime,
+    effective_datetime: _datetime.datetime,
+    horizon: _datetime.timedelta,
+    pending_items: List[dict],
+) -> _datetime.datetime:
+    """
+    Obtain the datetime through which a schedule should be maintained.
+
+    This is the horizon beyond the later of the start and effective datetimes,
+    but never before an existing pending item, so maintenance does not undo an earlier extension.
+    """
+
+    date_utils.raise_on_not_datetime_utc_aware(start_datetime)
+    date_utils.raise_on_not_datetime_utc_aware(effective_datetime)
+
+    result_datetime = max(start_datetime, effective_datetime) + horizon
+    for pending_item_current in pending_items:
+        result_datetime = max(
+            result_datetime,
+            date_utils.parse_datetime(pending_item_current["dueDateTime"]),
+        )
+
+    return result_datetime
+
+
+def due_query(
+    *,
+    due_after: Optional[_datetime.datetime] = None,
+    due_before: Optional[_datetime.datetime] = None,
+    completed: Optional[bool] = None,
+) -> dict:
+    """
+    Obtain a query for scheduled items by "dueDateTime" and by whether they are completed.
+
+    due_after is inclusive and due_before is exclusive, both compared at whole seconds.
+    """
+
+    def _due_datetime_bound(bound: _datetime.datetime) -> str:
+        # A "dueDateTime" may include microseconds, which compare before the "Z" of a whole second.
+        # Without its "Z", a formatted bound compares before every "dueDateTime" in its second.
+        return date_utils.format_datetime(bound).rstrip("Z")
+
+    query = {}
+
+    due_datetime_query = {}
+    if due_after is not None:
+        date_utils.raise_on_not_datetime_utc_aware(due_after)
+        due_datetime_query["$gte"] = _due_datetime_bound(due_after)
+    if due_before is not None:
+        date_utils.raise_on_not_datetime_utc_aware(due_before)
+        due_datetime_query["$lt"] = _due_datetime_bound(due_before)
+    if due_datetime_query:
+        query["dueDateTime"] = due_datetime_query
+
+    if completed is not None:
+        query["completed"] = completed
+
+    return query
+
+
+@dataclasses.dataclass(frozen=True)
+class ScheduledItemsDiff:
+    # Pending items whose date is no longer scheduled
+    delete_items: List[dict]
+    # Pending items whose date is still scheduled but whose content changed,
+    # each ready to put as a new revision of the pending item
+    update_items: List[dict]
+    # Newly scheduled items that do not correspond to a pending item
+    create_items: List[dict]
+
+
+def diff_scheduled_items(
+    *,
+    pending_items: List[dict],
+    scheduled_items: List[dict],
+    semantic_set_id: str,
+    existing_items: Optional[List[dict]] = None,
+) -> ScheduledItemsDiff:
+    """
+    Compare pending items with a newly calculated schedule, matching items by "dueDate".
+
+    Pending items identical to their scheduled item require no write.
+    If existing_items is provided, it contains every stored item of the schedule.
+    While a schedule has pending items, a scheduled item with the "dueDate" of a stored item
+    that is no longer pending (e.g., today's item that is already due) exists, so is not created again.
+    A schedule without pending items is starting anew, so all its scheduled items are created.
+    """
+
+    pending_set_ids = set(
+        pending_item_current["_set_id"] for pending_item_current in pending_items
+    )
+    existing_due_dates = set()
+    if pending_items:
+        existing_due_dates = set(
+            existing_item_current["dueDate"]
+            for existing_item_current in existing_items or []
+            if existing_item_current["_set_id"] not in pending_set_ids
+        )
+
+    # Fields of a stored item that are not part of its content
+    metadata_fields = ["_id", "_rev", "_set_id", semantic_set_id]
+
+    pending_items_by_date: Dict[str, List[dict]] = {}
+    for pending_item_current in pending_items:
+        pending_items_by_date.setdefault(pending_item_current["dueDate"], []).append(
+            pending_item_current
+        )
+
+    update_items = []
+    create_items = []
+    for scheduled_item_current in scheduled_items:
+        matching_items = pending_items_by_date.get(scheduled_item_current["dueDate"])
+        if not matching_items:
+            if scheduled_item_current["dueDate"] not in existing_due_dates:
+                create_items.append(scheduled_item_current)
+            continue
+
+        pending_item_current = matching_items.pop(0)
+        pending_content = {
+            key: value
+            for (key, value) in pending_item_current.items()
+            if key not in metadata_fields
+        }
+        if pending_content != scheduled_item_current:
+            update_item_current = dict(scheduled_item_current)
+            update_item_current.update(
+                {
+                    "_set_id": pending_item_current["_set_id"],
+                    "_rev": pending_item_current["_rev"],
+                    semantic_set_id: pending_item_current["_set_id"],
+                }
+            )
+            update_items.append(update_item_current)
+
+    # Any pending item without a match is no longer scheduled
+    delete_items = [
+        pending_item_current
+        for matching_items in pending_items_by_date.values()
+        for pending_item_current in matching_items
+    ]
+
+    return ScheduledItemsDiff(
+        delete_items=delete_items,
+        update_items=update_items,
+        create_items=create_items,
+    )
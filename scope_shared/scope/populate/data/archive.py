@@ -4,22 +4,127 @@ from __future__ import annotations
 
 import scope.database.document_utils as document_utils
 
-import copy
+import collections.abc
 import json
 from pathlib import Path
 import pyzipper
-from typing import Dict, List, Optional, Tuple, Union
+import threading
+import types
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+# Manifest describing the archive, stored outside any collection directory
+MANIFEST_PATH = Path("manifest.json")
+
+
+class _LazyEntries(collections.abc.Mapping):
+    """
+    Read-only entries of an open zipfile, each decoded on first access.
+    """
+
+    def __init__(
+        self,
+        *,
+        archive_zipfile: pyzipper.AESZipFile,
+    ):
+        self._archive_zipfile = archive_zipfile
+        self._infos = {
+            Path(info_current.filename): info_current
+            for info_current in archive_zipfile.infolist()
+            if Path(info_current.filename) != MANIFEST_PATH
+        }
+        self._decoded: Dict[Path, dict] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: Path) -> dict:
+        info = self._infos[key]
+
+        with self._lock:
+            if key not in self._decoded:
+                self._decoded[key] = Archive.decode_entry(
+                    self._archive_zipfile.read(info)
+                )
+
+            return self._decoded[key]
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self._infos)
+
+    def __len__(self) -> int:
+        return len(self._infos)
 
 
 class Archive:
     # Entries contained in this archive
-    _entries: Dict[Path, dict]
+    _entries: Mapping[Path, dict]
+
+    # Manifest of this archive, if it has one
+    _manifest: Optional[dict]
+
+    # Paths of the entries in each collection, indexed once
+    _collection_paths: Dict[str, List[Path]]
+
+    # Open file of a lazily read archive
+    _archive_file: Optional[BinaryIO]
+    _archive_zipfile: Optional[pyzipper.AESZipFile]
 
     def __init__(
         self,
-        entries: Dict[Path, dict],
+        entries: Mapping[Path, dict],
+        manifest: Optional[dict] = None,
     ):
         self._entries = entries
+        self._manifest = manifest
+        self._archive_file = None
+        self._archive_zipfile = None
+
+        # Index each entry under every directory containing it
+        self._collection_paths = {}
+        for key_current in entries.keys():
+            for parent_current in key_current.parents:
+                if str(parent_current) in ["."]:
+                    continue
+
+                self._collection_paths.setdefault(str(parent_current), []).append(
+                    key_current
+                )
+
+    def __enter__(self) -> Archive:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the file of a lazily read archive.
+        """
+
+        if self._archive_zipfile is not None:
+            try:
+                self._archive_zipfile.close()
+            finally:
+                self._archive_file.close()
+
+            self._archive_zipfile = None
+            self._archive_file = None
+
+    @staticmethod
+    def _read_manifest(archive_zipfile: pyzipper.AESZipFile) -> Optional[dict]:
+        if str(MANIFEST_PATH) not in archive_zipfile.namelist():
+            return None
+
+        return json.loads(archive_zipfile.read(str(MANIFEST_PATH)).decode("utf-8"))
+
+    @staticmethod
+    def decode_entry(data: bytes) -> dict:
+        """
+        Decode the bytes of an entry as a document.
+        """
+
+        document_string = data.decode("utf-8")
+        document = json.loads(document_string)
+
+        return document_utils.normalize_document(document=document)
 
     @classmethod
     def read_archive(
@@ -27,14 +132,52 @@ class Archive:
         *,
         archive_path: Path,
         password: str,
+        lazy: bool = False,
     ) -> Archive:
         """
         Read an archive from an encrypted zipfile.
+
+        If lazy, the zipfile remains open and each entry is decoded on first access.
+        A lazy archive should be closed, such as by using it as a context manager.
         """
 
         if not archive_path.is_file():
             raise ValueError("Archive does not exist")
 
+        if lazy:
+            archive_file = open(
+                archive_path,
+                mode="rb",
+            )
+            try:
+                archive_zipfile = pyzipper.AESZipFile(
+                    archive_file,
+                    "r",
+                    compression=pyzipper.ZIP_LZMA,
+                    encryption=pyzipper.WZ_AES,
+                )
+                archive_zipfile.setpassword(password.encode("utf-8"))
+
+                # Confirm the password using the manifest and the first entry,
+                # each later read still confirms the integrity of its entry
+                entries = _LazyEntries(archive_zipfile=archive_zipfile)
+                try:
+                    manifest = Archive._read_manifest(archive_zipfile)
+                    for key_current in entries.keys():
+                        entries[key_current]
+                        break
+                except RuntimeError as e:
+                    raise ValueError("Invalid archive or password") from e
+            except Exception:
+                archive_file.close()
+                raise
+
+            archive = Archive(entries=entries, manifest=manifest)
+            archive._archive_file = archive_file
+            archive._archive_zipfile = archive_zipfile
+
+            return archive
+
         # Open the file
         with open(
             archive_path,
@@ -57,17 +200,18 @@ class Archive:
                 # Load the entries, each item in the zipfile is a document
                 entries: Dict[Path, dict] = {}
                 for info_current in archive_zipfile.infolist():
-                    document_bytes = archive_zipfile.read(info_current)
-                    document_string = document_bytes.decode("utf-8")
-                    document_current = json.loads(document_string)
-                    document_normalized = document_utils.normalize_document(
-                        document=document_current
-                    )
+                    if Path(info_current.filename) == MANIFEST_PATH:
+                        continue
 
-                    entries[Path(info_current.filename)] = document_normalized
+                    entries[Path(info_current.filename)] = Archive.decode_entry(
+                        archive_zipfile.read(info_current)
+                    )
 
                 # Create and return the archive
-                return Archive(entries=entries)
+                return Archive(
+                    entries=entries,
+                    manifest=Archive._read_manifest(archive_zipfile),
+                )
 
     @classmethod
     def write_archive(
@@ -81,42 +225,53 @@ class Archive:
         Write an archive to an encrypted zipfile.
         """
 
-        if archive_path.exists():
-            raise ValueError("Archive already exists")
+        with ArchiveWriter(
+            archive_path=archive_path,
+            password=password,
+        ) as archive_writer:
+            for (path_current, document_current) in archive.entries.items():
+                archive_writer.write_entry(
+                    path=path_current,
+                    document=document_current,
+                )
 
-        # Ensure archive directory exists
-        if archive_path.parent:
-            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            if archive.manifest is not None:
+                archive_writer.write_manifest(manifest=archive.manifest)
 
-        # The export is stored in a single zip file
-        with open(
-            archive_path,
-            mode="xb",
-        ) as archive_file:
-            with pyzipper.AESZipFile(
-                archive_file,
-                "w",
-                compression=pyzipper.ZIP_LZMA,
-                encryption=pyzipper.WZ_AES,
-            ) as archive_zipfile:
-                # Set the password
-                archive_zipfile.setpassword(password.encode("utf-8"))
+    @classmethod
+    def apply_increments(
+        cls,
+        *,
+        base: Archive,
+        increments: List[Archive],
+    ) -> Archive:
+        """
+        Combine a base archive with a chain of incremental archives, each on the one before it.
 
-                # Write each entry
-                for (path_current, document_current) in archive.entries.items():
-                    document_normalized = document_utils.normalize_document(
-                        document=document_current
-                    )
-                    document_string = json.dumps(
-                        document_normalized,
-                        indent=2,
-                    )
-                    document_bytes = document_string.encode("utf-8")
+        Entries are decoded into the combined archive, which has the manifest of the final increment.
+        """
 
-                    archive_zipfile.writestr(
-                        str(path_current),
-                        data=document_bytes,
+        entries: Dict[Path, dict] = dict(base.entries)
+        manifest = base.manifest
+        for increment_current in increments:
+            if manifest is None or increment_current.manifest is None:
+                raise ValueError("Incremental archives require a manifest")
+            if increment_current.manifest.get("baseArchiveId") != manifest["archiveId"]:
+                raise ValueError(
+                    "Archive {} is not an increment on archive {}".format(
+                        increment_current.manifest["archiveId"],
+                        manifest["archiveId"],
                     )
+                )
+
+            # A document exported in more than one archive has the same entry in each
+            entries.update(increment_current.entries)
+            manifest = increment_current.manifest
+
+        return Archive(
+            entries=entries,
+            manifest=dict(manifest) if manifest is not None else None,
+        )
 
     @staticmethod
     def collapse_document_revisions(
@@ -190,22 +345,18 @@ class Archive:
         *,
         collection: str,
         ignore_sentinel: bool,
-    ) -> Dict[Path, dict]:
-        """
-        Obtain all entries in a specified collection.
+    ) -> Mapping[Path, dict]:
         """
+        Obtain a read-only view of all entries in a specified collection.
 
-        # Filter to entries in this collection
-        collection_entries = {}
-        for (key_current, document_current) in self.entries.items():
-            parents_current = [
-                str(parent_current)
-                for parent_current in key_current.parents
-                if str(parent_current) not in ["."]
-            ]
+        Documents are shared with the archive, copy a document before modifying it.
+        """
 
-            if collection in parents_current:
-                collection_entries[key_current] = document_current
+        # Obtain entries in this collection from the index
+        collection_entries = {
+            key_current: self._entries[key_current]
+            for key_current in self._collection_paths.get(collection, [])
+        }
 
         # If there is a sentinel to ignore, do that
         if ignore_sentinel:
@@ -215,17 +366,28 @@ class Archive:
                 if document_current["_type"] != "sentinel"
             }
 
-        return collection_entries
+        return types.MappingProxyType(collection_entries)
 
     @property
-    def entries(self) -> Dict[Path, dict]:
+    def manifest(self) -> Optional[Mapping]:
+        """
+        A read-only view of the manifest of the archive, or None if it has no manifest.
         """
-        All entries in the archive.
 
-        Always returns a deepcopy, so all uses of this property are independent.
+        if self._manifest is None:
+            return None
+
+        return types.MappingProxyType(self._manifest)
+
+    @property
+    def entries(self) -> Mapping[Path, dict]:
         """
+        A read-only view of all entries in the archive.
 
-        return copy.deepcopy(self._entries)
+        Documents are shared with the archive, copy a document before modifying it.
+        """
+
+        return types.MappingProxyType(self._entries)
 
     @staticmethod
     def group_document_revisions(
@@ -316,3 +478,120 @@ class Archive:
             documents = Archive.collapse_document_revisions(documents=documents)
 
         return documents
+
+
+class ArchiveWriter:
+    """
+    Write entries to an encrypted zipfile as they are provided, without retaining them.
+
+    Used as a context manager, which creates the archive and then closes it.
+    """
+
+    _archive_path: Path
+    _password: str
+    _archive_file: Optional[BinaryIO]
+    _archive_zipfile: Optional[pyzipper.AESZipFile]
+
+    def __init__(
+        self,
+        *,
+        archive_path: Path,
+        password: str,
+    ):
+        self._archive_path = archive_path
+        self._password = password
+        self._archive_file = None
+        self._archive_zipfile = None
+
+    def __enter__(self) -> ArchiveWriter:
+        if self._archive_path.exists():
+            raise ValueError("Archive already exists")
+
+        # Ensure archive directory exists
+        if self._archive_path.parent:
+            self._archive_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # The export is stored in a single zip file
+        self._archive_file = open(
+            self._archive_path,
+            mode="xb",
+        )
+        try:
+            self._archive_zipfile = pyzipper.AESZipFile(
+                self._archive_file,
+                "w",
+                compression=pyzipper.ZIP_LZMA,
+                encryption=pyzipper.WZ_AES,
+            )
+
+            # Set the password
+            self._archive_zipfile.setpassword(self._password.encode("utf-8"))
+        except Exception:
+            self._archive_file.close()
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self._archive_zipfile.close()
+        finally:
+            self._archive_file.close()
+
+    @staticmethod
+    def encode_entry(document: dict) -> bytes:
+        """
+        Encode a document as the bytes of its entry.
+        """
+
+        document_normalized = document_utils.normalize_document(document=document)
+        document_string = json.dumps(
+            document_normalized,
+            indent=2,
+        )
+
+        return document_string.encode("utf-8")
+
+    def write_entry(
+        self,
+        *,
+        path: Path,
+        document: dict,
+    ) -> None:
+        """
+        Write a single entry to the archive.
+        """
+
+        self.write_entry_bytes(
+            path=path,
+            data=ArchiveWriter.encode_entry(document),
+        )
+
+    def write_manifest(
+        self,
+        *,
+        manifest: Mapping,
+    ) -> None:
+        """
+        Write the manifest of the archive.
+        """
+
+        self._archive_zipfile.writestr(
+            str(MANIFEST_PATH),
+            data=json.dumps(dict(manifest), indent=2).encode("utf-8"),
+        )
+
+    def write_entry_bytes(
+        self,
+        *,
+        path: Path,
+        data: bytes,
+    ) -> None:
+        """
+        Write a single entry that was already encoded, such as by another thread.
+        """
+
+        self._archive_zipfile.writestr(
+            str(path),
+            data=data,
+        )
@@ -1,12 +1,59 @@
+import bson
+import concurrent.futures
+import dataclasses
+import datetime
 from pathlib import Path
 import pymongo.database
-from typing import Dict, List, Optional
+import pytz
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
+import scope.database.collection_utils
+import scope.database.date_utils as date_utils
 import scope.populate.data.archive
 from scope.populate.types import PopulateAction, PopulateContext, PopulateRule
 
 ACTION_NAME = "archive_export"
 
+# Number of documents retrieved in each batch of a cursor
+DEFAULT_BATCH_SIZE = 1000
+
+# Seconds between checks for a failed or cancelled export while waiting on a queue
+_QUEUE_TIMEOUT = 0.1
+
+# High-water marks trail the start of an export, because an ObjectId is generated
+# by a client whose clock may differ and whose insert may not yet be visible.
+# A document near a mark is exported again by the next increment,
+# which has the same entry and so does not affect restore.
+HIGH_WATER_MARK_MARGIN = datetime.timedelta(minutes=5)
+
+# A database restored from an archive has string "_id"s, each the hexadecimal of an ObjectId.
+# Their string order matches their ObjectId order, so they are compared with a high-water mark.
+# Any other "_id" has no relation to a high-water mark.
+_UNORDERED_ID_QUERY = {
+    "$nor": [
+        {"_id": {"$type": "objectId"}},
+        {"_id": {"$regex": "^[0-9a-f]{24}$"}},
+    ]
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class ArchiveExportProgress:
+    """
+    Progress of an export, reported after each batch of a collection.
+
+    The final batch of a collection is marked complete.
+    """
+
+    collection_name: str
+    collection_index: int
+    collection_count: int
+    collection_documents: int
+    total_documents: int
+    complete: bool
+
 
 class ArchiveExport(PopulateRule):
     def match(
@@ -21,6 +68,8 @@ class ArchiveExport(PopulateRule):
 
             return _ArchiveExportAction(
                 archive=action_current["archive"],
+                parallelism=action_current.get("parallelism", 1),
+                base_archive=action_current.get("base_archive", None),
             )
 
         return None
@@ -28,15 +77,29 @@ class ArchiveExport(PopulateRule):
 
 class _ArchiveExportAction(PopulateAction):
     archive: str
+    parallelism: int
+    base_archive: Optional[str]
 
     def __init__(
         self,
         *,
         archive: str,
+        parallelism: int,
+        base_archive: Optional[str],
     ):
         self.archive = archive
+        self.parallelism = parallelism
+        self.base_archive = base_archive
 
     def prompt(self) -> List[str]:
+        if self.base_archive:
+            return [
+                "Export archive: {} (incremental since {})".format(
+                    self.archive,
+                    self.base_archive,
+                )
+            ]
+
         return ["Export archive: {}".format(self.archive)]
 
     def perform(
@@ -67,6 +130,10 @@ class _ArchiveExportAction(PopulateAction):
         if Path(self.archive).exists():
             raise ValueError("Archive already exists")
 
+        # Ensure any base archive exists
+        if self.base_archive and not Path(self.base_archive).exists():
+            raise ValueError("Base archive does not exist")
+
         # Prompt for a password
         password = input("Enter archive password: ")
         password_confirm = input("Confirm archive password: ")
@@ -78,36 +145,308 @@ class _ArchiveExportAction(PopulateAction):
             database=populate_context.database,
             archive_path=Path(self.archive),
             password=password,
+            parallelism=self.parallelism,
+            base_archive_path=Path(self.base_archive) if self.base_archive else None,
+            progress_callback=_print_archive_export_progress,
         )
 
         return populate_config
 
 
+def _print_archive_export_progress(progress: ArchiveExportProgress) -> None:
+    if not progress.complete:
+        return
+
+    print(
+        "Exported {} documents from {} ({}/{} collections).".format(
+            progress.collection_documents,
+            progress.collection_name,
+            progress.collection_index + 1,
+            progress.collection_count,
+        )
+    )
+
+
+def _collection_batches(
+    *,
+    database: pymongo.database.Database,
+    collection_name: str,
+    since: Optional[bson.ObjectId],
+    batch_size: int,
+) -> Iterator[Tuple[List[Tuple[Path, bytes]], bool]]:
+    """
+    Read and encode the entries of a collection in batches.
+
+    If since is provided, read only documents with an "_id" at least since,
+    including string "_id"s of an ObjectId at least since.
+    Yields each batch with whether it completes the collection.
+    """
+
+    collection = database[collection_name]
+
+    query = {}
+    if since is not None:
+        query = {
+            "$or": [
+                {"_id": {"$gte": since}},
+                {"_id": {"$type": "string", "$gte": str(since)}},
+            ]
+        }
+
+    # Each document is stored as a file in a directory for its collection.
+    # The "_current" marker is database state, not part of the document.
+    entries = []
+    for document_current in collection.find(
+        query,
+        projection={"_current": False},
+        batch_size=batch_size,
+    ):
+        entries.append(
+            (
+                Path(
+                    collection_name,
+                    "{}.json".format(document_current["_id"]),
+                ),
+                scope.populate.data.archive.ArchiveWriter.encode_entry(
+                    document_current
+                ),
+            )
+        )
+
+        if len(entries) == batch_size:
+            yield (entries, False)
+            entries = []
+
+    yield (entries, True)
+
+
+def _serial_collection_batches(
+    *,
+    database: pymongo.database.Database,
+    collection_names: List[str],
+    since: Dict[str, bson.ObjectId],
+    batch_size: int,
+) -> Iterator[Tuple[str, List[Tuple[Path, bytes]], bool]]:
+    for collection_name_current in collection_names:
+        for (entries, complete) in _collection_batches(
+            database=database,
+            collection_name=collection_name_current,
+            since=since.get(collection_name_current, None),
+            batch_size=batch_size,
+        ):
+            yield (collection_name_current, entries, complete)
+
+
+def _parallel_collection_batches(
+    *,
+    database: pymongo.database.Database,
+    collection_names: List[str],
+    since: Dict[str, bson.ObjectId],
+    batch_size: int,
+    parallelism: int,
+) -> Iterator[Tuple[str, List[Tuple[Path, bytes]], bool]]:
+    """
+    Read and encode collections concurrently in worker threads.
+
+    Batches are queued for the caller, so memory is bounded by a few batches per worker.
+    Batches of different collections are interleaved in the order they are read.
+    """
+
+    batches = queue.Queue(maxsize=2 * parallelism)
+    cancelled = threading.Event()
+
+    def read_collection(collection_name: str) -> None:
+        if cancelled.is_set():
+            return
+
+        for (entries, complete) in _collection_batches(
+            database=database,
+            collection_name=collection_name,
+            since=since.get(collection_name, None),
+            batch_size=batch_size,
+        ):
+            # Stop waiting for queue space if the caller stopped consuming
+            while True:
+                if cancelled.is_set():
+                    return
+                try:
+                    batches.put(
+                        (collection_name, entries, complete),
+                        timeout=_QUEUE_TIMEOUT,
+                    )
+                    break
+                except queue.Full:
+                    pass
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+        futures = [
+            executor.submit(read_collection, collection_name_current)
+            for collection_name_current in collection_names
+        ]
+
+        try:
+            completed = 0
+            while completed < len(collection_names):
+                try:
+                    batch = batches.get(timeout=_QUEUE_TIMEOUT)
+                except queue.Empty:
+                    # A failed worker will never complete its collection
+                    for future_current in futures:
+                        if future_current.done() and future_current.exception():
+                            raise future_current.exception()
+                    continue
+
+                if batch[2]:
+                    completed += 1
+
+                yield batch
+        finally:
+            cancelled.set()
+
+
 def _archive_export(
     *,
     database: pymongo.database.Database,
     archive_path: Path,
     password: str,
-):
-    entries: Dict[Path, dict] = {}
+    collection_names: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    parallelism: int = 1,
+    base_archive_path: Optional[Path] = None,
+    progress_callback: Optional[Callable[[ArchiveExportProgress], None]] = None,
+) -> int:
+    """
+    Export collections to an archive, streaming documents into the archive as they are read.
+
+    Memory is bounded by batch_size rather than by the size of the database.
+    If collection_names is not provided, every collection is exported.
+    If parallelism is greater than 1, collections are read and encoded concurrently,
+    producing the same entries in a different order.
+
+    The archive includes a manifest with a high-water mark for each collection,
+    an ObjectId whose timestamp precedes every document not yet exported.
+    If base_archive_path is provided, the export is an increment on that archive,
+    including only documents with an "_id" at least its high-water marks.
+    An increment raises ValueError if a collection has an "_id" that is neither an ObjectId
+    nor the string of an ObjectId, because such a document cannot be compared with a mark.
+    Documents are append-only revisions, so documents deleted since are not reflected.
+
+    Returns the number of documents exported.
+    """
+
+    if parallelism < 1:
+        raise ValueError("parallelism must be at least 1")
 
-    # Each collection is stored as a directory
-    collection_names = database.list_collection_names()
+    if collection_names is None:
+        collection_names = database.list_collection_names()
+
+    # Obtain the manifest of any base archive, which must use the same password
+    base_manifest = None
+    if base_archive_path is not None:
+        with scope.populate.data.archive.Archive.read_archive(
+            archive_path=base_archive_path,
+            password=password,
+            lazy=True,
+        ) as base_archive:
+            base_manifest = base_archive.manifest
+        if base_manifest is None:
+            raise ValueError("Base archive has no manifest")
+
+    # Obtain high-water marks before reading any documents,
+    # so a document inserted during the export is also included in the next increment.
+    # A collection not in the base archive is exported in full.
+    export_datetime = pytz.utc.localize(datetime.datetime.utcnow())
+    high_water_mark = bson.ObjectId.from_datetime(
+        export_datetime - HIGH_WATER_MARK_MARGIN
+    )
+
+    high_water_marks: Dict[str, str] = {}
+    if base_manifest is not None:
+        high_water_marks.update(base_manifest["highWaterMarks"])
+    since: Dict[str, bson.ObjectId] = {}
     for collection_name_current in collection_names:
-        collection_current = database[collection_name_current]
+        if collection_name_current in high_water_marks:
+            since[collection_name_current] = bson.ObjectId(
+                high_water_marks[collection_name_current]
+            )
 
-        # Each document is stored as a file in that directory
-        for document_current in collection_current.find():
-            entries[
-                Path(
+        high_water_marks[collection_name_current] = str(high_water_mark)
+
+    # Check before writing, so an increment that would omit documents is not created
+    for collection_name_current in since.keys():
+        document_unordered = database[collection_name_current].find_one(
+            _UNORDERED_ID_QUERY,
+            projection={"_id": True},
+        )
+        if document_unordered is not None:
+            raise ValueError(
+                'Collection {} has "_id" {} which is not an ObjectId, export a full archive'.format(
                     collection_name_current,
-                    "{}.json".format(document_current["_id"]),
+                    repr(document_unordered["_id"]),
                 )
-            ] = document_current
+            )
+
+    manifest = {
+        "archiveId": scope.database.collection_utils.generate_set_id(),
+        "exportDateTime": date_utils.format_datetime(export_datetime),
+        "highWaterMarks": high_water_marks,
+    }
+    if base_manifest is not None:
+        manifest["baseArchiveId"] = base_manifest["archiveId"]
+
+    if parallelism == 1:
+        collection_batches = _serial_collection_batches(
+            database=database,
+            collection_names=collection_names,
+            since=since,
+            batch_size=batch_size,
+        )
+    else:
+        collection_batches = _parallel_collection_batches(
+            database=database,
+            collection_names=collection_names,
+            since=since,
+            batch_size=batch_size,
+            parallelism=parallelism,
+        )
 
-    # Store the collection of entries to an archive
-    scope.populate.data.archive.Archive.write_archive(
-        archive=scope.populate.data.archive.Archive(entries=entries),
+    collection_indices = {
+        collection_name_current: collection_index
+        for (collection_index, collection_name_current) in enumerate(collection_names)
+    }
+    collection_documents: Dict[str, int] = {}
+    total_documents = 0
+    with scope.populate.data.archive.ArchiveWriter(
         archive_path=archive_path,
         password=password,
-    )
+    ) as archive_writer:
+        # Writes to the archive are serialized in this thread
+        for (collection_name_current, entries, complete) in collection_batches:
+            for (path_current, data_current) in entries:
+                archive_writer.write_entry_bytes(
+                    path=path_current,
+                    data=data_current,
+                )
+
+            collection_documents[collection_name_current] = collection_documents.get(
+                collection_name_current, 0
+            ) + len(entries)
+            total_documents += len(entries)
+
+            if progress_callback:
+                progress_callback(
+                    ArchiveExportProgress(
+                        collection_name=collection_name_current,
+                        collection_index=collection_indices[collection_name_current],
+                        collection_count=len(collection_names),
+                        collection_documents=collection_documents[
+                            collection_name_current
+                        ],
+                        total_documents=total_documents,
+                        complete=complete,
+                    )
+                )
+
+        archive_writer.write_manifest(manifest=manifest)
+
+    return total_documents
@@ -1,7 +1,8 @@
 import copy
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
 
+import scope.database.collection_utils
 import scope.populate.data.archive
 import scope.schema
 import scope.schema_utils
@@ -102,7 +103,7 @@ def _archive_migrate(
         archive_path=archive_path,
         password=password,
     )
-    entries: Dict[Path, dict] = archive.entries
+    entries: Mapping[Path, dict] = archive.entries
 
     # First simple migration, structure can be added for later migrations
     if migration == "v0.5.0":
@@ -130,10 +131,26 @@ def _archive_migrate(
     else:
         raise ValueError("No migration performed")
 
+    # A migrated archive has different contents, so it is a different archive.
+    # Its high-water marks are retained, but increments on the original archive do not apply to it.
+    manifest = None
+    if archive.manifest is not None:
+        manifest = dict(archive.manifest)
+        manifest.update(
+            {
+                "archiveId": scope.database.collection_utils.generate_set_id(),
+                "migratedFromArchiveId": archive.manifest["archiveId"],
+                "migration": migration,
+            }
+        )
+
     # Export the migrated entries
     # Store the collection of entries to an archive
     scope.populate.data.archive.Archive.write_archive(
-        archive=scope.populate.data.archive.Archive(entries=entries),
+        archive=scope.populate.data.archive.Archive(
+            entries=entries,
+            manifest=manifest,
+        ),
         archive_path=archive_destination_path,
         password=password,
     )
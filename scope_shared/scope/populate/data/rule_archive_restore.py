@@ -1,8 +1,15 @@
+# Annotations are not evaluated, as scope.populate.data.archive
+# is not yet an attribute while scope.populate is being imported
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
 import json
 from pathlib import Path
 import pymongo.database
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import scope.database.collection_utils
 import scope.database.patients
 import scope.populate.data.archive
 from scope.populate.types import PopulateAction, PopulateContext, PopulateRule
@@ -11,6 +18,9 @@ import scope.schema_utils
 
 ACTION_NAME = "archive_restore"
 
+# Number of documents inserted by each insert_many
+DEFAULT_BATCH_SIZE = 1000
+
 
 class ArchiveRestore(PopulateRule):
     def match(
@@ -25,6 +35,9 @@ class ArchiveRestore(PopulateRule):
 
             return _ArchiveRestoreAction(
                 archive=action_current["archive"],
+                parallelism=action_current.get("parallelism", 1),
+                batch_size=action_current.get("batch_size", DEFAULT_BATCH_SIZE),
+                increments=action_current.get("increments", []),
             )
 
         return None
@@ -32,15 +45,32 @@ class ArchiveRestore(PopulateRule):
 
 class _ArchiveRestoreAction(PopulateAction):
     archive: str
+    parallelism: int
+    batch_size: int
+    increments: List[str]
 
     def __init__(
         self,
         *,
         archive: str,
+        parallelism: int,
+        batch_size: int,
+        increments: List[str],
     ):
         self.archive = archive
+        self.parallelism = parallelism
+        self.batch_size = batch_size
+        self.increments = increments
 
     def prompt(self) -> List[str]:
+        if self.increments:
+            return [
+                "Restore archive: {} (with increments {})".format(
+                    self.archive,
+                    ", ".join(self.increments),
+                )
+            ]
+
         return ["Restore archive: {}".format(self.archive)]
 
     def perform(
@@ -70,6 +100,11 @@ class _ArchiveRestoreAction(PopulateAction):
         # Ensure archive exists
         if not Path(self.archive).exists():
             raise ValueError("Archive does not exist")
+        for increment_current in self.increments:
+            if not Path(increment_current).exists():
+                raise ValueError(
+                    "Incremental archive does not exist: {}".format(increment_current)
+                )
 
         # Prompt for a password
         password = input("Enter archive password: ")
@@ -79,6 +114,11 @@ class _ArchiveRestoreAction(PopulateAction):
             database=populate_context.database,
             archive_path=Path(self.archive),
             password=password,
+            parallelism=self.parallelism,
+            batch_size=self.batch_size,
+            increment_paths=[
+                Path(increment_current) for increment_current in self.increments
+            ],
         )
 
         return populate_config
@@ -89,12 +129,65 @@ def _archive_restore(
     database: pymongo.database.Database,
     archive_path: Path,
     password: str,
+    parallelism: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    increment_paths: Optional[List[Path]] = None,
 ):
-    archive = scope.populate.data.archive.Archive.read_archive(
-        archive_path=archive_path,
-        password=password,
-    )
+    """
+    Restore an archive.
+
+    If increment_paths are provided, the archive is a base for a chain of incremental archives,
+    which must use the same password and are applied in order.
+
+    If parallelism is greater than 1, patient collections are restored concurrently.
+    Documents are inserted in batches of batch_size.
+    """
+
+    if parallelism < 1:
+        raise ValueError("parallelism must be at least 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    # Each entry is decoded and checked once, as it is validated
+    with contextlib.ExitStack() as archive_stack:
+        archive = archive_stack.enter_context(
+            scope.populate.data.archive.Archive.read_archive(
+                archive_path=archive_path,
+                password=password,
+                lazy=True,
+            )
+        )
+
+        if increment_paths:
+            archive = scope.populate.data.archive.Archive.apply_increments(
+                base=archive,
+                increments=[
+                    archive_stack.enter_context(
+                        scope.populate.data.archive.Archive.read_archive(
+                            archive_path=increment_path_current,
+                            password=password,
+                            lazy=True,
+                        )
+                    )
+                    for increment_path_current in increment_paths
+                ],
+            )
+
+        _archive_contents_restore(
+            database=database,
+            archive=archive,
+            parallelism=parallelism,
+            batch_size=batch_size,
+        )
 
+
+def _archive_contents_restore(
+    *,
+    database: pymongo.database.Database,
+    archive: scope.populate.data.archive.Archive,
+    parallelism: int,
+    batch_size: int,
+):
     # Validate every document matches the document schema
     # TODO: A more complete validation, shared with rule_archive_validate
     for document_current in archive.entries.values():
@@ -116,6 +209,9 @@ def _archive_restore(
         collection=database["providers"],
         restore_documents=restore_providers_documents,
         delete_existing_sentinel=True,
+        drop_indices=False,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
+        batch_size=batch_size,
     )
 
     # Patients each have a document in "patients" and then a dedicated collection.
@@ -134,57 +230,98 @@ def _archive_restore(
         collection=database["patients"],
         restore_documents=restore_patients_documents,
         delete_existing_sentinel=True,
+        drop_indices=False,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
+        batch_size=batch_size,
     )
 
-    # Iterate over each patient, restore its collection and documents
-    for patient_current_document in archive.patients_documents(
+    # Iterate over each patient, restore its collection and documents.
+    # Patients are independent, so they can be restored concurrently.
+    patient_documents = archive.patients_documents(
         ignore_sentinel=True,
         collapsed=True,
-    ):
-        # Recover fields we need from the patient document
-        patient_id = patient_current_document["patientId"]
-        patient_collection_name = patient_current_document["collection"]
-        patient_name = patient_current_document["name"]
-        patient_mrn = patient_current_document["MRN"]
-
-        # Ensure the patient collection
-        patient_collection = scope.database.patients.ensure_patient_collection(
-            database=database,
-            patient_id=patient_id,
-        )
-        if patient_collection.name != patient_collection_name:
-            raise RuntimeError("Patient collection name changed")
+    )
+    if parallelism == 1:
+        for patient_current_document in patient_documents:
+            _patient_restore(
+                database=database,
+                archive=archive,
+                patient_document=patient_current_document,
+                batch_size=batch_size,
+            )
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+            futures = [
+                executor.submit(
+                    _patient_restore,
+                    database=database,
+                    archive=archive,
+                    patient_document=patient_current_document,
+                    batch_size=batch_size,
+                )
+                for patient_current_document in patient_documents
+            ]
 
-        # Restore patient documents, including the sentinel
-        restore_patient_current_documents = archive.collection_documents(
-            collection=patient_collection_name,
-            ignore_sentinel=False,
-        )
-        _collection_restore(
-            collection=patient_collection,
-            restore_documents=restore_patient_current_documents,
-            delete_existing_sentinel=True,
-        )
+            # Raise any failure
+            for future_current in concurrent.futures.as_completed(futures):
+                future_current.result()
 
-        # Ensure minimal documents.
-        # This will usually do nothing, as the existing documents were already restored.
-        scope.database.patients.ensure_patient_documents(
-            database=database,
-            patient_collection=patient_collection,
-            patient_id=patient_id,
-            patient_name=patient_name,
-            patient_mrn=patient_mrn,
-        )
 
-        # Ensure a patient identity documents.
-        # This will usually do nothing, as the existing documents were already restored.
-        scope.database.patients.ensure_patient_identity(
-            database=database,
-            patient_collection=patient_collection,
-            patient_id=patient_id,
-            patient_name=patient_name,
-            patient_mrn=patient_mrn,
-        )
+def _patient_restore(
+    *,
+    database: pymongo.database.Database,
+    archive: scope.populate.data.archive.Archive,
+    patient_document: dict,
+    batch_size: int,
+):
+    # Recover fields we need from the patient document
+    patient_id = patient_document["patientId"]
+    patient_collection_name = patient_document["collection"]
+    patient_name = patient_document["name"]
+    patient_mrn = patient_document["MRN"]
+
+    # Restore patient documents, including the sentinel
+    restore_patient_current_documents = archive.collection_documents(
+        collection=patient_collection_name,
+        ignore_sentinel=False,
+    )
+    _collection_restore(
+        collection=database.get_collection(patient_collection_name),
+        restore_documents=restore_patient_current_documents,
+        delete_existing_sentinel=False,
+        drop_indices=True,
+        indices=scope.database.collection_utils.PATIENT_COLLECTION_INDICES,
+        batch_size=batch_size,
+    )
+
+    # Ensure the patient collection.
+    # This will usually do nothing, as the sentinel and indices were already restored.
+    patient_collection = scope.database.patients.ensure_patient_collection(
+        database=database,
+        patient_id=patient_id,
+    )
+    if patient_collection.name != patient_collection_name:
+        raise RuntimeError("Patient collection name changed")
+
+    # Ensure minimal documents.
+    # This will usually do nothing, as the existing documents were already restored.
+    scope.database.patients.ensure_patient_documents(
+        database=database,
+        patient_collection=patient_collection,
+        patient_id=patient_id,
+        patient_name=patient_name,
+        patient_mrn=patient_mrn,
+    )
+
+    # Ensure a patient identity documents.
+    # This will usually do nothing, as the existing documents were already restored.
+    scope.database.patients.ensure_patient_identity(
+        database=database,
+        patient_collection=patient_collection,
+        patient_id=patient_id,
+        patient_name=patient_name,
+        patient_mrn=patient_mrn,
+    )
 
 
 def _collection_restore(
@@ -192,7 +329,18 @@ def _collection_restore(
     collection: pymongo.collection.Collection,
     restore_documents: List[dict],
     delete_existing_sentinel: bool,
+    drop_indices: bool,
+    indices: Dict[str, Tuple[List[Tuple[str, int]], bool]],
+    batch_size: int,
 ):
+    """
+    Restore documents into a collection in batches, then build its indices.
+
+    If drop_indices, indices of a collection that holds nothing but a sentinel
+    are dropped before loading so that inserts do not maintain them.
+    The number of documents in the collection is verified after loading.
+    """
+
     if delete_existing_sentinel:
         result = collection.delete_one(
             filter={
@@ -206,9 +354,40 @@ def _collection_restore(
                 )
             )
 
-    result = collection.insert_many(
-        documents=restore_documents,
-        ordered=False,
-    )
-    if not result.acknowledged:
-        raise RuntimeError("Failed to restore collection: {}".format(collection.name))
+    # Never drop indices that protect existing documents
+    if drop_indices and collection.count_documents({"_type": {"$ne": "sentinel"}}) == 0:
+        index_information = collection.index_information()
+        for index_name in indices.keys():
+            if index_name in index_information:
+                collection.drop_index(index_name)
+
+    try:
+        existing_count = collection.count_documents({})
+        for batch_start in range(0, len(restore_documents), batch_size):
+            result = collection.insert_many(
+                documents=restore_documents[batch_start : batch_start + batch_size],
+                ordered=False,
+            )
+            if not result.acknowledged:
+                raise RuntimeError(
+                    "Failed to restore collection: {}".format(collection.name)
+                )
+
+        restored_count = collection.count_documents({}) - existing_count
+        if restored_count != len(restore_documents):
+            raise RuntimeError(
+                "Restored {} of {} documents in collection: {}".format(
+                    restored_count,
+                    len(restore_documents),
+                    collection.name,
+                )
+            )
+
+        # Restored documents were inserted directly, mark their current revisions
+        scope.database.collection_utils.ensure_current_revisions(collection=collection)
+    finally:
+        # Build indices over the loaded documents, even if loading failed
+        scope.database.collection_utils.ensure_index(
+            collection=collection,
+            indices=indices,
+        )
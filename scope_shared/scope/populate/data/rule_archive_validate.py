@@ -86,17 +86,18 @@ def _archive_validate(
     archive_path: Path,
     password: str,
 ):
-    archive = scope.populate.data.archive.Archive.read_archive(
+    # Each entry is decoded and checked once, as it is validated
+    with scope.populate.data.archive.Archive.read_archive(
         archive_path=archive_path,
         password=password,
-    )
-
-    # Validate every document matches the document schema
-    for document_current in archive.entries.values():
-        # Assert the document schema
-        scope.schema_utils.assert_schema(
-            data=document_current,
-            schema=scope.schema.document_schema,
-        )
+        lazy=True,
+    ) as archive:
+        # Validate every document matches the document schema
+        for document_current in archive.entries.values():
+            # Assert the document schema
+            scope.schema_utils.assert_schema(
+                data=document_current,
+                schema=scope.schema.document_schema,
+            )
 
-        # TODO: A more complete validation, shared with rule_archive_restore
+            # TODO: A more complete validation, shared with rule_archive_restore
@@ -195,11 +195,10 @@ def _populate_generated_data(
             ),
         )
         case_reviews = fake_case_reviews_factory()
-        for case_review_current in case_reviews:
-            scope.database.patient.post_case_review(
-                collection=patient_collection,
-                case_review=case_review_current,
-            )
+        scope.database.patient.post_case_reviews(
+            collection=patient_collection,
+            case_reviews=case_reviews,
+        )
 
     _case_reviews()
 
@@ -210,11 +209,10 @@ def _populate_generated_data(
             ),
         )
         mood_logs = fake_mood_logs_factory()
-        for mood_log_current in mood_logs:
-            scope.database.patient.post_mood_log(
-                collection=patient_collection,
-                mood_log=mood_log_current,
-            )
+        scope.database.patient.post_mood_logs(
+            collection=patient_collection,
+            mood_logs=mood_logs,
+        )
 
     _mood_logs()
 
@@ -263,11 +261,10 @@ def _populate_generated_data(
                 fake_referral_status_factory=fake_referral_status_factory,
             ),
         )
-        for session in fake_sessions_factory():
-            scope.database.patient.sessions.post_session(
-                collection=patient_collection,
-                session=session,
-            )
+        scope.database.patient.sessions.post_sessions(
+            collection=patient_collection,
+            sessions=fake_sessions_factory(),
+        )
 
     _sessions()
 
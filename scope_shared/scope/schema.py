@@ -1,58 +1,61 @@
 import jschon
 import json
+import os
 from pathlib import Path
-from typing import Optional
-
-# Declare each schema in order to support code analysis/completion
-activity_schema: Optional[jschon.JSONSchema] = None
-activities_schema: Optional[jschon.JSONSchema] = None
-activity_log_schema: Optional[jschon.JSONSchema] = None
-activity_logs_schema: Optional[jschon.JSONSchema] = None
-app_config_schema: Optional[jschon.JSONSchema] = None
-app_content_config_schema: Optional[jschon.JSONSchema] = None
-assessment_schema: Optional[jschon.JSONSchema] = None
-assessments_schema: Optional[jschon.JSONSchema] = None
-assessment_content_schema: Optional[jschon.JSONSchema] = None
-assessment_contents_schema: Optional[jschon.JSONSchema] = None
-assessment_log_schema: Optional[jschon.JSONSchema] = None
-assessment_logs_schema: Optional[jschon.JSONSchema] = None
-case_review_schema: Optional[jschon.JSONSchema] = None
-case_reviews_schema: Optional[jschon.JSONSchema] = None
-clinical_history_schema: Optional[jschon.JSONSchema] = None
-contact_schema: Optional[jschon.JSONSchema] = None
-document_schema: Optional[jschon.JSONSchema] = None
-enums_schema: Optional[jschon.JSONSchema] = None
-life_area_content_schema: Optional[jschon.JSONSchema] = None
-life_area_contents_schema: Optional[jschon.JSONSchema] = None
-life_area_value_schema: Optional[jschon.JSONSchema] = None
-life_area_value_activity_schema: Optional[jschon.JSONSchema] = None
-log_schema: Optional[jschon.JSONSchema] = None
-mood_log_schema: Optional[jschon.JSONSchema] = None
-mood_logs_schema: Optional[jschon.JSONSchema] = None
-patient_schema: Optional[jschon.JSONSchema] = None
-patients_schema: Optional[jschon.JSONSchema] = None
-patient_identity_schema: Optional[jschon.JSONSchema] = None
-patient_identities_schema: Optional[jschon.JSONSchema] = None
-patient_profile_schema: Optional[jschon.JSONSchema] = None
-patient_summary_schema: Optional[jschon.JSONSchema] = None
-populate_config_schema: Optional[jschon.JSONSchema] = None
-populate_config_account_schema: Optional[jschon.JSONSchema] = None
-provider_identity_schema: Optional[jschon.JSONSchema] = None
-provider_identities_schema: Optional[jschon.JSONSchema] = None
-referral_status_schema: Optional[jschon.JSONSchema] = None
-regexes: Optional[jschon.JSONSchema] = None
-resource_content_schema: Optional[jschon.JSONSchema] = None
-resource_contents_schema: Optional[jschon.JSONSchema] = None
-safety_plan_schema: Optional[jschon.JSONSchema] = None
-scheduled_activity_schema: Optional[jschon.JSONSchema] = None
-scheduled_activities_schema: Optional[jschon.JSONSchema] = None
-scheduled_assessments_schema: Optional[jschon.JSONSchema] = None
-scheduled_assessment_schema: Optional[jschon.JSONSchema] = None
-scheduled_item_schema: Optional[jschon.JSONSchema] = None
-sentinel_schema: Optional[jschon.JSONSchema] = None
-session_schema: Optional[jschon.JSONSchema] = None
-sessions_schema: Optional[jschon.JSONSchema] = None
-values_inventory_schema: Optional[jschon.JSONSchema] = None
+import threading
+from typing import Any, Dict, Iterator, List
+
+# Declare each schema in order to support code analysis/completion.
+# Each is assigned when constructed, so access before construction uses __getattr__.
+activity_schema: jschon.JSONSchema
+activities_schema: jschon.JSONSchema
+activity_log_schema: jschon.JSONSchema
+activity_logs_schema: jschon.JSONSchema
+app_config_schema: jschon.JSONSchema
+app_content_config_schema: jschon.JSONSchema
+assessment_schema: jschon.JSONSchema
+assessments_schema: jschon.JSONSchema
+assessment_content_schema: jschon.JSONSchema
+assessment_contents_schema: jschon.JSONSchema
+assessment_log_schema: jschon.JSONSchema
+assessment_logs_schema: jschon.JSONSchema
+case_review_schema: jschon.JSONSchema
+case_reviews_schema: jschon.JSONSchema
+clinical_history_schema: jschon.JSONSchema
+contact_schema: jschon.JSONSchema
+document_schema: jschon.JSONSchema
+enums_schema: jschon.JSONSchema
+life_area_content_schema: jschon.JSONSchema
+life_area_contents_schema: jschon.JSONSchema
+life_area_value_schema: jschon.JSONSchema
+life_area_value_activity_schema: jschon.JSONSchema
+log_schema: jschon.JSONSchema
+mood_log_schema: jschon.JSONSchema
+mood_logs_schema: jschon.JSONSchema
+patient_schema: jschon.JSONSchema
+patients_schema: jschon.JSONSchema
+patient_identity_schema: jschon.JSONSchema
+patient_identities_schema: jschon.JSONSchema
+patient_profile_schema: jschon.JSONSchema
+patient_summary_schema: jschon.JSONSchema
+populate_config_schema: jschon.JSONSchema
+populate_config_account_schema: jschon.JSONSchema
+provider_identity_schema: jschon.JSONSchema
+provider_identities_schema: jschon.JSONSchema
+referral_status_schema: jschon.JSONSchema
+regexes: jschon.JSONSchema
+resource_content_schema: jschon.JSONSchema
+resource_contents_schema: jschon.JSONSchema
+safety_plan_schema: jschon.JSONSchema
+scheduled_activity_schema: jschon.JSONSchema
+scheduled_activities_schema: jschon.JSONSchema
+scheduled_assessments_schema: jschon.JSONSchema
+scheduled_assessment_schema: jschon.JSONSchema
+scheduled_item_schema: jschon.JSONSchema
+sentinel_schema: jschon.JSONSchema
+session_schema: jschon.JSONSchema
+sessions_schema: jschon.JSONSchema
+values_inventory_schema: jschon.JSONSchema
 
 
 # Declare files from which to populate each schema
@@ -127,58 +130,166 @@ SCHEMAS = {
 # Schemas need to be loaded in dependency order.
 # The jschon method for doing this internally uses jschon.JSONSchema.loadf,
 # which does not set an encoding and therefore failed for utf-8 schema content.
-# We therefore use jschon.JSONSchema.loads with an explicit utf-8 encoding.
-# Instead of attempting to manually maintain a loading order,
-# we brute force loading generations of the dependency graph while ensuring we maintain progress.
+# We therefore read each file once with an explicit utf-8 encoding,
+# resolve the $ref dependency graph, and construct schemas in topological order.
+#
+# If the SCOPE_SCHEMA_LAZY environment variable is set,
+# each schema is instead constructed on first access, after the schemas it references.
 
 CATALOG = jschon.create_catalog("2020-12")
-schemas_remaining = [key_current for key_current in SCHEMAS.keys()]
-progress = True
-while progress:
-    progress = False
 
-    for schema_current in schemas_remaining:
-        schema_path = Path(SCHEMA_DIR_PATH, SCHEMAS[schema_current])
-        with open(schema_path, encoding="utf-8") as f:
-            schema_json = json.loads(f.read())
+_SCHEMA_LAZY = bool(os.getenv("SCOPE_SCHEMA_LAZY"))
+_schema_lock = threading.RLock()
+
+
+def _read_schema_json(schema_name: str) -> dict:
+    schema_path = Path(SCHEMA_DIR_PATH, SCHEMAS[schema_name])
+    with open(schema_path, encoding="utf-8") as f:
+        return json.loads(f.read())
+
+
+def _references(node: Any) -> Iterator[str]:
+    """
+    Obtain every $ref within a schema.
+    """
+
+    if isinstance(node, dict):
+        for key_current, value_current in node.items():
+            if key_current == "$ref" and isinstance(value_current, str):
+                yield value_current
+            else:
+                yield from _references(value_current)
+    elif isinstance(node, list):
+        for value_current in node:
+            yield from _references(value_current)
+
+
+_SCHEMA_JSONS: Dict[str, dict] = {
+    schema_name: _read_schema_json(schema_name) for schema_name in SCHEMAS.keys()
+}
+_SCHEMA_NAMES_BY_URI: Dict[str, str] = {
+    str(jschon.URI(schema_json["$id"])): schema_name
+    for schema_name, schema_json in _SCHEMA_JSONS.items()
+}
+
+
+def _dependencies(schema_name: str) -> List[str]:
+    """
+    Obtain the names of schemas referenced by a schema.
+
+    References to documents outside SCHEMAS (e.g., a metaschema) are resolved by jschon.
+    """
+
+    schema_json = _SCHEMA_JSONS[schema_name]
+    base_uri = jschon.URI(schema_json["$id"])
+
+    dependencies = []
+    for reference_current in _references(schema_json):
+        reference_uri = jschon.URI(reference_current).resolve(base_uri)
+        dependency = _SCHEMA_NAMES_BY_URI.get(
+            str(reference_uri.copy(fragment=None)), None
+        )
+        if dependency and dependency != schema_name and dependency not in dependencies:
+            dependencies.append(dependency)
+
+    return dependencies
+
+
+_SCHEMA_DEPENDENCIES: Dict[str, List[str]] = {
+    schema_name: _dependencies(schema_name) for schema_name in SCHEMAS.keys()
+}
+
+
+def _topological_order() -> List[str]:
+    """
+    Order schemas so every schema follows the schemas it references.
+    """
+
+    order = []
+    visited = set()
+    visiting = set()
+
+    def visit(schema_name: str):
+        if schema_name in visited:
+            return
+        if schema_name in visiting:
+            raise ValueError("Circular schema reference: {}".format(schema_name))
 
+        visiting.add(schema_name)
+        for dependency_current in _SCHEMA_DEPENDENCIES[schema_name]:
+            visit(dependency_current)
+        visiting.remove(schema_name)
+
+        visited.add(schema_name)
+        order.append(schema_name)
+
+    for schema_name in SCHEMAS.keys():
+        visit(schema_name)
+
+    return order
+
+
+def _construct_schema(schema_name: str) -> jschon.JSONSchema:
+    """
+    Construct a schema, first constructing any schemas it references.
+    """
+
+    with _schema_lock:
+        schema = globals().get(schema_name, None)
+        if schema is not None:
+            return schema
+
+        for dependency_current in _SCHEMA_DEPENDENCIES[schema_name]:
+            _construct_schema(dependency_current)
+
+        schema_json = _SCHEMA_JSONS[schema_name]
         try:
             schema = jschon.JSONSchema(
                 schema_json,
                 catalog=CATALOG,
             )
-        except (
-            jschon.exceptions.CatalogError,
-            TypeError,
-        ):
-            # Schema construction failed, try again in the next generation
-
+        except Exception:
             # Although construction of the schema failed,
             # jschon will have already placed the schema in the catalog.
-            # Schemas dependent on the failed schema will therefore think it is available.
-            # Remove it from the catalog so that dependent schemas fail quickly.
+            # Remove it from the catalog so that dependent schemas also fail.
             CATALOG.del_schema(jschon.URI(schema_json["$id"]))
-        else:
-            # Schema was successfully created
-            globals()[schema_current] = schema
+            raise
+
+        globals()[schema_name] = schema
 
-            progress = True
-            schemas_remaining.remove(schema_current)
+        return schema
 
-# If schemas remain, they failed to parse
-if len(schemas_remaining) > 0:
-    for schema_current in schemas_remaining:
-        schema_path = Path(SCHEMA_DIR_PATH, SCHEMAS[schema_current])
-        with open(schema_path, encoding="utf-8") as f:
-            schema_json = json.loads(f.read())
+
+def __getattr__(name: str) -> Any:
+    # Only reached for a schema that has not yet been constructed
+    if name in SCHEMAS:
+        return _construct_schema(name)
+
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
+
+if not _SCHEMA_LAZY:
+    schemas_invalid = []
+    for schema_current in _topological_order():
+        if any(
+            dependency_current in schemas_invalid
+            for dependency_current in _SCHEMA_DEPENDENCIES[schema_current]
+        ):
+            schemas_invalid.append(schema_current)
+            continue
 
         try:
-            schema = jschon.JSONSchema(
-                schema_json,
-                catalog=CATALOG,
-            )
+            _construct_schema(schema_current)
         except Exception as e:
-            print("Error in schema: {}".format(schema_path))
+            print(
+                "Error in schema: {}".format(
+                    Path(SCHEMA_DIR_PATH, SCHEMAS[schema_current])
+                )
+            )
             print(e)
 
-    raise ValueError("Invalid schema detected")
+            schemas_invalid.append(schema_current)
+
+    # If schemas remain, they failed to parse
+    if len(schemas_invalid) > 0:
+        raise ValueError("Invalid schema detected")
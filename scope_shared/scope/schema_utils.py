@@ -1,6 +1,10 @@
+from enum import Enum
 import jschon
 import pprint
-from typing import List, Union
+import random
+from typing import List, Optional, Union
+
+import scope.schema_validators
 
 try:
     import pytest
@@ -8,6 +12,44 @@ except ImportError:
     pytest = None
 
 
+class ValidationPolicy(Enum):
+    # Validate every generated document
+    Strict = "strict"
+    # Trust generated documents, validating only input at a boundary
+    Boundary = "boundary"
+    # Validate a random sample of generated documents
+    Sampled = "sampled"
+
+
+_validation_policy: ValidationPolicy = ValidationPolicy.Strict
+_validation_sample_rate: float = 0.01
+
+
+def set_validation_policy(
+    *,
+    policy: Union[ValidationPolicy, str],
+    sample_rate: Optional[float] = None,
+) -> None:
+    """
+    Configure validation of documents generated within scope.database.
+
+    Input from outside scope.database (e.g., a Flask request body) is always validated.
+    """
+
+    global _validation_policy
+    global _validation_sample_rate
+
+    _validation_policy = ValidationPolicy(policy)
+    if sample_rate is not None:
+        if sample_rate < 0 or sample_rate > 1:
+            raise ValueError("sample_rate must be >= 0 and <= 1")
+        _validation_sample_rate = sample_rate
+
+
+def validation_policy() -> ValidationPolicy:
+    return _validation_policy
+
+
 def assert_schema(
     *,
     data: Union[dict, List[dict]],
@@ -18,15 +60,15 @@ def assert_schema(
     Assert a document matches a schema.
     """
 
-    result = schema.evaluate(jschon.JSON(data))
-    if result.valid != expected_valid:
-        schema_output = result.output("detailed")
+    valid = scope.schema_validators.is_valid(data=data, schema=schema)
+    if valid != expected_valid:
+        schema_output = schema.evaluate(jschon.JSON(data)).output("detailed")
 
         pprint.pprint(data)
         print()
         pprint.pprint(schema_output)
 
-    assert result.valid == expected_valid
+    assert valid == expected_valid
 
 
 def raise_for_invalid_schema(
@@ -38,9 +80,9 @@ def raise_for_invalid_schema(
     Verify a document matches a schema, raise ValueError if it does not.
     """
 
-    result = schema.evaluate(jschon.JSON(data))
-
-    if not result.valid:
+    if not scope.schema_validators.is_valid(data=data, schema=schema):
+        # Evaluate again with jschon for detailed output
+        result = schema.evaluate(jschon.JSON(data))
         raise ValueError(result.output("detailed"))
 
 
@@ -53,9 +95,8 @@ def xfail_for_invalid_schema(
     Verify a document matches a schema, xfail if it does not.
     """
 
-    result = schema.evaluate(jschon.JSON(data))
-    if not result.valid:
-        schema_output = result.output("detailed")
+    if not scope.schema_validators.is_valid(data=data, schema=schema):
+        schema_output = schema.evaluate(jschon.JSON(data)).output("detailed")
 
         pprint.pprint(data)
         print()
@@ -65,3 +106,23 @@ def xfail_for_invalid_schema(
             pytest.xfail("Invalid Schema.")
         else:
             raise ValueError(schema_output)
+
+
+def raise_for_invalid_generated_schema(
+    *,
+    data: Union[dict, List[dict]],
+    schema: jschon.JSONSchema,
+) -> None:
+    """
+    Verify a document generated within scope.database matches a schema, according to the validation policy.
+
+    Raise ValueError if it is validated and does not match.
+    """
+
+    if _validation_policy == ValidationPolicy.Boundary:
+        return
+    if _validation_policy == ValidationPolicy.Sampled:
+        if random.random() >= _validation_sample_rate:
+            return
+
+    raise_for_invalid_schema(data=data, schema=schema)
@@ -0,0 +1,300 @@
+"""
+Compiled validators for deciding whether a document matches a schema.
+
+jschon evaluates a schema by wrapping the document in a jschon.JSON tree and
+interpreting every keyword, collecting annotations needed for detailed output.
+Most validations only need a valid/invalid decision, so each schema is compiled
+once into Python closures over the keywords our schemas use.
+
+A schema using any other keyword is not compiled, and its validator uses jschon.
+Detailed output for an invalid document is always obtained from jschon.
+"""
+
+import jschon
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+Validator = Callable[[Any], bool]
+
+# Keywords that do not affect validation
+_ANNOTATION_KEYWORDS = {
+    "$comment",
+    "$defs",
+    "$id",
+    "$schema",
+    "default",
+    "description",
+    "examples",
+    "title",
+}
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "array": lambda data: isinstance(data, list),
+    "boolean": lambda data: isinstance(data, bool),
+    "integer": lambda data: (
+        (isinstance(data, int) and not isinstance(data, bool))
+        or (isinstance(data, float) and data.is_integer())
+    ),
+    "null": lambda data: data is None,
+    "number": lambda data: (
+        isinstance(data, (int, float)) and not isinstance(data, bool)
+    ),
+    "object": lambda data: isinstance(data, dict),
+    "string": lambda data: isinstance(data, str),
+}
+
+
+class _UnsupportedSchema(Exception):
+    pass
+
+
+def _is_number(data: Any) -> bool:
+    return isinstance(data, (int, float)) and not isinstance(data, bool)
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """
+    Equality under JSON semantics, where booleans are not numbers.
+    """
+
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if _is_number(a) and _is_number(b):
+        return a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+
+    return type(a) == type(b) and a == b
+
+
+class _Compiler:
+    def __init__(self, *, catalog: jschon.Catalog):
+        self._catalog = catalog
+        self._compiled: Dict[str, Optional[Validator]] = {}
+
+    def compile_uri(self, uri: jschon.URI) -> Validator:
+        """
+        Compile the schema at a URI, which may include a JSON pointer fragment.
+        """
+
+        key = str(uri)
+        if key not in self._compiled:
+            # Reserve the entry, so a recursive reference resolves when called
+            self._compiled[key] = None
+
+            document_uri = uri.copy(fragment=None)
+            schema = self._catalog.get_schema(document_uri)
+            node = schema.value
+            for token_current in jschon.JSONPointer(uri.fragment or ""):
+                node = node[token_current]
+
+            self._compiled[key] = self._compile(
+                node=node,
+                base_uri=document_uri,
+            )
+
+        compiled = self._compiled
+
+        def validate_reference(data: Any) -> bool:
+            return compiled[key](data)
+
+        return validate_reference
+
+    def _compile(self, *, node: Union[bool, dict], base_uri: jschon.URI) -> Validator:
+        if node is True:
+            return lambda data: True
+        if node is False:
+            return lambda data: False
+        if not isinstance(node, dict):
+            raise _UnsupportedSchema()
+
+        if "$id" in node:
+            base_uri = jschon.URI(node["$id"]).resolve(base_uri)
+
+        checks: List[Validator] = []
+        for keyword_current, value_current in node.items():
+            if keyword_current in _ANNOTATION_KEYWORDS:
+                continue
+
+            checks.append(
+                self._compile_keyword(
+                    keyword=keyword_current,
+                    value=value_current,
+                    node=node,
+                    base_uri=base_uri,
+                )
+            )
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def validate_all(data: Any) -> bool:
+            for check_current in checks:
+                if not check_current(data):
+                    return False
+            return True
+
+        return validate_all
+
+    def _compile_keyword(
+        self,
+        *,
+        keyword: str,
+        value: Any,
+        node: dict,
+        base_uri: jschon.URI,
+    ) -> Validator:
+        if keyword == "type":
+            types = [value] if isinstance(value, str) else value
+            type_checks = [_TYPE_CHECKS[type_current] for type_current in types]
+
+            return lambda data: any(check(data) for check in type_checks)
+
+        if keyword == "$ref":
+            return self.compile_uri(jschon.URI(value).resolve(base_uri))
+
+        if keyword == "const":
+            return lambda data: _json_equal(data, value)
+
+        if keyword == "enum":
+            return lambda data: any(_json_equal(data, item) for item in value)
+
+        if keyword == "required":
+            return lambda data: not isinstance(data, dict) or all(
+                item in data for item in value
+            )
+
+        if keyword == "properties":
+            property_checks = {
+                property_current: self._compile(node=schema_current, base_uri=base_uri)
+                for property_current, schema_current in value.items()
+            }
+
+            def validate_properties(data: Any) -> bool:
+                if not isinstance(data, dict):
+                    return True
+                for property_current, check_current in property_checks.items():
+                    if property_current in data and not check_current(
+                        data[property_current]
+                    ):
+                        return False
+                return True
+
+            return validate_properties
+
+        if keyword == "additionalProperties":
+            if "patternProperties" in node:
+                raise _UnsupportedSchema()
+            properties = set(node.get("properties", {}).keys())
+            additional_check = self._compile(node=value, base_uri=base_uri)
+
+            def validate_additional_properties(data: Any) -> bool:
+                if not isinstance(data, dict):
+                    return True
+                for property_current, value_current in data.items():
+                    if property_current not in properties and not additional_check(
+                        value_current
+                    ):
+                        return False
+                return True
+
+            return validate_additional_properties
+
+        if keyword == "items":
+            if "prefixItems" in node:
+                raise _UnsupportedSchema()
+            item_check = self._compile(node=value, base_uri=base_uri)
+
+            return lambda data: not isinstance(data, list) or all(
+                item_check(item) for item in data
+            )
+
+        if keyword == "minItems":
+            return lambda data: not isinstance(data, list) or len(data) >= value
+
+        if keyword == "minimum":
+            return lambda data: not _is_number(data) or data >= value
+
+        if keyword == "exclusiveMaximum":
+            return lambda data: not _is_number(data) or data < value
+
+        if keyword == "pattern":
+            compiled_pattern = re.compile(value)
+
+            return lambda data: not isinstance(data, str) or bool(
+                compiled_pattern.search(data)
+            )
+
+        if keyword in ["allOf", "anyOf", "oneOf"]:
+            subschema_checks = [
+                self._compile(node=schema_current, base_uri=base_uri)
+                for schema_current in value
+            ]
+
+            if keyword == "allOf":
+                return lambda data: all(check(data) for check in subschema_checks)
+            if keyword == "anyOf":
+                return lambda data: any(check(data) for check in subschema_checks)
+
+            return lambda data: sum(check(data) for check in subschema_checks) == 1
+
+        if keyword == "not":
+            not_check = self._compile(node=value, base_uri=base_uri)
+
+            return lambda data: not not_check(data)
+
+        raise _UnsupportedSchema()
+
+
+# Keyed by id, retaining the schema so its id is not reused
+_validators: Dict[int, Tuple[jschon.JSONSchema, Validator]] = {}
+_validators_lock = threading.Lock()
+
+
+def _jschon_validator(schema: jschon.JSONSchema) -> Validator:
+    return lambda data: schema.evaluate(jschon.JSON(data)).valid
+
+
+def compile_schema(schema: jschon.JSONSchema) -> Optional[Validator]:
+    """
+    Compile a schema into a validator, or None if the schema uses an unsupported keyword.
+    """
+
+    compiler = _Compiler(catalog=schema.catalog)
+    try:
+        validator = compiler.compile_uri(schema.canonical_uri)
+    except (_UnsupportedSchema, KeyError, TypeError):
+        return None
+
+    return validator
+
+
+def validator(schema: jschon.JSONSchema) -> Validator:
+    """
+    Obtain the validator for a schema, compiling it on first use.
+    """
+
+    entry = _validators.get(id(schema), None)
+    if entry is None:
+        with _validators_lock:
+            entry = _validators.get(id(schema), None)
+            if entry is None:
+                validator_compiled = compile_schema(schema)
+                if validator_compiled is None:
+                    validator_compiled = _jschon_validator(schema)
+
+                entry = (schema, validator_compiled)
+                _validators[id(schema)] = entry
+
+    return entry[1]
+
+
+def is_valid(*, data: Any, schema: jschon.JSONSchema) -> bool:
+    """
+    Decide whether a document matches a schema, without detailed output.
+    """
+
+    return validator(schema)(data)
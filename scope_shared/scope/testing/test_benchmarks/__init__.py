@@ -0,0 +1,14 @@
+"""
+Module benchmarking performance-sensitive functionality.
+
+Each benchmark prints its measurements rather than asserting on timings,
+which vary across development and testing environments.
+Benchmarks are marked and deselected by default, run them with `pytest -m benchmark -s`.
+"""
+
+from scope.testing.test_benchmarks.test_benchmark_archive import *
+from scope.testing.test_benchmarks.test_benchmark_archive_export import *
+from scope.testing.test_benchmarks.test_benchmark_collection_utils import *
+from scope.testing.test_benchmarks.test_benchmark_schema_import import *
+from scope.testing.test_benchmarks.test_benchmark_scheduled_item_utils import *
+from scope.testing.test_benchmarks.test_benchmark_schema_validators import *
@@ -0,0 +1,95 @@
+from pathlib import Path
+import time
+
+import scope.populate.data.archive
+
+_COLLECTION_COUNT = 1000
+_DOCUMENTS_PER_COLLECTION = 5
+_PASSWORD = "benchmark"
+
+
+def _write_archive(*, archive_path: Path) -> None:
+    """
+    Write an archive of synthetic patient collections, each with a sentinel.
+    """
+
+    with scope.populate.data.archive.ArchiveWriter(
+        archive_path=archive_path,
+        password=_PASSWORD,
+    ) as archive_writer:
+        for collection_current in range(_COLLECTION_COUNT):
+            for document_current in range(_DOCUMENTS_PER_COLLECTION):
+                archive_writer.write_entry(
+                    path=Path(
+                        "patient_{}".format(collection_current),
+                        "{}.json".format(document_current),
+                    ),
+                    document={
+                        "_type": "sentinel" if document_current == 0 else "activity",
+                        "_set_id": str(document_current),
+                        "_rev": 1,
+                        "value": "x" * 500,
+                    },
+                )
+
+
+def _access_every_collection(archive: scope.populate.data.archive.Archive) -> None:
+    """
+    Access each collection in turn, as done by a restore.
+    """
+
+    for collection_current in range(_COLLECTION_COUNT):
+        documents = archive.collection_documents(
+            collection="patient_{}".format(collection_current),
+            ignore_sentinel=True,
+        )
+        assert len(documents) == _DOCUMENTS_PER_COLLECTION - 1
+
+
+def test_benchmark_archive_access(
+    tmp_path: Path,
+):
+    """
+    Measure reading an archive, accessing every collection, and lazily accessing collections.
+    """
+
+    archive_path = Path(tmp_path, "archive.zip")
+    _write_archive(archive_path=archive_path)
+
+    start = time.perf_counter()
+    archive = scope.populate.data.archive.Archive.read_archive(
+        archive_path=archive_path,
+        password=_PASSWORD,
+    )
+    duration_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _access_every_collection(archive)
+    duration_access = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with scope.populate.data.archive.Archive.read_archive(
+        archive_path=archive_path,
+        password=_PASSWORD,
+        lazy=True,
+    ) as archive_lazy:
+        archive_lazy.collection_documents(
+            collection="patient_0",
+            ignore_sentinel=True,
+        )
+        duration_lazy_one = time.perf_counter() - start
+
+        _access_every_collection(archive_lazy)
+        duration_lazy_all = time.perf_counter() - start
+
+        assert archive_lazy.entries == archive.entries
+
+    print(
+        "entries={}  read={:.2f}s  access_all={:.3f}s  lazy_one={:.3f}s  lazy_all={:.2f}s".format(
+            _COLLECTION_COUNT * _DOCUMENTS_PER_COLLECTION,
+            duration_read,
+            duration_access,
+            duration_lazy_one,
+            duration_lazy_all,
+        )
+    )
@@ -0,0 +1,385 @@
+import bson
+import datetime
+import os
+from pathlib import Path
+import pymongo.collection
+import pymongo.database
+import pytest
+import pytz
+import resource
+import struct
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import scope.populate.data.archive
+import scope.populate.data.rule_archive_export
+
+_PATIENT_COUNTS = [200, 1000]
+_DOCUMENTS_PER_PATIENT = 5
+_BATCH_SIZE = 100
+_PARALLELISMS = [1, 4]
+_INCREMENT_PATIENT_COUNT = 10
+_PASSWORD = "benchmark"
+
+
+def _object_id(inserted_datetime: datetime.datetime) -> bson.ObjectId:
+    """
+    Generate a unique ObjectId as if its document was inserted at inserted_datetime.
+    """
+
+    return bson.ObjectId(
+        struct.pack(">I", int(inserted_datetime.timestamp())) + os.urandom(8)
+    )
+
+
+def _populate_patients(
+    *,
+    collection_factory: Callable[[], pymongo.collection.Collection],
+    patient_count: int,
+    inserted_datetime: Optional[datetime.datetime] = None,
+) -> List[str]:
+    """
+    Populate patient_count collections, each with synthetic documents of a patient.
+
+    If inserted_datetime is provided, documents appear to have been inserted at that time.
+    """
+
+    collection_names = []
+    for patient_current in range(patient_count):
+        collection = collection_factory()
+        collection.insert_many(
+            [
+                {
+                    **(
+                        {"_id": _object_id(inserted_datetime)}
+                        if inserted_datetime
+                        else {}
+                    ),
+                    "_type": "activity",
+                    "_set_id": str(document_current),
+                    "_rev": 1,
+                    "_current": True,
+                    "name": "Activity {} of patient {}".format(
+                        document_current,
+                        patient_current,
+                    ),
+                    "value": "x" * 2000,
+                }
+                for document_current in range(_DOCUMENTS_PER_PATIENT)
+            ]
+        )
+        collection_names.append(collection.name)
+
+    return collection_names
+
+
+def _materialized_export(
+    *,
+    database: pymongo.database.Database,
+    collection_names: List[str],
+    archive_path: Path,
+) -> None:
+    """
+    Export by first reading every document into memory, as done before streaming.
+    """
+
+    entries = {}
+    for collection_name_current in collection_names:
+        for document_current in database[collection_name_current].find(
+            projection={"_current": False}
+        ):
+            entries[
+                Path(
+                    collection_name_current,
+                    "{}.json".format(document_current["_id"]),
+                )
+            ] = document_current
+
+    scope.populate.data.archive.Archive.write_archive(
+        archive=scope.populate.data.archive.Archive(entries=entries),
+        archive_path=archive_path,
+        password=_PASSWORD,
+    )
+
+
+def _measure(export: Callable[[], None]) -> Dict[str, float]:
+    tracemalloc.start()
+    maxrss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    export()
+
+    duration = time.perf_counter() - start
+    maxrss_end = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "duration": duration,
+        "peak_traced": peak,
+        # Process peak only grows, so this is the growth caused by this export
+        "maxrss_growth": (maxrss_end - maxrss_start) * 1024,
+    }
+
+
+def test_benchmark_archive_export(
+    database_client: pymongo.database.Database,
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+    tmp_path: Path,
+):
+    """
+    Measure memory of streaming and materialized export as the database grows.
+    """
+
+    measurements: Dict[int, Dict[str, Dict[str, float]]] = {}
+    for patient_count in _PATIENT_COUNTS:
+        collection_names = _populate_patients(
+            collection_factory=database_temp_collection_factory,
+            patient_count=patient_count,
+        )
+        document_count = patient_count * _DOCUMENTS_PER_PATIENT
+
+        # Stream before materializing, so process peak RSS is not already inflated
+        archive_path_streaming = Path(
+            tmp_path, "streaming_{}.zip".format(patient_count)
+        )
+        progress = []
+        measurements[patient_count] = {
+            "streaming": _measure(
+                lambda: scope.populate.data.rule_archive_export._archive_export(
+                    database=database_client,
+                    archive_path=archive_path_streaming,
+                    password=_PASSWORD,
+                    collection_names=collection_names,
+                    batch_size=_BATCH_SIZE,
+                    progress_callback=progress.append,
+                )
+            ),
+        }
+        archive_path_materialized = Path(
+            tmp_path, "materialized_{}.zip".format(patient_count)
+        )
+        measurements[patient_count]["materialized"] = _measure(
+            lambda: _materialized_export(
+                database=database_client,
+                collection_names=collection_names,
+                archive_path=archive_path_materialized,
+            )
+        )
+
+        # Progress is reported at the end of each collection
+        assert len(progress) == patient_count
+        assert progress[-1].total_documents == document_count
+
+        # Streaming produces the same archive contents
+        archive_streaming = scope.populate.data.archive.Archive.read_archive(
+            archive_path=archive_path_streaming,
+            password=_PASSWORD,
+        )
+        archive_materialized = scope.populate.data.archive.Archive.read_archive(
+            archive_path=archive_path_materialized,
+            password=_PASSWORD,
+        )
+        assert len(archive_streaming.entries) == document_count
+        assert archive_streaming.entries == archive_materialized.entries
+
+    for patient_count, measurements_patients in measurements.items():
+        for export_current, measurements_current in measurements_patients.items():
+            print(
+                "patients={:>5}  {:<12}  {:.0f} documents/s  peak_traced={:.1f}MB  maxrss_growth={:.1f}MB".format(
+                    patient_count,
+                    export_current,
+                    patient_count
+                    * _DOCUMENTS_PER_PATIENT
+                    / measurements_current["duration"],
+                    measurements_current["peak_traced"] / 2**20,
+                    measurements_current["maxrss_growth"] / 2**20,
+                )
+            )
+
+    # Each entry is compressed with a fresh LZMA compressor,
+    # so peak memory includes a large fixed cost regardless of how the export is performed.
+    # Report growth with database size, which streaming should limit to the zip directory.
+    for export_current in ["streaming", "materialized"]:
+        print(
+            "{:<12}  peak_traced growth from {} to {} patients={:.1f}MB".format(
+                export_current,
+                _PATIENT_COUNTS[0],
+                _PATIENT_COUNTS[-1],
+                (
+                    measurements[_PATIENT_COUNTS[-1]][export_current]["peak_traced"]
+                    - measurements[_PATIENT_COUNTS[0]][export_current]["peak_traced"]
+                )
+                / 2**20,
+            )
+        )
+
+
+def test_benchmark_archive_export_parallel(
+    database_client: pymongo.database.Database,
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+    tmp_path: Path,
+):
+    """
+    Parallel export should produce the same entries as serial export.
+    """
+
+    collection_names = _populate_patients(
+        collection_factory=database_temp_collection_factory,
+        patient_count=_PATIENT_COUNTS[0],
+    )
+
+    archives = {}
+    durations = {}
+    for parallelism in _PARALLELISMS:
+        archive_path = Path(tmp_path, "parallelism_{}.zip".format(parallelism))
+
+        start = time.perf_counter()
+        scope.populate.data.rule_archive_export._archive_export(
+            database=database_client,
+            archive_path=archive_path,
+            password=_PASSWORD,
+            collection_names=collection_names,
+            batch_size=_BATCH_SIZE,
+            parallelism=parallelism,
+        )
+        durations[parallelism] = time.perf_counter() - start
+
+        archives[parallelism] = scope.populate.data.archive.Archive.read_archive(
+            archive_path=archive_path,
+            password=_PASSWORD,
+        )
+
+    for parallelism, duration in durations.items():
+        print(
+            "parallelism={:>2}  {:.0f} documents/s".format(
+                parallelism,
+                _PATIENT_COUNTS[0] * _DOCUMENTS_PER_PATIENT / duration,
+            )
+        )
+
+    for parallelism in _PARALLELISMS:
+        assert archives[parallelism].entries == archives[_PARALLELISMS[0]].entries
+
+
+def test_benchmark_archive_export_incremental(
+    database_client: pymongo.database.Database,
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+    tmp_path: Path,
+):
+    """
+    Incremental export should include only documents inserted since the base archive,
+    and applying it to the base should obtain the same entries as a full export.
+    """
+
+    collection_names = _populate_patients(
+        collection_factory=database_temp_collection_factory,
+        patient_count=_PATIENT_COUNTS[0],
+        inserted_datetime=pytz.utc.localize(datetime.datetime.utcnow())
+        - datetime.timedelta(days=1),
+    )
+
+    archive_path_base = Path(tmp_path, "base.zip")
+    start = time.perf_counter()
+    base_count = scope.populate.data.rule_archive_export._archive_export(
+        database=database_client,
+        archive_path=archive_path_base,
+        password=_PASSWORD,
+        collection_names=collection_names,
+    )
+    duration_base = time.perf_counter() - start
+
+    # A day of activity in some collections
+    for collection_name_current in collection_names[0:_INCREMENT_PATIENT_COUNT]:
+        database_client[collection_name_current].insert_one(
+            {
+                "_type": "activity",
+                "_set_id": "0",
+                "_rev": 2,
+                "_current": True,
+                "value": "y" * 2000,
+            }
+        )
+    # As inserted by a restore, which stores the string of an ObjectId
+    database_client[collection_names[0]].insert_one(
+        {
+            "_id": str(bson.ObjectId()),
+            "_type": "activity",
+            "_set_id": "1",
+            "_rev": 2,
+            "_current": True,
+            "value": "y" * 2000,
+        }
+    )
+
+    archive_path_increment = Path(tmp_path, "increment.zip")
+    start = time.perf_counter()
+    increment_count = scope.populate.data.rule_archive_export._archive_export(
+        database=database_client,
+        archive_path=archive_path_increment,
+        password=_PASSWORD,
+        collection_names=collection_names,
+        base_archive_path=archive_path_base,
+    )
+    duration_increment = time.perf_counter() - start
+
+    archive_path_full = Path(tmp_path, "full.zip")
+    scope.populate.data.rule_archive_export._archive_export(
+        database=database_client,
+        archive_path=archive_path_full,
+        password=_PASSWORD,
+        collection_names=collection_names,
+    )
+
+    print(
+        "base={} documents in {:.2f}s  increment={} documents in {:.2f}s  size base={}KB increment={}KB".format(
+            base_count,
+            duration_base,
+            increment_count,
+            duration_increment,
+            archive_path_base.stat().st_size // 1024,
+            archive_path_increment.stat().st_size // 1024,
+        )
+    )
+
+    assert increment_count == _INCREMENT_PATIENT_COUNT + 1
+
+    base = scope.populate.data.archive.Archive.read_archive(
+        archive_path=archive_path_base,
+        password=_PASSWORD,
+    )
+    increment = scope.populate.data.archive.Archive.read_archive(
+        archive_path=archive_path_increment,
+        password=_PASSWORD,
+    )
+    full = scope.populate.data.archive.Archive.read_archive(
+        archive_path=archive_path_full,
+        password=_PASSWORD,
+    )
+    assert increment.manifest["baseArchiveId"] == base.manifest["archiveId"]
+
+    combined = scope.populate.data.archive.Archive.apply_increments(
+        base=base,
+        increments=[increment],
+    )
+    assert combined.entries == full.entries
+
+    # An "_id" that cannot be compared with a high-water mark is rejected
+    database_client[collection_names[0]].insert_one(
+        {
+            "_id": "unordered",
+            "_type": "activity",
+            "_set_id": "2",
+            "_rev": 1,
+        }
+    )
+    with pytest.raises(ValueError):
+        scope.populate.data.rule_archive_export._archive_export(
+            database=database_client,
+            archive_path=Path(tmp_path, "unordered.zip"),
+            password=_PASSWORD,
+            collection_names=collection_names,
+            base_archive_path=archive_path_base,
+        )
+    assert not Path(tmp_path, "unordered.zip").exists()
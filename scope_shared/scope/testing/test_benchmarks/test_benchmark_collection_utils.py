@@ -0,0 +1,84 @@
+import pymongo.collection
+import statistics
+import time
+from typing import Callable, Dict
+
+import scope.database.collection_utils
+
+_REVISION_COUNTS = [1, 10, 100, 1000]
+_READ_REPETITIONS = 20
+
+
+def _populate_revisions(
+    *,
+    collection: pymongo.collection.Collection,
+    revision_count: int,
+) -> None:
+    """
+    Populate a singleton and a set element with revision_count revisions each.
+    """
+
+    documents = []
+    for rev_current in range(1, revision_count + 1):
+        documents.append({"_type": "singleton", "_rev": rev_current})
+        documents.append({"_type": "set", "_set_id": "1", "_rev": rev_current})
+    collection.insert_many(documents)
+
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
+
+def _median_latency(read: Callable[[], object]) -> float:
+    latencies = []
+    for _ in range(_READ_REPETITIONS):
+        start = time.perf_counter()
+        read()
+        latencies.append(time.perf_counter() - start)
+
+    return statistics.median(latencies)
+
+
+def test_benchmark_current_revision_reads(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Measure latest-revision reads as the number of revisions grows.
+    """
+
+    latencies: Dict[int, Dict[str, float]] = {}
+    for revision_count in _REVISION_COUNTS:
+        collection = database_temp_collection_factory()
+        scope.database.collection_utils.ensure_index(collection=collection)
+        _populate_revisions(collection=collection, revision_count=revision_count)
+
+        latencies[revision_count] = {
+            "get_singleton": _median_latency(
+                lambda: scope.database.collection_utils.get_singleton(
+                    collection=collection,
+                    document_type="singleton",
+                )
+            ),
+            "get_set": _median_latency(
+                lambda: scope.database.collection_utils.get_set(
+                    collection=collection,
+                    document_type="set",
+                )
+            ),
+            "get_set_element": _median_latency(
+                lambda: scope.database.collection_utils.get_set_element(
+                    collection=collection,
+                    document_type="set",
+                    set_id="1",
+                )
+            ),
+        }
+
+    for revision_count, latencies_current in latencies.items():
+        print(
+            "revisions={:>5}  {}".format(
+                revision_count,
+                "  ".join(
+                    "{}={:.2f}ms".format(read_current, latency_current * 1000)
+                    for read_current, latency_current in latencies_current.items()
+                ),
+            )
+        )
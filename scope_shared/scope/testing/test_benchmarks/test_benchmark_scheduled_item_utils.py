@@ -0,0 +1,52 @@
+import datetime
+import statistics
+import time
+from typing import Dict
+
+import scope.database.scheduled_item_utils
+import scope.enums
+
+_YEARS_SINCE_START = [0, 1, 5, 10, 25]
+_INITIAL_DATE_REPETITIONS = 200
+
+
+def test_benchmark_initial_date():
+    """
+    Measure finding the initial date as the time since the start date grows.
+    """
+
+    effective_date = datetime.date(2022, 6, 1)
+
+    latencies: Dict[str, Dict[int, float]] = {}
+    for frequency_current in [
+        scope.enums.ScheduledItemFrequency.Biweekly.value,
+        scope.enums.ScheduledItemFrequency.Monthly.value,
+    ]:
+        latencies[frequency_current] = {}
+        for years_current in _YEARS_SINCE_START:
+            start_date = effective_date - datetime.timedelta(days=365 * years_current)
+
+            durations = []
+            for _ in range(_INITIAL_DATE_REPETITIONS):
+                start = time.perf_counter()
+                scope.database.scheduled_item_utils._initial_date(
+                    start_date=start_date,
+                    effective_date=effective_date,
+                    frequency=frequency_current,
+                    repeat_day_flags=None,
+                    day_of_week=scope.enums.DayOfWeek.Monday.value,
+                )
+                durations.append(time.perf_counter() - start)
+
+            latencies[frequency_current][years_current] = statistics.median(durations)
+
+    for frequency_current, latencies_current in latencies.items():
+        print(
+            "{:<10}  {}".format(
+                frequency_current,
+                "  ".join(
+                    "years={}:{:.1f}us".format(years_current, latency_current * 1e6)
+                    for years_current, latency_current in latencies_current.items()
+                ),
+            )
+        )
@@ -0,0 +1,47 @@
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+_IMPORT_REPETITIONS = 5
+
+
+def _median_import_duration(*, statement: str, lazy: bool) -> float:
+    env = dict(os.environ)
+    env.pop("SCOPE_SCHEMA_LAZY", None)
+    if lazy:
+        env["SCOPE_SCHEMA_LAZY"] = "1"
+
+    # Import from this scope_shared, even if another is installed
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(__file__).parents[3])] + [env.get("PYTHONPATH", "")]
+    )
+
+    durations = []
+    for _ in range(_IMPORT_REPETITIONS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, env=env)
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
+
+
+def test_benchmark_schema_import():
+    """
+    Measure `python -c "import scope.schema"`, with schemas constructed eagerly and lazily.
+    """
+
+    durations = {
+        "jschon": _median_import_duration(statement="import jschon", lazy=False),
+        "eager": _median_import_duration(statement="import scope.schema", lazy=False),
+        "lazy": _median_import_duration(statement="import scope.schema", lazy=True),
+        "lazy+activity": _median_import_duration(
+            statement="import scope.schema; scope.schema.activity_schema",
+            lazy=True,
+        ),
+    }
+
+    for import_current, duration_current in durations.items():
+        print("{:<16}  {:.0f}ms".format(import_current, duration_current * 1000))
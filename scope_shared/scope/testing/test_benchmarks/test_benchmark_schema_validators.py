@@ -0,0 +1,69 @@
+import jschon
+import pytest
+import time
+from typing import Callable, Dict
+
+import scope.schema
+import scope.schema_validators
+from scope.testing.test_schemas.test_fake_data_schemas import (
+    TEST_CONFIGS as TEST_CONFIGS_FAKE_DATA,
+)
+
+_VALIDATION_DURATION = 0.2
+
+
+def _validations_per_second(validate: Callable[[], object]) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < _VALIDATION_DURATION:
+        validate()
+        count += 1
+
+    return count / (time.perf_counter() - start)
+
+
+def test_benchmark_schema_validators(request: pytest.FixtureRequest):
+    """
+    Measure compiled validators and evaluation with jschon.
+
+    Covers every schema in scope/schemas/documents for which fake data is available.
+    """
+
+    document_schema_names = [
+        schema_name
+        for schema_name, schema_path in scope.schema.SCHEMAS.items()
+        if schema_path.startswith("documents/")
+        and not schema_path.startswith("documents/utils/")
+    ]
+    schemas = {
+        id(getattr(scope.schema, schema_name)): schema_name
+        for schema_name in document_schema_names
+    }
+
+    rates: Dict[str, Dict[str, float]] = {}
+    for config_current in TEST_CONFIGS_FAKE_DATA:
+        if id(config_current.schema) not in schemas:
+            continue
+
+        schema = config_current.schema
+        data = request.getfixturevalue(config_current.data_factory_fixture)()
+        validator = scope.schema_validators.validator(schema)
+
+        rates[schemas[id(schema)]] = {
+            "jschon": _validations_per_second(
+                lambda: schema.evaluate(jschon.JSON(data)).valid
+            ),
+            "compiled": _validations_per_second(lambda: validator(data)),
+        }
+
+    for schema_name, rates_current in rates.items():
+        print(
+            "{:<32}  jschon={:>9.0f}/s  compiled={:>9.0f}/s  speedup={:>6.1f}x".format(
+                schema_name,
+                rates_current["jschon"],
+                rates_current["compiled"],
+                rates_current["compiled"] / rates_current["jschon"],
+            )
+        )
+
+    assert len(rates) > 0
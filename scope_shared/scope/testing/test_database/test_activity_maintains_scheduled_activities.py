@@ -6,7 +6,7 @@ a put or post to scope.database.patient.activities must maintain the scheduled a
 import datetime
 import pytest
 import pytz
-from typing import Callable
+from typing import Callable, List
 
 import scope.database.collection_utils as collection_utils
 import scope.database.date_utils as date_utils
@@ -14,6 +14,7 @@ import scope.database.patient.activities
 import scope.database.patient.scheduled_activities
 import scope.database.patients
 import scope.database.patient_unsafe_utils as patient_unsafe_utils
+import scope.database.scheduled_item_maintenance as scheduled_item_maintenance
 import scope.database.scheduled_item_utils as scheduled_item_utils
 import scope.enums
 import scope.testing.fixtures_database_temp_patient
@@ -46,6 +47,7 @@ def test_activity_calculate_scheduled_activities_to_create():
                 "reminderTimeOfDay": time_of_day,
             },
             maintenance_datetime=pytz.utc.localize(datetime.datetime(2022, 3, 14, 10)),
+            horizon_datetime=pytz.utc.localize(datetime.datetime(2022, 6, 14, 10)),
         )
     )
     scheduled_dates = []
@@ -386,3 +388,391 @@ def test_activity_put_maintains_scheduled_activities(
     )
 
     assert len(pending_scheduled_activities) == 0
+
+
+def test_activity_put_writes_only_changed_scheduled_activities(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_activity_factory: Callable[[], dict],
+):
+    """
+    Test that maintenance writes only scheduled activities that changed.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    def _count_scheduled_activity_revisions() -> int:
+        return patient_collection.count_documents(
+            {"_type": scope.database.patient.scheduled_activities.DOCUMENT_TYPE}
+        )
+
+    def _get_scheduled_activities() -> List[dict]:
+        return [
+            scheduled_activity_current
+            for scheduled_activity_current in scope.database.patient.scheduled_activities.get_scheduled_activities(
+                collection=patient_collection
+            )
+            or []
+            if scheduled_activity_current[
+                scope.database.patient.activities.SEMANTIC_SET_ID
+            ]
+            == activity_id
+        ]
+
+    # A repeating activity that started in the past, so today's scheduled activity is already due
+    fake_activity = data_fake_activity_factory()
+    fake_activity.update(
+        {
+            "isActive": True,
+            "isDeleted": False,
+            "hasRepetition": True,
+            "timeOfDay": 0,
+            "repeatDayFlags": {
+                day_of_week.value: True for day_of_week in scope.enums.DayOfWeek
+            },
+            "startDateTime": date_utils.format_datetime(
+                pytz.utc.localize(datetime.datetime.utcnow())
+                - datetime.timedelta(days=3)
+            ),
+        }
+    )
+    activity_id = scope.database.patient.activities.post_activity(
+        collection=patient_collection,
+        activity=fake_activity,
+    ).inserted_set_id
+    revision_count = _count_scheduled_activity_revisions()
+    assert revision_count > 0
+
+    # Putting an unchanged activity writes no scheduled activities
+    activity = scope.database.patient.activities.get_activity(
+        collection=patient_collection,
+        set_id=activity_id,
+    )
+    del activity["_id"]
+    scope.database.patient.activities.put_activity(
+        collection=patient_collection,
+        activity=activity,
+        set_id=activity_id,
+    )
+    assert _count_scheduled_activity_revisions() == revision_count
+
+    # Putting an unchanged activity does not duplicate any scheduled activity
+    scheduled_activities = _get_scheduled_activities()
+    assert len(scheduled_activities) == revision_count
+    assert len(
+        set(
+            scheduled_activity_current["dueDate"]
+            for scheduled_activity_current in scheduled_activities
+        )
+    ) == len(scheduled_activities)
+
+    # Renaming an activity writes one revision of each pending scheduled activity
+    pending_count = len(
+        scheduled_item_utils.pending_scheduled_items(
+            scheduled_items=scheduled_activities,
+            after_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+        )
+    )
+    assert pending_count > 0
+    activity = scope.database.patient.activities.get_activity(
+        collection=patient_collection,
+        set_id=activity_id,
+    )
+    del activity["_id"]
+    activity["name"] = "{} renamed".format(activity["name"])
+    scope.database.patient.activities.put_activity(
+        collection=patient_collection,
+        activity=activity,
+        set_id=activity_id,
+    )
+    assert _count_scheduled_activity_revisions() == revision_count + pending_count
+
+    scheduled_activities = _get_scheduled_activities()
+    assert len(scheduled_activities) == revision_count
+    assert all(
+        scheduled_activity_current["activityName"] == activity["name"]
+        for scheduled_activity_current in scheduled_item_utils.pending_scheduled_items(
+            scheduled_items=scheduled_activities,
+            after_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+        )
+    )
+
+
+def test_activity_extend_scheduled_activities(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_activity_factory: Callable[[], dict],
+):
+    """
+    Test that extending the horizon writes only newly scheduled activities.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    def _get_scheduled_activities(activity_id: str) -> List[dict]:
+        return [
+            scheduled_activity_current
+            for scheduled_activity_current in scope.database.patient.scheduled_activities.get_scheduled_activities(
+                collection=patient_collection
+            )
+            or []
+            if scheduled_activity_current[
+                scope.database.patient.activities.SEMANTIC_SET_ID
+            ]
+            == activity_id
+        ]
+
+    # Writes schedule only the short horizon, relying on periodic extension
+    scheduled_item_utils.set_write_horizon(scheduled_item_utils.SHORT_WRITE_HORIZON)
+    try:
+        # A daily activity starting tomorrow, so all its scheduled activities are pending
+        fake_activity = data_fake_activity_factory()
+        fake_activity.update(
+            {
+                "isActive": True,
+                "isDeleted": False,
+                "hasRepetition": True,
+                "repeatDayFlags": {
+                    day_of_week.value: True for day_of_week in scope.enums.DayOfWeek
+                },
+                "startDateTime": date_utils.format_datetime(
+                    pytz.utc.localize(datetime.datetime.utcnow())
+                    + datetime.timedelta(days=1)
+                ),
+            }
+        )
+        activity_id = scope.database.patient.activities.post_activity(
+            collection=patient_collection,
+            activity=fake_activity,
+        ).inserted_set_id
+
+        # Writing the activity schedules only the short horizon
+        written_scheduled_activities = _get_scheduled_activities(activity_id)
+        assert 14 <= len(written_scheduled_activities) <= 16
+
+        # Extending schedules the extended horizon, retaining existing scheduled activities
+        scope.database.patient.activities.extend_scheduled_activities(
+            collection=patient_collection,
+            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+            horizon=datetime.timedelta(weeks=4),
+        )
+        extended_scheduled_activities = _get_scheduled_activities(activity_id)
+        assert 28 <= len(extended_scheduled_activities) <= 30
+        assert all(
+            written_scheduled_activity_current in extended_scheduled_activities
+            for written_scheduled_activity_current in written_scheduled_activities
+        )
+
+        # Extending again writes nothing
+        revision_count = patient_collection.count_documents(
+            {"_type": scope.database.patient.scheduled_activities.DOCUMENT_TYPE}
+        )
+        scope.database.patient.activities.extend_scheduled_activities(
+            collection=patient_collection,
+            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+            horizon=datetime.timedelta(weeks=4),
+        )
+        assert (
+            patient_collection.count_documents(
+                {"_type": scope.database.patient.scheduled_activities.DOCUMENT_TYPE}
+            )
+            == revision_count
+        )
+
+        # A later write of the activity does not shorten the extended schedule
+        activity = scope.database.patient.activities.get_activity(
+            collection=patient_collection,
+            set_id=activity_id,
+        )
+        del activity["_id"]
+        scope.database.patient.activities.put_activity(
+            collection=patient_collection,
+            activity=activity,
+            set_id=activity_id,
+        )
+        assert _get_scheduled_activities(activity_id) == extended_scheduled_activities
+    finally:
+        scheduled_item_utils.set_write_horizon(scheduled_item_utils.EXTENDED_HORIZON)
+
+
+def test_activity_extend_scheduled_activities_started_in_past(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_activity_factory: Callable[[], dict],
+):
+    """
+    Test that repeatedly extending a schedule which started in the past does not duplicate scheduled activities.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    def _get_scheduled_activities(activity_id: str) -> List[dict]:
+        return [
+            scheduled_activity_current
+            for scheduled_activity_current in scope.database.patient.scheduled_activities.get_scheduled_activities(
+                collection=patient_collection
+            )
+            or []
+            if scheduled_activity_current[
+                scope.database.patient.activities.SEMANTIC_SET_ID
+            ]
+            == activity_id
+        ]
+
+    def _count_scheduled_activity_revisions() -> int:
+        return patient_collection.count_documents(
+            {"_type": scope.database.patient.scheduled_activities.DOCUMENT_TYPE}
+        )
+
+    # A daily activity that started in the past, so today's scheduled activity is already due
+    now = pytz.utc.localize(datetime.datetime.utcnow())
+    fake_activity = data_fake_activity_factory()
+    fake_activity.update(
+        {
+            "isActive": True,
+            "isDeleted": False,
+            "hasRepetition": True,
+            "timeOfDay": 0,
+            "repeatDayFlags": {
+                day_of_week.value: True for day_of_week in scope.enums.DayOfWeek
+            },
+            "startDateTime": date_utils.format_datetime(
+                now - datetime.timedelta(days=3)
+            ),
+        }
+    )
+    activity_id = scope.database.patient.activities.post_activity(
+        collection=patient_collection,
+        activity=fake_activity,
+    ).inserted_set_id
+
+    # Nightly extension writes only scheduled activities with a new due date
+    for day_current in range(4):
+        scheduled_activities = _get_scheduled_activities(activity_id)
+        revision_count = _count_scheduled_activity_revisions()
+
+        scope.database.patient.activities.extend_scheduled_activities(
+            collection=patient_collection,
+            maintenance_datetime=now + datetime.timedelta(days=day_current),
+            horizon=datetime.timedelta(weeks=4),
+        )
+
+        extended_scheduled_activities = _get_scheduled_activities(activity_id)
+        due_dates = [
+            scheduled_activity_current["dueDate"]
+            for scheduled_activity_current in extended_scheduled_activities
+        ]
+        assert len(set(due_dates)) == len(due_dates)
+        assert all(
+            scheduled_activity_current in extended_scheduled_activities
+            for scheduled_activity_current in scheduled_activities
+        )
+        assert _count_scheduled_activity_revisions() == revision_count + len(
+            extended_scheduled_activities
+        ) - len(scheduled_activities)
+
+
+def test_activity_dispatches_scheduled_activities_maintenance(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_activity_factory: Callable[[], dict],
+):
+    """
+    Test that a dispatcher receives maintenance, and that maintenance of a replaced revision is dropped.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    def _get_scheduled_activities(activity_id: str) -> List[dict]:
+        return [
+            scheduled_activity_current
+            for scheduled_activity_current in scope.database.patient.scheduled_activities.get_scheduled_activities(
+                collection=patient_collection
+            )
+            or []
+            if scheduled_activity_current[
+                scope.database.patient.activities.SEMANTIC_SET_ID
+            ]
+            == activity_id
+        ]
+
+    dispatched: List[scheduled_item_maintenance.ScheduledItemMaintenance] = []
+    scheduled_item_maintenance.set_scheduled_item_maintenance_dispatcher(
+        dispatched.append
+    )
+    try:
+        fake_activity = data_fake_activity_factory()
+        fake_activity.update(
+            {
+                "isActive": True,
+                "isDeleted": False,
+                "hasRepetition": True,
+                "repeatDayFlags": {
+                    day_of_week.value: True for day_of_week in scope.enums.DayOfWeek
+                },
+                "startDateTime": date_utils.format_datetime(
+                    pytz.utc.localize(datetime.datetime.utcnow())
+                    + datetime.timedelta(days=1)
+                ),
+            }
+        )
+        activity_id = scope.database.patient.activities.post_activity(
+            collection=patient_collection,
+            activity=fake_activity,
+        ).inserted_set_id
+
+        # Maintenance was dispatched instead of performed
+        assert dispatched == [
+            scheduled_item_maintenance.ScheduledItemMaintenance(
+                collection_name=patient_collection.name,
+                document_type=scope.database.patient.activities.DOCUMENT_TYPE,
+                set_id=activity_id,
+                rev=1,
+            )
+        ]
+        assert _get_scheduled_activities(activity_id) == []
+
+        activity = scope.database.patient.activities.get_activity(
+            collection=patient_collection,
+            set_id=activity_id,
+        )
+        del activity["_id"]
+        scope.database.patient.activities.put_activity(
+            collection=patient_collection,
+            activity=activity,
+            set_id=activity_id,
+        )
+        assert [dispatched_current.rev for dispatched_current in dispatched] == [1, 2]
+    finally:
+        scheduled_item_maintenance.set_scheduled_item_maintenance_dispatcher(None)
+
+    # Maintenance of the replaced revision is dropped
+    assert not scope.database.patient.activities.maintain_scheduled_activities(
+        collection=patient_collection,
+        set_id=activity_id,
+        rev=1,
+        maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+    )
+    assert _get_scheduled_activities(activity_id) == []
+
+    # Maintenance of the current revision is performed, and is idempotent
+    for _ in range(2):
+        assert scope.database.patient.activities.maintain_scheduled_activities(
+            collection=patient_collection,
+            set_id=activity_id,
+            rev=2,
+            maintenance_datetime=pytz.utc.localize(datetime.datetime.utcnow()),
+        )
+        assert 91 <= len(_get_scheduled_activities(activity_id)) <= 93
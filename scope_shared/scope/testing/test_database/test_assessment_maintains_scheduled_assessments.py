@@ -5,7 +5,7 @@ a put to scope.database.patient.assessments must maintain the scheduled assessme
 
 import datetime
 import pytz
-from typing import Callable
+from typing import Callable, List
 
 import scope.database.date_utils as date_utils
 import scope.database.patient.assessments
@@ -29,6 +29,7 @@ def test_assessment_calculate_scheduled_assessments_to_create():
                 "frequency": scope.enums.ScheduledItemFrequency.Daily.value,
             },
             maintenance_datetime=pytz.utc.localize(datetime.datetime(2022, 3, 14, 10)),
+            horizon_datetime=pytz.utc.localize(datetime.datetime(2022, 6, 14, 10)),
         )
     )
 
@@ -295,3 +296,89 @@ def test_assessment_put_maintains_scheduled_assessments(
     )
 
     assert len(pending_scheduled_assessments) == 0
+
+
+def test_assessment_extend_scheduled_assessments_assigned_in_past(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_assessment_factory: Callable[[], dict],
+):
+    """
+    Test that repeatedly extending a schedule which started in the past does not duplicate scheduled assessments.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    def _get_scheduled_assessments(assessment_id: str) -> List[dict]:
+        return [
+            scheduled_assessment_current
+            for scheduled_assessment_current in scope.database.patient.scheduled_assessments.get_scheduled_assessments(
+                collection=patient_collection
+            )
+            or []
+            if scheduled_assessment_current[
+                scope.database.patient.assessments.SEMANTIC_SET_ID
+            ]
+            == assessment_id
+        ]
+
+    def _count_scheduled_assessment_revisions() -> int:
+        return patient_collection.count_documents(
+            {"_type": scope.database.patient.scheduled_assessments.DOCUMENT_TYPE}
+        )
+
+    # Maintain as of noon in the scheduling time zone,
+    # so today's scheduled assessment at 8am is already due
+    timezone = pytz.timezone("America/Los_Angeles")
+    maintenance_date = datetime.datetime.now(timezone).date()
+    maintenance_datetime = timezone.localize(
+        datetime.datetime.combine(maintenance_date, datetime.time(hour=12))
+    ).astimezone(pytz.utc)
+
+    # A weekly assessment due today, assigned in the past
+    fake_assessment = data_fake_assessment_factory()
+    assessment_id = fake_assessment[scope.database.patient.assessments.SEMANTIC_SET_ID]
+    fake_assessment.update(
+        {
+            "assigned": True,
+            "assignedDateTime": date_utils.format_datetime(
+                maintenance_datetime - datetime.timedelta(weeks=3)
+            ),
+            "frequency": scope.enums.ScheduledItemFrequency.Weekly.value,
+            "dayOfWeek": list(scope.enums.DayOfWeek)[maintenance_date.weekday()].value,
+        }
+    )
+    patient_unsafe_utils.unsafe_update_assessment(
+        collection=patient_collection,
+        set_id=assessment_id,
+        assessment_complete=fake_assessment,
+    )
+
+    # Extension on each due date writes only scheduled assessments with a new due date
+    for week_current in range(4):
+        scheduled_assessments = _get_scheduled_assessments(assessment_id)
+        revision_count = _count_scheduled_assessment_revisions()
+
+        scope.database.patient.assessments.extend_scheduled_assessments(
+            collection=patient_collection,
+            maintenance_datetime=maintenance_datetime
+            + datetime.timedelta(weeks=week_current),
+            horizon=datetime.timedelta(weeks=4),
+        )
+
+        extended_scheduled_assessments = _get_scheduled_assessments(assessment_id)
+        due_dates = [
+            scheduled_assessment_current["dueDate"]
+            for scheduled_assessment_current in extended_scheduled_assessments
+        ]
+        assert len(set(due_dates)) == len(due_dates)
+        assert all(
+            scheduled_assessment_current in extended_scheduled_assessments
+            for scheduled_assessment_current in scheduled_assessments
+        )
+        assert _count_scheduled_assessment_revisions() == revision_count + len(
+            extended_scheduled_assessments
+        ) - len(scheduled_assessments)
@@ -2,6 +2,9 @@
 Module testing collection_utils.
 """
 
+from scope.testing.test_database.test_collection_utils.test_current_revision import *
 from scope.testing.test_database.test_collection_utils.test_ensure_index import *
 from scope.testing.test_database.test_collection_utils.test_set import *
+from scope.testing.test_database.test_collection_utils.test_set_bulk import *
 from scope.testing.test_database.test_collection_utils.test_singleton import *
+from scope.testing.test_database.test_collection_utils.test_types import *
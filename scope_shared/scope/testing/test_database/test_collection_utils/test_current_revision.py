@@ -0,0 +1,172 @@
+import pymongo.collection
+from typing import Callable
+
+import scope.database.collection_utils
+
+
+def _current_revisions(*, collection: pymongo.collection.Collection) -> list:
+    """
+    Obtain (_type, _set_id, _rev) of every document marked current.
+    """
+
+    return sorted(
+        (
+            document_current["_type"],
+            document_current.get("_set_id", ""),
+            document_current["_rev"],
+        )
+        for document_current in collection.find({"_current": True})
+    )
+
+
+def test_put_singleton_maintains_current_revision(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Each put of a singleton should leave only its latest revision marked current.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    document = {}
+    for _ in range(3):
+        result = scope.database.collection_utils.put_singleton(
+            collection=collection,
+            document_type="singleton",
+            document=document,
+        )
+        document = result.document
+        del document["_id"]
+
+    assert _current_revisions(collection=collection) == [("singleton", "", 3)]
+
+    # The marker is not part of the document
+    result = scope.database.collection_utils.get_singleton(
+        collection=collection,
+        document_type="singleton",
+    )
+    assert "_current" not in result
+    assert result["_rev"] == 3
+
+
+def test_put_set_element_maintains_current_revision(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Each put of a set element should leave only its latest revision marked current.
+    Other elements of the set should not be affected.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    result_post = scope.database.collection_utils.post_set_element(
+        collection=collection,
+        document_type="set",
+        semantic_set_id=None,
+        document={},
+    )
+    document = {}
+    for _ in range(3):
+        result = scope.database.collection_utils.put_set_element(
+            collection=collection,
+            document_type="set",
+            semantic_set_id=None,
+            set_id="set_id",
+            document=document,
+        )
+        document = result.document
+        del document["_id"]
+
+    assert _current_revisions(collection=collection) == sorted(
+        [
+            ("set", result_post.inserted_set_id, 1),
+            ("set", "set_id", 3),
+        ]
+    )
+
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="set",
+    )
+    assert len(result) == 2
+    for document_current in result:
+        assert "_current" not in document_current
+
+
+def test_ensure_current_revisions(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Documents inserted directly should be marked by ensure_current_revisions.
+    Any stale marker should be removed.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    collection.insert_many(
+        [
+            {"_type": "singleton", "_rev": 1, "_current": True},
+            {"_type": "singleton", "_rev": 2},
+            {"_type": "set", "_set_id": "1", "_rev": 1},
+            {"_type": "set", "_set_id": "1", "_rev": 2},
+            {"_type": "set", "_set_id": "2", "_rev": 1},
+        ]
+    )
+
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
+    expected = [
+        ("set", "1", 2),
+        ("set", "2", 1),
+        ("singleton", "", 2),
+    ]
+    assert _current_revisions(collection=collection) == expected
+
+    # Should be idempotent
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
+    assert _current_revisions(collection=collection) == expected
+
+
+def test_ensure_current_revisions_batches(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Marking and unmarking in batches smaller than the number of documents should have the same result.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    documents = []
+    for set_id_current in range(5):
+        documents.extend(
+            [
+                {
+                    "_type": "set",
+                    "_set_id": str(set_id_current),
+                    "_rev": 1,
+                    "_current": True,
+                },
+                {"_type": "set", "_set_id": str(set_id_current), "_rev": 2},
+                {
+                    "_type": "set",
+                    "_set_id": str(set_id_current),
+                    "_rev": 3,
+                    "_current": set_id_current % 2 == 0,
+                },
+            ]
+        )
+    collection.insert_many(documents)
+
+    scope.database.collection_utils.ensure_current_revisions(
+        collection=collection,
+        batch_size=2,
+    )
+
+    assert _current_revisions(collection=collection) == [
+        ("set", str(set_id_current), 3) for set_id_current in range(5)
+    ]
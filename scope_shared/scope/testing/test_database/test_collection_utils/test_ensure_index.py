@@ -5,25 +5,31 @@ from typing import Callable
 import scope.database.collection_utils
 
 
-def assert_collection_utils_index(*, collection: pymongo.collection.Collection):
+def assert_collection_utils_index(
+    *,
+    collection: pymongo.collection.Collection,
+    indices: dict = scope.database.collection_utils.COLLECTION_INDICES,
+):
     """
     Assert the provided collection has exactly our expected index.
     """
 
     index_information = collection.index_information()
 
-    # Index should include "_id_" plus our desired index
-    assert list(index_information.keys()) == [
+    # Index should include "_id_" plus our desired indices
+    assert set(index_information.keys()) == {
         "_id_",
-        scope.database.collection_utils.PRIMARY_COLLECTION_INDEX_NAME,
-    ]
+        *indices.keys(),
+    }
 
-    # Check properties of our desired index
-    index = index_information[
-        scope.database.collection_utils.PRIMARY_COLLECTION_INDEX_NAME
-    ]
-    assert index["key"] == scope.database.collection_utils.PRIMARY_COLLECTION_INDEX
-    assert index["unique"]
+    # Check properties of our desired indices
+    for (
+        index_name,
+        (index_keys, index_unique),
+    ) in indices.items():
+        index = index_information[index_name]
+        assert index["key"] == index_keys
+        assert index.get("unique", False) == index_unique
 
 
 def test_index_creation(
@@ -39,6 +45,30 @@ def test_index_creation(
     assert_collection_utils_index(collection=collection)
 
 
+def test_index_creation_identity(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Test the expected identity collection index is created,
+    and that the default indices then remove it.
+    """
+    collection = database_temp_collection_factory()
+
+    scope.database.collection_utils.ensure_index(
+        collection=collection,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
+    )
+
+    assert_collection_utils_index(
+        collection=collection,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
+    )
+
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    assert_collection_utils_index(collection=collection)
+
+
 def test_index_removal(
     database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
 ):
@@ -37,6 +37,9 @@ def _configure_collection(*, collection: pymongo.collection.Collection) -> None:
     )
     assert len(result.inserted_ids) == 10
 
+    # Documents were inserted directly, mark their current revisions
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
 
 def test_get_set(
     database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
@@ -62,6 +65,85 @@ def test_get_set(
     ]
 
 
+def test_get_set_element_query(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Test retrieval of a set filtered by a query on the current revision of each element.
+    """
+    collection = database_temp_collection_factory()
+    _configure_collection(collection=collection)
+
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="set",
+        element_query={"_set_id": "2"},
+    )
+
+    # Remove the "_id" field that was created upon insertion
+    for result_current in result:
+        del result_current["_id"]
+
+    assert result == [
+        {"_type": "set", "_set_id": "2", "_rev": "2"},
+    ]
+
+    # A query matching only replaced revisions matches nothing in an existing set
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="set",
+        element_query={"_rev": "1"},
+    )
+
+    assert result == []
+
+    # A set that does not exist is not found
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="nothing",
+        element_query={"_rev": "1"},
+    )
+
+    assert result is None
+
+
+def test_get_set_element_query_replaced_revision_marked_current(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Test a filtered retrieval while a write has not yet unmarked the revision it replaced.
+
+    The replaced revision must not be returned as if it were current.
+    """
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    # Both revisions of element "1" are marked, as between the steps of a write
+    collection.insert_many(
+        [
+            {"_type": "set", "_set_id": "1", "_rev": 1, "_current": True},
+            {
+                "_type": "set",
+                "_set_id": "1",
+                "_rev": 2,
+                "_current": True,
+                "_deleted": True,
+            },
+            {"_type": "set", "_set_id": "2", "_rev": 1, "_current": True},
+        ]
+    )
+
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="set",
+        element_query={"_deleted": {"$ne": True}},
+    )
+
+    assert [
+        (result_current["_set_id"], result_current["_rev"]) for result_current in result
+    ] == [("2", 1)]
+
+
 def test_get_set_not_found(
     database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
 ):
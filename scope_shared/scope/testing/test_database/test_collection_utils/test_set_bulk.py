@@ -0,0 +1,194 @@
+import pymongo.collection
+import pymongo.errors
+import pytest
+from typing import Callable
+
+import scope.database.collection_utils
+
+
+def test_post_set_elements(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Test posting multiple set elements.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    results = scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type="set",
+        semantic_set_id="semanticSetId",
+        documents=[{"value": value_current} for value_current in range(5)],
+    )
+
+    # Results are in the order of the documents
+    assert [result_current.document["value"] for result_current in results] == list(
+        range(5)
+    )
+    assert len({result_current.inserted_set_id for result_current in results}) == 5
+    for result_current in results:
+        assert result_current.inserted_count == 1
+        assert result_current.inserted_id == result_current.document["_id"]
+        assert result_current.document["_set_id"] == result_current.inserted_set_id
+        assert (
+            result_current.document["semanticSetId"] == result_current.inserted_set_id
+        )
+        assert result_current.document["_rev"] == 1
+
+        assert (
+            scope.database.collection_utils.get_set_element(
+                collection=collection,
+                document_type="set",
+                set_id=result_current.inserted_set_id,
+            )
+            == result_current.document
+        )
+
+    # Nothing to post
+    assert (
+        scope.database.collection_utils.post_set_elements(
+            collection=collection,
+            document_type="set",
+            semantic_set_id=None,
+            documents=[],
+        )
+        == []
+    )
+
+
+def test_post_set_elements_invalid(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Any invalid document should prevent posting of all documents.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    with pytest.raises(ValueError):
+        scope.database.collection_utils.post_set_elements(
+            collection=collection,
+            document_type="set",
+            semantic_set_id=None,
+            documents=[{}, {"_rev": 1}],
+        )
+
+    assert collection.count_documents({}) == 0
+
+
+def test_put_set_elements(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Test putting multiple set elements.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    results_post = scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type="set",
+        semantic_set_id=None,
+        documents=[{}, {}, {}],
+    )
+
+    documents = []
+    for result_current in results_post:
+        document_current = dict(result_current.document, value="updated")
+        del document_current["_id"]
+        documents.append(document_current)
+
+    results_put = scope.database.collection_utils.put_set_elements(
+        collection=collection,
+        document_type="set",
+        semantic_set_id=None,
+        documents=documents,
+    )
+
+    assert [result_current.inserted_set_id for result_current in results_put] == [
+        result_current.inserted_set_id for result_current in results_post
+    ]
+    for result_current in results_put:
+        assert result_current.document["_rev"] == 2
+        assert result_current.document["value"] == "updated"
+
+    # Only the new revisions are current
+    result = scope.database.collection_utils.get_set(
+        collection=collection,
+        document_type="set",
+    )
+    assert len(result) == 3
+    for document_current in result:
+        assert document_current["_rev"] == 2
+    assert collection.count_documents({"_current": True}) == 3
+
+
+def test_put_set_elements_requires_set_id(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Documents put in bulk must identify their set element.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    with pytest.raises(ValueError):
+        scope.database.collection_utils.put_set_elements(
+            collection=collection,
+            document_type="set",
+            semantic_set_id=None,
+            documents=[{}],
+        )
+
+
+def test_put_set_elements_duplicate(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    A conflicting revision should fail without preventing the others.
+    """
+
+    collection = database_temp_collection_factory()
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    results_post = scope.database.collection_utils.post_set_elements(
+        collection=collection,
+        document_type="set",
+        semantic_set_id=None,
+        documents=[{}, {}],
+    )
+    set_id_conflict = results_post[0].inserted_set_id
+    set_id_success = results_post[1].inserted_set_id
+
+    # Put a revision that the bulk put will then conflict with
+    scope.database.collection_utils.put_set_element(
+        collection=collection,
+        document_type="set",
+        semantic_set_id=None,
+        set_id=set_id_conflict,
+        document={"_rev": 1},
+    )
+
+    with pytest.raises(pymongo.errors.BulkWriteError):
+        scope.database.collection_utils.put_set_elements(
+            collection=collection,
+            document_type="set",
+            semantic_set_id=None,
+            documents=[
+                {"_set_id": set_id_conflict, "_rev": 1},
+                {"_set_id": set_id_success, "_rev": 1},
+            ],
+        )
+
+    result = scope.database.collection_utils.get_set_element(
+        collection=collection,
+        document_type="set",
+        set_id=set_id_success,
+    )
+    assert result["_rev"] == 2
+    assert collection.count_documents({"_current": True}) == 2
@@ -24,6 +24,9 @@ def _configure_collection_data(*, collection: pymongo.collection.Collection) ->
     )
     assert len(result.inserted_ids) == 10
 
+    # Documents were inserted directly, mark their current revisions
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
 
 def test_get_singleton(
     database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
@@ -0,0 +1,99 @@
+import pymongo.collection
+import pytest
+from typing import Callable
+
+import scope.database.collection_utils
+
+
+def _configure_collection(*, collection: pymongo.collection.Collection) -> None:
+    scope.database.collection_utils.ensure_index(collection=collection)
+
+    collection.insert_many(
+        [
+            {"_type": "singleton", "_rev": 1},
+            {"_type": "singleton", "_rev": 2},
+            {"_type": "other singleton", "_rev": 1},
+            {"_type": "set", "_set_id": "1", "_rev": 1},
+            {"_type": "set", "_set_id": "1", "_rev": 2},
+            {"_type": "set", "_set_id": "2", "_rev": 1},
+            {"_type": "other set", "_set_id": "1", "_rev": 1},
+        ]
+    )
+
+    # Documents were inserted directly, mark their current revisions
+    scope.database.collection_utils.ensure_current_revisions(collection=collection)
+
+
+def test_get_types(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Retrieval of multiple types should match retrieval of each type.
+    """
+
+    collection = database_temp_collection_factory()
+    _configure_collection(collection=collection)
+
+    singleton_types = ["singleton", "other singleton", "missing singleton"]
+    set_types = ["set", "other set", "missing set"]
+
+    result = scope.database.collection_utils.get_types(
+        collection=collection,
+        singleton_types=singleton_types,
+        set_types=set_types,
+    )
+
+    assert result.keys() == set(singleton_types + set_types)
+    for singleton_type_current in singleton_types:
+        assert result[
+            singleton_type_current
+        ] == scope.database.collection_utils.get_singleton(
+            collection=collection,
+            document_type=singleton_type_current,
+        )
+    for set_type_current in set_types:
+        assert result[set_type_current] == scope.database.collection_utils.get_set(
+            collection=collection,
+            document_type=set_type_current,
+        )
+
+    assert result["singleton"]["_rev"] == 2
+    assert result["missing singleton"] is None
+    assert len(result["set"]) == 2
+    assert result["missing set"] is None
+
+
+def test_get_types_empty(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    Retrieval of no types should not query the collection.
+    """
+
+    collection = database_temp_collection_factory()
+
+    assert (
+        scope.database.collection_utils.get_types(
+            collection=collection,
+            singleton_types=[],
+            set_types=[],
+        )
+        == {}
+    )
+
+
+def test_get_types_overlapping(
+    database_temp_collection_factory: Callable[[], pymongo.collection.Collection],
+):
+    """
+    A type cannot be retrieved as both a singleton and a set.
+    """
+
+    collection = database_temp_collection_factory()
+
+    with pytest.raises(ValueError):
+        scope.database.collection_utils.get_types(
+            collection=collection,
+            singleton_types=["type"],
+            set_types=["type"],
+        )
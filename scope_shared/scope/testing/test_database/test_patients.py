@@ -1,11 +1,13 @@
 import copy
 import pymongo.database
+from typing import Callable
 
 import scope.database.collection_utils
 import scope.database.patient.patient_profile
 import scope.database.patients
 import scope.schema
 import scope.schema_utils as schema_utils
+import scope.testing.fixtures_database_temp_patient
 
 
 def test_patient_create_get_delete(
@@ -239,3 +241,98 @@ def test_patient_identity_update(
             patient_id=created_patient_identity["patientId"],
             destructive=True,
         )
+
+
+def test_patient_identities_page(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    database_client: pymongo.database.Database,
+):
+    """
+    Test that pages of patient identities together include every patient identity.
+    """
+
+    created_ids = [database_temp_patient_factory().patient_id for _ in range(5)]
+
+    retrieved_ids = []
+    after_patient_id = None
+    while True:
+        page = scope.database.patients.get_patient_identities_page(
+            database=database_client,
+            limit=2,
+            after_patient_id=after_patient_id,
+        )
+        assert len(page.documents) <= 2
+
+        retrieved_ids.extend(
+            patient_identity_current["_set_id"]
+            for patient_identity_current in page.documents
+        )
+
+        after_patient_id = page.next_set_id
+        if after_patient_id is None:
+            break
+
+    # Pages are ordered and do not overlap
+    assert retrieved_ids == sorted(set(retrieved_ids))
+    assert all(patient_id in retrieved_ids for patient_id in created_ids)
+    assert len(retrieved_ids) == len(
+        scope.database.patients.get_patient_identities(database=database_client)
+    )
+
+
+def test_patient_identity_by_cognito_id(
+    database_client: pymongo.database.Database,
+):
+    """
+    Test retrieving a patient identity by the id of its Cognito account.
+    """
+
+    # Create patient
+    created_patient_identity = scope.database.patients.create_patient(
+        database=database_client,
+        patient_name="TEST NAME",
+        patient_mrn="TEST MRN",
+    )
+
+    try:
+        cognito_id = scope.database.collection_utils.generate_set_id()
+
+        # No patient has this account
+        assert (
+            scope.database.patients.get_patient_identity_by_cognito_id(
+                database=database_client,
+                cognito_id=cognito_id,
+            )
+            is None
+        )
+
+        # Associate the account with the patient
+        modified_patient_identity = copy.deepcopy(created_patient_identity)
+        modified_patient_identity["cognitoAccount"] = {
+            "cognitoId": cognito_id,
+            "email": "test@example.com",
+        }
+        del modified_patient_identity["_id"]
+
+        result = scope.database.patients.put_patient_identity(
+            database=database_client,
+            patient_id=created_patient_identity["_set_id"],
+            patient_identity=modified_patient_identity,
+        )
+
+        retrieved_patient_identity = (
+            scope.database.patients.get_patient_identity_by_cognito_id(
+                database=database_client,
+                cognito_id=cognito_id,
+            )
+        )
+        assert retrieved_patient_identity == result.document
+    finally:
+        scope.database.patients.delete_patient(
+            database=database_client,
+            patient_id=created_patient_identity["_set_id"],
+            destructive=True,
+        )
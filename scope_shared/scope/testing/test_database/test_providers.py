@@ -2,6 +2,7 @@ import copy
 from typing import Callable
 
 import pymongo.database
+import scope.database.collection_utils
 import scope.database.providers
 import scope.schema
 import scope.schema_utils as schema_utils
@@ -137,3 +138,64 @@ def test_provider_identity_update(
             provider_id=created_provider_id,
             destructive=True,
         )
+
+
+def test_provider_identity_by_cognito_id(
+    database_client: pymongo.database.Database,
+    data_fake_provider_identity_factory: Callable[[], dict],
+):
+    """
+    Test retrieving a provider identity by the id of its Cognito account.
+    """
+
+    data_fake_provider = data_fake_provider_identity_factory()
+
+    # Create provider
+    created_provider_identity = scope.database.providers.create_provider(
+        database=database_client,
+        name=data_fake_provider["name"],
+        role=data_fake_provider["role"],
+    )
+    created_provider_id = created_provider_identity[
+        scope.database.providers.PROVIDER_IDENTITY_SEMANTIC_SET_ID
+    ]
+
+    try:
+        cognito_id = scope.database.collection_utils.generate_set_id()
+
+        # No provider has this account
+        assert (
+            scope.database.providers.get_provider_identity_by_cognito_id(
+                database=database_client,
+                cognito_id=cognito_id,
+            )
+            is None
+        )
+
+        # Associate the account with the provider
+        modified_provider_identity = copy.deepcopy(created_provider_identity)
+        modified_provider_identity["cognitoAccount"] = {
+            "cognitoId": cognito_id,
+            "email": "test@example.com",
+        }
+        del modified_provider_identity["_id"]
+
+        result = scope.database.providers.put_provider_identity(
+            database=database_client,
+            provider_id=created_provider_id,
+            provider_identity=modified_provider_identity,
+        )
+
+        retrieved_provider_identity = (
+            scope.database.providers.get_provider_identity_by_cognito_id(
+                database=database_client,
+                cognito_id=cognito_id,
+            )
+        )
+        assert retrieved_provider_identity == result.document
+    finally:
+        scope.database.providers.delete_provider(
+            database=database_client,
+            provider_id=created_provider_id,
+            destructive=True,
+        )
@@ -0,0 +1,176 @@
+import copy
+import datetime
+import pytz
+from typing import Callable, List
+
+import scope.database.date_utils as date_utils
+import scope.database.patient.scheduled_activities
+import scope.database.patient.scheduled_assessments
+import scope.testing.fixtures_database_temp_patient
+
+
+def _due_datetime(*, day: int) -> datetime.datetime:
+    return pytz.utc.localize(datetime.datetime(2022, 3, day, 15))
+
+
+def _assert_query(
+    *,
+    get_function: Callable,
+    collection,
+    documents: List[dict],
+    set_ids: List[str],
+    due_after: datetime.datetime = None,
+    due_before: datetime.datetime = None,
+    completed: bool = None,
+):
+    expected = [
+        document_current
+        for document_current in documents
+        if (
+            due_after is None
+            or date_utils.parse_datetime(document_current["dueDateTime"]) >= due_after
+        )
+        and (
+            due_before is None
+            or date_utils.parse_datetime(document_current["dueDateTime"]) < due_before
+        )
+        and (completed is None or document_current["completed"] == completed)
+    ]
+
+    result = get_function(
+        collection=collection,
+        due_after=due_after,
+        due_before=due_before,
+        completed=completed,
+    )
+    result = [
+        result_current
+        for result_current in result or []
+        if result_current["_set_id"] in set_ids
+    ]
+
+    def _sort_key(document: dict) -> str:
+        return document["_set_id"]
+
+    assert sorted(result, key=_sort_key) == sorted(expected, key=_sort_key)
+
+
+def _test_query_scheduled_items(
+    *,
+    collection,
+    fake_scheduled_items: List[dict],
+    post_function: Callable,
+    delete_function: Callable,
+    get_function: Callable,
+):
+    # Scheduled items due on consecutive days, alternating completed
+    fake_scheduled_item_microseconds = copy.deepcopy(fake_scheduled_items[0])
+    documents = []
+    for index_current, fake_scheduled_item_current in enumerate(
+        fake_scheduled_items[:6]
+    ):
+        fake_scheduled_item_current.update(
+            {
+                "dueDateTime": date_utils.format_datetime(
+                    _due_datetime(day=10 + index_current)
+                ),
+                "completed": index_current % 2 == 1,
+            }
+        )
+        documents.append(post_function(fake_scheduled_item_current).document)
+
+    # A deleted scheduled item is never returned
+    delete_function(documents.pop())
+
+    # A scheduled item due with microseconds, in the same second as a query bound
+    fake_scheduled_item_microseconds.update(
+        {
+            "dueDateTime": (
+                _due_datetime(day=12) + datetime.timedelta(microseconds=500000)
+            ).strftime(date_utils.DATETIME_FORMAT_COMPLETE),
+            "completed": False,
+        }
+    )
+    documents.append(post_function(fake_scheduled_item_microseconds).document)
+
+    set_ids = [document_current["_set_id"] for document_current in documents]
+
+    for query_current in [
+        {},
+        {"completed": False},
+        {"completed": True},
+        {"due_after": _due_datetime(day=12)},
+        {"due_before": _due_datetime(day=12)},
+        {
+            "due_after": _due_datetime(day=11),
+            "due_before": _due_datetime(day=14),
+            "completed": False,
+        },
+    ]:
+        _assert_query(
+            get_function=get_function,
+            collection=collection,
+            documents=documents,
+            set_ids=set_ids,
+            **query_current,
+        )
+
+
+def test_query_scheduled_activities(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_scheduled_activities_factory: Callable[[], List[dict]],
+):
+    """
+    Test that scheduled activities are queried by due datetime and by whether completed.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    _test_query_scheduled_items(
+        collection=patient_collection,
+        fake_scheduled_items=data_fake_scheduled_activities_factory(),
+        post_function=lambda document: scope.database.patient.scheduled_activities.post_scheduled_activity(
+            collection=patient_collection,
+            scheduled_activity=document,
+        ),
+        delete_function=lambda document: scope.database.patient.scheduled_activities.delete_scheduled_activity(
+            collection=patient_collection,
+            scheduled_activity=document,
+            set_id=document["_set_id"],
+        ),
+        get_function=scope.database.patient.scheduled_activities.get_scheduled_activities,
+    )
+
+
+def test_query_scheduled_assessments(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    data_fake_scheduled_assessments_factory: Callable[[], List[dict]],
+):
+    """
+    Test that scheduled assessments are queried by due datetime and by whether completed.
+    """
+
+    temp_patient = database_temp_patient_factory()
+    patient_collection = temp_patient.collection
+
+    _test_query_scheduled_items(
+        collection=patient_collection,
+        fake_scheduled_items=data_fake_scheduled_assessments_factory(),
+        post_function=lambda document: scope.database.patient.scheduled_assessments.post_scheduled_assessment(
+            collection=patient_collection,
+            scheduled_assessment=document,
+        ),
+        delete_function=lambda document: scope.database.patient.scheduled_assessments.delete_scheduled_assessment(
+            collection=patient_collection,
+            scheduled_assessment=document,
+            set_id=document["_set_id"],
+        ),
+        get_function=scope.database.patient.scheduled_assessments.get_scheduled_assessments,
+    )
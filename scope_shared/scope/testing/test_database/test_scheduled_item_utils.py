@@ -1,8 +1,10 @@
 import datetime as _datetime
 import dateutil.rrule
+import numpy as np
 import pprint
 import pytest
 import pytz
+from typing import Optional
 
 import scope.database.date_utils as date_utils
 import scope.database.scheduled_item_utils
@@ -92,6 +94,47 @@ def test_scheduled_item_localized_datetime():
         )
 
 
+def test_scheduled_item_localized_datetimes():
+    """
+    Localizing an array of dates should match localizing each date,
+    including dates that are ambiguous or skipped by a transition.
+    """
+
+    days = np.arange(
+        np.datetime64("2021-01-01"),
+        np.datetime64("2023-01-01"),
+        np.timedelta64(1, "D"),
+    )
+    for timezone in [
+        pytz.utc,
+        pytz.timezone("America/Los_Angeles"),
+        pytz.timezone("America/New_York"),
+        pytz.timezone("Australia/Lord_Howe"),
+        pytz.timezone("Europe/London"),
+    ]:
+        for time_of_day in range(24):
+            localized_datetimes = (
+                scope.database.scheduled_item_utils._localized_datetimes(
+                    days=days,
+                    time_of_day=time_of_day,
+                    timezone=timezone,
+                )
+            )
+
+            assert scope.database.scheduled_item_utils._format_datetimes(
+                localized_datetimes
+            ) == [
+                date_utils.format_datetime(
+                    datetime=scope.database.scheduled_item_utils._localized_datetime(
+                        date=day_current,
+                        time_of_day=time_of_day,
+                        timezone=timezone,
+                    )
+                )
+                for day_current in days.tolist()
+            ]
+
+
 def test_scheduled_item_initial_date():
     for (
         start_date,
@@ -567,6 +610,85 @@ def test_scheduled_item_scheduled_dates_valueerror():
             )
 
 
+def test_scheduled_item_scheduled_dates_until_date():
+    # Dates are inclusive of the until date
+    assert scope.database.scheduled_item_utils._scheduled_dates(
+        start_date=_datetime.date(2022, 3, 11),
+        effective_date=_datetime.date(2022, 3, 14),
+        has_repetition=True,
+        frequency=scope.enums.ScheduledItemFrequency.Weekly.value,
+        repeat_day_flags=_REPEAT_DAY_FLAGS_TUE_THU_FRI,
+        day_of_week=None,
+        months=None,
+        until_date=_datetime.date(2022, 3, 22),
+    ) == [
+        _datetime.date(2022, 3, 15),
+        _datetime.date(2022, 3, 17),
+        _datetime.date(2022, 3, 18),
+        _datetime.date(2022, 3, 22),
+    ]
+
+    # An until date before the first occurrence schedules nothing
+    assert (
+        scope.database.scheduled_item_utils._scheduled_dates(
+            start_date=_datetime.date(2022, 3, 11),
+            effective_date=_datetime.date(2022, 3, 14),
+            has_repetition=True,
+            frequency=scope.enums.ScheduledItemFrequency.Daily.value,
+            repeat_day_flags=None,
+            day_of_week=None,
+            months=None,
+            until_date=_datetime.date(2022, 3, 13),
+        )
+        == []
+    )
+
+    # Months and until date cannot both be provided
+    with pytest.raises(ValueError):
+        scope.database.scheduled_item_utils._scheduled_dates(
+            start_date=_datetime.date(2022, 3, 11),
+            effective_date=_datetime.date(2022, 3, 14),
+            has_repetition=True,
+            frequency=scope.enums.ScheduledItemFrequency.Daily.value,
+            repeat_day_flags=None,
+            day_of_week=None,
+            months=3,
+            until_date=_datetime.date(2022, 3, 22),
+        )
+
+
+def test_scheduled_item_horizon_datetime():
+    start_datetime = pytz.utc.localize(_datetime.datetime(2022, 3, 11, 15))
+    effective_datetime = pytz.utc.localize(_datetime.datetime(2022, 3, 14, 10))
+
+    # Horizon beyond the effective datetime
+    assert scope.database.scheduled_item_utils.horizon_datetime(
+        start_datetime=start_datetime,
+        effective_datetime=effective_datetime,
+        horizon=_datetime.timedelta(weeks=2),
+        pending_items=[],
+    ) == pytz.utc.localize(_datetime.datetime(2022, 3, 28, 10))
+
+    # Horizon beyond a later start datetime
+    assert scope.database.scheduled_item_utils.horizon_datetime(
+        start_datetime=start_datetime,
+        effective_datetime=pytz.utc.localize(_datetime.datetime(2022, 3, 1, 10)),
+        horizon=_datetime.timedelta(weeks=2),
+        pending_items=[],
+    ) == pytz.utc.localize(_datetime.datetime(2022, 3, 25, 15))
+
+    # Never before a pending item
+    assert scope.database.scheduled_item_utils.horizon_datetime(
+        start_datetime=start_datetime,
+        effective_datetime=effective_datetime,
+        horizon=_datetime.timedelta(weeks=2),
+        pending_items=[
+            {"dueDateTime": "2022-03-20T15:00:00Z"},
+            {"dueDateTime": "2022-06-01T15:00:00Z"},
+        ],
+    ) == pytz.utc.localize(_datetime.datetime(2022, 6, 1, 15))
+
+
 def test_scheduled_item_create_scheduled_items_no_reminder():
     scheduled_items = scope.database.scheduled_item_utils.create_scheduled_items(
         start_datetime=pytz.timezone("America/Los_Angeles")
@@ -788,3 +910,107 @@ def test_scheduled_item_pending_items():
             "dueTimeOfDay": 8,
         },
     ]
+
+
+def test_scheduled_item_due_query():
+    assert scope.database.scheduled_item_utils.due_query() == {}
+
+    assert scope.database.scheduled_item_utils.due_query(
+        due_after=pytz.utc.localize(_datetime.datetime(2022, 3, 14)),
+        due_before=pytz.utc.localize(_datetime.datetime(2022, 3, 15)),
+        completed=False,
+    ) == {
+        "dueDateTime": {
+            "$gte": "2022-03-14T00:00:00",
+            "$lt": "2022-03-15T00:00:00",
+        },
+        "completed": False,
+    }
+
+    with pytest.raises(ValueError):
+        scope.database.scheduled_item_utils.due_query(
+            due_before=_datetime.datetime(2022, 3, 15),
+        )
+
+
+def test_scheduled_item_diff_scheduled_items():
+    def _item(*, due_date: str, name: str, set_id: Optional[str] = None) -> dict:
+        item = {
+            "_type": "scheduledActivity",
+            "activityId": "activityId",
+            "activityName": name,
+            "dueDate": due_date,
+            "completed": False,
+        }
+        if set_id:
+            item.update(
+                {
+                    "_id": "id{}".format(set_id),
+                    "_rev": 1,
+                    "_set_id": set_id,
+                    "scheduledActivityId": set_id,
+                }
+            )
+
+        return item
+
+    pending_items = [
+        _item(due_date="2022-04-01T00:00:00Z", name="name", set_id="unchanged"),
+        _item(due_date="2022-04-02T00:00:00Z", name="name", set_id="changed"),
+        _item(due_date="2022-04-03T00:00:00Z", name="name", set_id="removed"),
+    ]
+    scheduled_items = [
+        _item(due_date="2022-04-01T00:00:00Z", name="name"),
+        _item(due_date="2022-04-02T00:00:00Z", name="changed"),
+        _item(due_date="2022-04-04T00:00:00Z", name="name"),
+    ]
+
+    diff = scope.database.scheduled_item_utils.diff_scheduled_items(
+        pending_items=pending_items,
+        scheduled_items=scheduled_items,
+        semantic_set_id="scheduledActivityId",
+    )
+
+    assert diff.delete_items == [pending_items[2]]
+    assert diff.update_items == [
+        dict(
+            scheduled_items[1],
+            _rev=1,
+            _set_id="changed",
+            scheduledActivityId="changed",
+        )
+    ]
+    assert diff.create_items == [scheduled_items[2]]
+
+    # While a schedule has pending items,
+    # a scheduled item matching a stored item that is no longer pending is not created again
+    due_item = _item(due_date="2022-03-31T00:00:00Z", name="name", set_id="due")
+    pending_item = _item(due_date="2022-04-01T00:00:00Z", name="name", set_id="pending")
+    scheduled_items = [
+        _item(due_date="2022-03-31T00:00:00Z", name="name"),
+        _item(due_date="2022-04-01T00:00:00Z", name="name"),
+        _item(due_date="2022-04-02T00:00:00Z", name="name"),
+    ]
+
+    diff = scope.database.scheduled_item_utils.diff_scheduled_items(
+        pending_items=[pending_item],
+        scheduled_items=scheduled_items,
+        semantic_set_id="scheduledActivityId",
+        existing_items=[due_item, pending_item],
+    )
+
+    assert diff.delete_items == []
+    assert diff.update_items == []
+    assert diff.create_items == [scheduled_items[2]]
+
+    # A schedule without pending items is starting anew, so every scheduled item is created
+    diff = scope.database.scheduled_item_utils.diff_scheduled_items(
+        pending_items=[],
+        scheduled_items=scheduled_items,
+        semantic_set_id="scheduledActivityId",
+        existing_items=[due_item],
+    )
+
+    assert diff.delete_items == []
+    assert diff.update_items == []
+    assert diff.create_items == scheduled_items
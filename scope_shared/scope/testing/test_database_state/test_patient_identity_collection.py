@@ -1,5 +1,6 @@
 import pymongo.database
 
+import scope.database.collection_utils
 import scope.database.patients
 import scope.testing.test_database.test_collection_utils.test_ensure_index
 
@@ -34,5 +35,6 @@ def test_index_exists(
     )
 
     scope.testing.test_database.test_collection_utils.test_ensure_index.assert_collection_utils_index(
-        collection=collection
+        collection=collection,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
     )
@@ -1,6 +1,7 @@
 import pymongo.database
 import pytest
 
+import scope.database.collection_utils
 import scope.database.providers
 import scope.testing.test_database.test_collection_utils.test_ensure_index
 
@@ -35,5 +36,6 @@ def test_index_exists(
     )
 
     scope.testing.test_database.test_collection_utils.test_ensure_index.assert_collection_utils_index(
-        collection=collection
+        collection=collection,
+        indices=scope.database.collection_utils.IDENTITY_COLLECTION_INDICES,
     )
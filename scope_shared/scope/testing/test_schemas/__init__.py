@@ -5,3 +5,5 @@ Module testing json schemas against concrete examples.
 from scope.testing.test_schemas.test_fake_data_schemas import *
 from scope.testing.test_schemas.test_json_schemas import *
 from scope.testing.test_schemas.test_schemas_parse import *
+from scope.testing.test_schemas.test_schema_validators import *
+from scope.testing.test_schemas.test_validation_policy import *
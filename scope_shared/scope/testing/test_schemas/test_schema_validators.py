@@ -0,0 +1,154 @@
+import copy
+import jschon
+import json
+from pathlib import Path
+import pytest
+from typing import Any
+
+import scope.schema
+import scope.schema_validators
+from scope.testing.test_schemas.test_fake_data_schemas import (
+    ConfigTestFakeDataSchema,
+    TEST_CONFIGS as TEST_CONFIGS_FAKE_DATA,
+)
+from scope.testing.test_schemas.test_json_schemas import (
+    ConfigTestJSONSchema,
+    JSON_DATA_PATH,
+    TEST_CONFIGS as TEST_CONFIGS_JSON,
+)
+
+TEST_ITERATIONS = 10
+
+
+def _assert_validators_agree(*, data: Any, schema: jschon.JSONSchema) -> bool:
+    """
+    Assert the compiled validator agrees with jschon, returning the decision.
+    """
+
+    valid = schema.evaluate(jschon.JSON(data)).valid
+    assert scope.schema_validators.is_valid(data=data, schema=schema) == valid
+
+    return valid
+
+
+def _mutations(data: Any):
+    """
+    Obtain variations of a document that may or may not remain valid.
+    """
+
+    if isinstance(data, list):
+        yield []
+        for item_current in data:
+            yield [item_current, "invalid"]
+            for mutation_current in _mutations(item_current):
+                yield [mutation_current]
+        return
+
+    if not isinstance(data, dict):
+        return
+
+    mutation = copy.deepcopy(data)
+    mutation["invalidProperty"] = "invalid"
+    yield mutation
+
+    for key_current, value_current in data.items():
+        mutation = copy.deepcopy(data)
+        del mutation[key_current]
+        yield mutation
+
+        for replacement_current in [None, True, 1, 1.5, "invalid", [], {}]:
+            mutation = copy.deepcopy(data)
+            mutation[key_current] = replacement_current
+            yield mutation
+
+
+@pytest.mark.parametrize(
+    ["schema_name"],
+    [[schema_name] for schema_name in scope.schema.SCHEMAS.keys()],
+    ids=[schema_name for schema_name in scope.schema.SCHEMAS.keys()],
+)
+def test_schema_validators_compile(schema_name: str):
+    """
+    Every schema should compile, rather than relying on jschon for validity.
+    """
+
+    schema = getattr(scope.schema, schema_name)
+    if schema is None:
+        pytest.xfail("Schema failed to parse")
+
+    assert scope.schema_validators.compile_schema(schema) is not None
+
+
+@pytest.mark.parametrize(
+    ["config"],
+    [[config] for config in TEST_CONFIGS_JSON],
+    ids=[config.name for config in TEST_CONFIGS_JSON],
+)
+def test_schema_validators_json(config: ConfigTestJSONSchema):
+    if config.schema is None:
+        pytest.xfail("Schema failed to parse")
+
+    with open(Path(JSON_DATA_PATH, config.document_path), encoding="utf-8") as f:
+        data = json.loads(f.read())
+
+    assert _assert_validators_agree(data=data, schema=config.schema) == (
+        config.expected_valid
+    )
+    for mutation_current in _mutations(data):
+        _assert_validators_agree(data=mutation_current, schema=config.schema)
+
+
+@pytest.mark.parametrize(
+    ["config"],
+    [[config] for config in TEST_CONFIGS_FAKE_DATA],
+    ids=[config.name for config in TEST_CONFIGS_FAKE_DATA],
+)
+def test_schema_validators_fake_data(
+    request: pytest.FixtureRequest,
+    config: ConfigTestFakeDataSchema,
+):
+    if config.schema is None:
+        pytest.xfail("Schema failed to parse")
+
+    for count in range(TEST_ITERATIONS):
+        data_factory = request.getfixturevalue(config.data_factory_fixture)
+        data = data_factory()
+
+        assert _assert_validators_agree(data=data, schema=config.schema)
+        for mutation_current in _mutations(data):
+            _assert_validators_agree(data=mutation_current, schema=config.schema)
+
+
+def test_schema_validators_json_equality():
+    """
+    Validators should compare values with JSON semantics, where booleans are not numbers.
+    """
+
+    schema = jschon.JSONSchema(
+        {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "$id": "https://uwscope.org/schemas/testing/json-equality",
+            "properties": {
+                "const": {"const": 1},
+                "enum": {"enum": [False, {"a": [1]}]},
+                "integer": {"type": "integer"},
+            },
+        },
+        catalog=scope.schema.CATALOG,
+    )
+    try:
+        for data_current in [
+            {"const": 1},
+            {"const": 1.0},
+            {"const": True},
+            {"enum": 0},
+            {"enum": False},
+            {"enum": {"a": [1.0]}},
+            {"enum": {"a": [True]}},
+            {"integer": 1.0},
+            {"integer": 1.5},
+            {"integer": True},
+        ]:
+            _assert_validators_agree(data=data_current, schema=schema)
+    finally:
+        scope.schema.CATALOG.del_schema(jschon.URI(schema.value["$id"]))
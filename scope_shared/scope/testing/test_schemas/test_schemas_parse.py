@@ -18,8 +18,14 @@ def test_schemas_parse(schema_item: Tuple[str, str]):
     schema_name = schema_item[0]
     schema_file_path = schema_item[1]
 
+    # Access the schema, which constructs it if schemas are loaded lazily
+    try:
+        schema = getattr(scope.schema, schema_name)
+    except Exception:
+        schema = None
+
     # If a schema failed to parse, parse it now to generate a test failure
-    if vars(scope.schema).get(schema_name, None) is None:
+    if schema is None:
         schema_path = Path(SCHEMA_DIR_PATH, schema_file_path)
         with open(schema_path, encoding="utf-8") as f:
             schema_json = json.loads(f.read())
@@ -37,3 +43,16 @@ def test_schemas_parse(schema_item: Tuple[str, str]):
             # Schemas dependent on the failed schema will therefore think it is available.
             # Remove it from the catalog so that dependent schemas fail quickly.
             scope.schema.CATALOG.del_schema(jschon.URI(schema_json["$id"]))
+
+
+def test_schemas_topological_order():
+    """
+    Every schema should be ordered after the schemas it references.
+    """
+
+    order = scope.schema._topological_order()
+    assert sorted(order) == sorted(scope.schema.SCHEMAS.keys())
+
+    for schema_name in order:
+        for dependency_current in scope.schema._SCHEMA_DEPENDENCIES[schema_name]:
+            assert order.index(dependency_current) < order.index(schema_name)
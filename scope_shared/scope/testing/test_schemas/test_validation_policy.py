@@ -0,0 +1,77 @@
+import pytest
+
+import scope.schema
+import scope.schema_utils as schema_utils
+
+
+@pytest.fixture(name="validation_policy_restore")
+def fixture_validation_policy_restore():
+    """
+    Restore the default validation policy after a test.
+    """
+
+    yield
+
+    schema_utils.set_validation_policy(
+        policy=schema_utils.ValidationPolicy.Strict,
+        sample_rate=0.01,
+    )
+
+
+INVALID_SCHEDULED_ITEM = {
+    "dueDate": "invalid",
+    "completed": False,
+}
+
+
+@pytest.mark.parametrize(
+    ["policy", "sample_rate", "expected_validated"],
+    [
+        [schema_utils.ValidationPolicy.Strict, None, True],
+        [schema_utils.ValidationPolicy.Boundary, None, False],
+        [schema_utils.ValidationPolicy.Sampled, 1, True],
+        [schema_utils.ValidationPolicy.Sampled, 0, False],
+        ["boundary", None, False],
+    ],
+    ids=["strict", "boundary", "sampled-all", "sampled-none", "boundary-str"],
+)
+def test_validation_policy(
+    validation_policy_restore,
+    policy,
+    sample_rate,
+    expected_validated: bool,
+):
+    """
+    Generated documents should be validated according to the policy,
+    while other input is always validated.
+    """
+
+    schema_utils.set_validation_policy(policy=policy, sample_rate=sample_rate)
+
+    if expected_validated:
+        with pytest.raises(ValueError):
+            schema_utils.raise_for_invalid_generated_schema(
+                data=INVALID_SCHEDULED_ITEM,
+                schema=scope.schema.scheduled_item_schema,
+            )
+    else:
+        schema_utils.raise_for_invalid_generated_schema(
+            data=INVALID_SCHEDULED_ITEM,
+            schema=scope.schema.scheduled_item_schema,
+        )
+
+    with pytest.raises(ValueError):
+        schema_utils.raise_for_invalid_schema(
+            data=INVALID_SCHEDULED_ITEM,
+            schema=scope.schema.scheduled_item_schema,
+        )
+
+
+def test_validation_policy_invalid(validation_policy_restore):
+    with pytest.raises(ValueError):
+        schema_utils.set_validation_policy(policy="invalid")
+    with pytest.raises(ValueError):
+        schema_utils.set_validation_policy(
+            policy=schema_utils.ValidationPolicy.Sampled,
+            sample_rate=2,
+        )
@@ -28,6 +28,7 @@ setuptools.setup(
         "python-dateutil",
         "faker",  # TODO: To remove, used only in development
         "lorem",  # TODO: To remove
-        "numpy",  # TODO: To remove
+        # numpy is used in scheduled item generation
+        "numpy",
     ],
 )
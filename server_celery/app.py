@@ -1,13 +1,25 @@
 import celery
+import celery.schedules
+
+import scope.config.celery
+
+# Path is relative to server_celery
+BROKER_PATH = "./broker"
 
 app = celery.Celery("celery")
+app.conf.update(scope.config.celery.celery_broker_config(broker_path=BROKER_PATH))
 app.conf.update(
     {
-        "broker_url": "filesystem://localhost//",
-        "broker_transport_options": {
-            "data_folder_in": "./broker/data",
-            "data_folder_out": "./broker/data",
-            "data_folder_processed": "./broker/processed",
+        "include": [
+            "scheduled_items",
+        ],
+        "beat_schedule": {
+            # Extend every patient's horizon each night,
+            # so server_flask can enable SCHEDULED_ITEM_HORIZON_EXTENSION
+            "extend-scheduled-items-horizons": {
+                "task": "scheduled_items.extend_scheduled_items_horizons",
+                "schedule": celery.schedules.crontab(hour=3, minute=0),
+            },
         },
     }
 )
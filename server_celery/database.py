@@ -0,0 +1,64 @@
+import dataclasses
+import os
+import pymongo.database
+import threading
+from typing import Optional
+
+import scope.config
+import scope.documentdb.client
+
+# Paths are relative to server_celery
+DEV_LOCAL_FLASK_CONFIG_PATH = "../secrets/configuration/flask_dev_local.yaml"
+# The worker connects to the database configured in the Flask instance folder
+PROD_FLASK_CONFIG_PATH = "../server_flask/instance/flask_config.yaml"
+
+_database: Optional[pymongo.database.Database] = None
+_database_lock = threading.Lock()
+
+
+def _flask_config() -> scope.config.FlaskConfig:
+    """
+    Load the Flask configuration of the database, selected by CELERY_ENV as server_flask uses FLASK_ENV.
+    """
+
+    celery_environment = os.getenv("CELERY_ENV")
+    if celery_environment == "production":
+        return scope.config.FlaskConfig.load(PROD_FLASK_CONFIG_PATH)
+    elif celery_environment == "development":
+        # In development, the database is reached through a local port forward
+        documentdb_local_port = os.getenv("DOCUMENTDB_LOCAL_PORT")
+        if documentdb_local_port is None:
+            raise ValueError("DOCUMENTDB_LOCAL_PORT is required in development")
+
+        return dataclasses.replace(
+            scope.config.FlaskConfig.load(DEV_LOCAL_FLASK_CONFIG_PATH),
+            documentdb_port=int(documentdb_local_port),
+        )
+    else:
+        raise ValueError('CELERY_ENV must be "production" or "development"')
+
+
+def database() -> pymongo.database.Database:
+    """
+    Obtain the database connection of this worker process, connecting on first use.
+
+    pymongo.MongoClient is not fork-safe, so each worker process must create its own connection.
+    """
+
+    global _database
+
+    with _database_lock:
+        if _database is None:
+            flask_config = _flask_config()
+
+            _database = scope.documentdb.client.documentdb_client_database(
+                host=flask_config.documentdb_host,
+                port=flask_config.documentdb_port,
+                direct_connection=flask_config.documentdb_directconnection,
+                tls_insecure=flask_config.documentdb_tlsinsecure,
+                database_name=flask_config.database_name,
+                user=flask_config.database_user,
+                password=flask_config.database_password,
+            )
+
+        return _database
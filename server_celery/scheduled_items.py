@@ -0,0 +1,92 @@
+import celery
+import datetime
+import pytz
+
+import database
+import scope.database.patient
+import scope.database.patient.activities
+import scope.database.patient.assessments
+import scope.database.patients
+import scope.database.scheduled_item_utils as scheduled_item_utils
+
+# Number of patients processed by each worker task
+PATIENT_CHUNK_SIZE = 10
+
+
+@celery.shared_task
+def extend_scheduled_items_horizons() -> None:
+    """
+    Extend the scheduled items of every patient, distributing chunks of patients across workers.
+    """
+
+    patient_identities = scope.database.patients.get_patient_identities(
+        database=database.database(),
+    )
+    if not patient_identities:
+        return
+
+    extend_patient_scheduled_items_horizon.chunks(
+        [
+            (patient_identity_current["collection"],)
+            for patient_identity_current in patient_identities
+        ],
+        PATIENT_CHUNK_SIZE,
+    ).apply_async()
+
+
+@celery.shared_task
+def extend_patient_scheduled_items_horizon(collection_name: str) -> None:
+    """
+    Extend the scheduled activities and scheduled assessments of a patient.
+
+    Only items newly within the horizon are written, so a daily extension is small.
+    """
+
+    collection = database.database().get_collection(collection_name)
+    maintenance_datetime = pytz.utc.localize(datetime.datetime.utcnow())
+
+    scope.database.patient.extend_scheduled_activities(
+        collection=collection,
+        maintenance_datetime=maintenance_datetime,
+        horizon=scheduled_item_utils.EXTENDED_HORIZON,
+    )
+    scope.database.patient.extend_scheduled_assessments(
+        collection=collection,
+        maintenance_datetime=maintenance_datetime,
+        horizon=scheduled_item_utils.EXTENDED_HORIZON,
+    )
+
+
+@celery.shared_task
+def maintain_scheduled_items(
+    collection_name: str,
+    document_type: str,
+    set_id: str,
+    rev: int,
+) -> bool:
+    """
+    Maintain the scheduled items of an activity or assessment, as enqueued by its write.
+
+    Maintenance is idempotent, and is dropped if the document has since been replaced.
+    Return whether maintenance was performed.
+    """
+
+    collection = database.database().get_collection(collection_name)
+    maintenance_datetime = pytz.utc.localize(datetime.datetime.utcnow())
+
+    if document_type == scope.database.patient.activities.DOCUMENT_TYPE:
+        return scope.database.patient.maintain_scheduled_activities(
+            collection=collection,
+            set_id=set_id,
+            rev=rev,
+            maintenance_datetime=maintenance_datetime,
+        )
+    elif document_type == scope.database.patient.assessments.DOCUMENT_TYPE:
+        return scope.database.patient.maintain_scheduled_assessments(
+            collection=collection,
+            set_id=set_id,
+            rev=rev,
+            maintenance_datetime=maintenance_datetime,
+        )
+    else:
+        raise ValueError('Unknown document_type "{}"'.format(document_type))
@@ -5,6 +5,7 @@ from flask import Blueprint, Flask, request
 from flask_cors import CORS
 from flask_json import FlaskJSON, as_json
 
+import app_content
 import blueprints.identities
 import blueprints.app.config
 import blueprints.patient.summary
@@ -24,6 +25,10 @@ import blueprints.registry.scheduled_activities
 import blueprints.registry.scheduled_assessments
 import blueprints.registry.values_inventory
 import database
+import patient_collections
+import scheduled_item_maintenance
+import scope.database.scheduled_item_utils
+import scope.schema_utils
 
 
 def create_app():
@@ -50,9 +55,34 @@ def create_app():
     # Improved support for JSON in endpoints.
     FlaskJSON().init_app(app=app)
 
+    # Validation of documents generated within scope.database
+    scope.schema_utils.set_validation_policy(
+        policy=app.config["VALIDATION_POLICY"],
+        sample_rate=app.config["VALIDATION_SAMPLE_RATE"],
+    )
+
+    # Scheduled items are written through a short horizon only if they are extended each night
+    if app.config["SCHEDULED_ITEM_HORIZON_EXTENSION"]:
+        scope.database.scheduled_item_utils.set_write_horizon(
+            horizon=scope.database.scheduled_item_utils.SHORT_WRITE_HORIZON
+        )
+
     # Database connection
     database.Database().init_app(app=app)
 
+    # App configuration content, loaded once and validated
+    app_content.AppContent.init_app(app=app)
+
+    # Optionally enqueue maintenance of scheduled items rather than performing it in requests
+    scheduled_item_maintenance.ScheduledItemMaintenanceQueue.init_app(app=app)
+
+    # Optionally populate the patient collection cache before any request
+    if app.config["PATIENT_COLLECTION_CACHE_WARM"]:
+        with app.app_context():
+            patient_collections.patient_collection_cache().warm(
+                database=app.database_must_not_be_directly_accessed
+            )
+
     # Basic status endpoint.
     # TODO - move this into a blueprint
     @app.route("/")
@@ -0,0 +1,147 @@
+import dataclasses
+import flask
+import hashlib
+import http
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Dict, List, Optional
+
+import scope.schema
+import scope.schema_utils
+
+# Path is relative to server_flask
+APP_CONFIG_PATH = "./app_config"
+
+APP_CONTENT_DIRECTORIES = {
+    "assessments": "assessments",
+    "lifeAreas": "life_areas",
+    "patientresources": "patient_resources",
+    "registryresources": "registry_resources",
+}
+APP_QUOTES_FILENAME = "quotes.json"
+
+
+@dataclasses.dataclass(frozen=True)
+class AppContentVersion:
+    """
+    Content loaded from a single read of the app configuration files.
+    """
+
+    content: dict
+    quotes: List[str]
+    config_body: bytes
+    config_etag: str
+    modified: Dict[Path, int]
+
+
+class AppContent:
+    """
+    Flask extension to load app configuration content once, rather than in every request.
+
+    The body of the config response is serialized when content is loaded.
+    If reload_interval is provided, files are checked for modification at most once per interval.
+    """
+
+    def __init__(
+        self,
+        *,
+        app_config_path: Path,
+        auth: dict,
+        reload_interval: Optional[float] = None,
+    ):
+        self._app_config_path = app_config_path
+        self._auth = auth
+        self._reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._version = self._load()
+        self._checked = time.monotonic()
+
+    @staticmethod
+    def init_app(
+        *,
+        app: flask.Flask,
+    ):
+        # Store the content on the Flask app
+        app.app_content = AppContent(
+            app_config_path=Path(APP_CONFIG_PATH),
+            auth={
+                "poolid": app.config["COGNITO_POOLID"],
+                "clientid": app.config["COGNITO_CLIENTID"],
+            },
+            reload_interval=app.config["APP_CONTENT_RELOAD_INTERVAL"],
+        )
+
+    def _paths(self) -> List[Path]:
+        paths = []
+        for directory_current in APP_CONTENT_DIRECTORIES.values():
+            paths.extend(
+                sorted(Path(self._app_config_path, directory_current).glob("*.json"))
+            )
+        paths.append(Path(self._app_config_path, APP_QUOTES_FILENAME))
+
+        return paths
+
+    def _modified(self) -> Dict[Path, int]:
+        return {
+            path_current: path_current.stat().st_mtime_ns
+            for path_current in self._paths()
+        }
+
+    def _load(self) -> AppContentVersion:
+        modified = self._modified()
+
+        content = {}
+        for key_current, directory_current in APP_CONTENT_DIRECTORIES.items():
+            content[key_current] = []
+            for path_current in sorted(
+                Path(self._app_config_path, directory_current).glob("*.json")
+            ):
+                with open(path_current, encoding="utf-8") as config_file:
+                    content[key_current].append(json.load(config_file))
+
+        scope.schema_utils.raise_for_invalid_schema(
+            data=content,
+            schema=scope.schema.app_content_config_schema,
+        )
+
+        with open(
+            Path(self._app_config_path, APP_QUOTES_FILENAME), encoding="utf-8"
+        ) as quotes_file:
+            quotes = json.load(quotes_file)
+
+        # Include status, matching other responses from flask_json
+        config_body = json.dumps(
+            {
+                "auth": self._auth,
+                "content": content,
+                "status": http.HTTPStatus.OK.value,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        return AppContentVersion(
+            content=content,
+            quotes=quotes,
+            config_body=config_body,
+            config_etag=hashlib.sha256(config_body).hexdigest(),
+            modified=modified,
+        )
+
+    def current(self) -> AppContentVersion:
+        """
+        Obtain the current content, reloading if files were modified.
+        """
+
+        if self._reload_interval is None:
+            return self._version
+
+        with self._lock:
+            if time.monotonic() - self._checked >= self._reload_interval:
+                self._checked = time.monotonic()
+                if self._modified() != self._version.modified:
+                    self._version = self._load()
+
+            return self._version
@@ -1,13 +1,20 @@
+import collections
+import copy
 import dataclasses
 import flask
+import hashlib
 import jwt
 import pymongo.database
 import re
+import threading
+import time
 from typing import Optional
 
 import request_utils
+import scope.database.identity_events
 import scope.database.patients
 import scope.database.providers
+import signing_keys
 
 
 @dataclasses.dataclass(frozen=True)
@@ -16,6 +23,149 @@ class AuthenticatedIdentities:
     provider_identity: Optional[str]
 
 
+@dataclasses.dataclass(frozen=True)
+class _VerifiedToken:
+    expiration: float
+    cognito_id: str
+    claims: dict
+    identities: AuthenticatedIdentities
+
+
+class VerifiedTokenCache:
+    """
+    Process-level LRU cache of verified tokens and the identities they resolve to.
+
+    Keyed by a digest of each token, so tokens themselves are not retained.
+    An entry is retained until the earlier of its token's expiration or max_age,
+    or until a write to an identity that could change the identities it resolves to.
+    Identity writes are observed only within this process,
+    so max_age bounds how long a write elsewhere can go unobserved.
+    """
+
+    def __init__(self, *, max_size: int, max_age: float):
+        self._max_size = max_size
+        self._max_age = max_age
+
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[
+            str, _VerifiedToken
+        ] = collections.OrderedDict()
+        self._generation = 0
+
+        scope.database.identity_events.register_identity_write_callback(
+            self.invalidate_identity
+        )
+
+    @staticmethod
+    def _digest(*, token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @property
+    def generation(self) -> int:
+        """
+        Incremented by every invalidation.
+
+        Obtain before resolving identities, then provide to put,
+        so that identities resolved before an invalidation are not cached after it.
+        """
+
+        with self._lock:
+            return self._generation
+
+    def get(self, *, token: str) -> Optional[AuthenticatedIdentities]:
+        digest = self._digest(token=token)
+
+        with self._lock:
+            entry = self._entries.get(digest, None)
+            if entry is None:
+                return None
+
+            if entry.expiration <= time.time():
+                del self._entries[digest]
+                return None
+
+            self._entries.move_to_end(digest)
+
+            return copy.deepcopy(entry.identities)
+
+    def put(
+        self,
+        *,
+        token: str,
+        claims: dict,
+        identities: AuthenticatedIdentities,
+        generation: int,
+    ) -> None:
+        digest = self._digest(token=token)
+
+        with self._lock:
+            # An invalidation may have occurred while identities were resolved
+            if generation != self._generation:
+                return
+
+            self._entries[digest] = _VerifiedToken(
+                expiration=min(claims["exp"], time.time() + self._max_age),
+                cognito_id=claims["sub"],
+                claims=copy.deepcopy(claims),
+                identities=copy.deepcopy(identities),
+            )
+            self._entries.move_to_end(digest)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_identity(self, identity: dict) -> None:
+        """
+        Remove entries that resolved to an identity, or that may now resolve to it.
+        """
+
+        cognito_id = identity.get("cognitoAccount", {}).get("cognitoId", None)
+
+        def _resolved_identity(identity_current: Optional[dict]) -> bool:
+            return (
+                identity_current is not None
+                and identity_current["_type"] == identity["_type"]
+                and identity_current["_set_id"] == identity["_set_id"]
+            )
+
+        with self._lock:
+            self._generation += 1
+
+            for digest_current, entry_current in list(self._entries.items()):
+                if (
+                    entry_current.cognito_id == cognito_id
+                    or _resolved_identity(entry_current.identities.patient_identity)
+                    or _resolved_identity(entry_current.identities.provider_identity)
+                ):
+                    del self._entries[digest_current]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_verified_token_cache: Optional[VerifiedTokenCache] = None
+_verified_token_cache_lock = threading.Lock()
+
+
+def verified_token_cache() -> VerifiedTokenCache:
+    """
+    Obtain the process-level verified token cache, sized by the current app configuration.
+    """
+
+    global _verified_token_cache
+
+    with _verified_token_cache_lock:
+        if _verified_token_cache is None:
+            _verified_token_cache = VerifiedTokenCache(
+                max_size=flask.current_app.config["AUTHORIZATION_TOKEN_CACHE_SIZE"],
+                max_age=flask.current_app.config["AUTHORIZATION_TOKEN_CACHE_MAX_AGE"],
+            )
+
+        return _verified_token_cache
+
+
 def authenticated_identities(
     *,
     database: pymongo.database.Database,
@@ -30,6 +180,12 @@ def authenticated_identities(
 
     authorization_token = authorization_header.split()[1]
 
+    # Reuse a token that was already verified and resolved
+    token_cache = verified_token_cache()
+    cached_identities = token_cache.get(token=authorization_token)
+    if cached_identities is not None:
+        return cached_identities
+
     pool_id = flask.current_app.config["COGNITO_POOLID"]
     pool_region = pool_id.split("_")[0]
     pool_client_id = flask.current_app.config["COGNITO_CLIENTID"]
@@ -39,10 +195,28 @@ def authenticated_identities(
         userPoolId=pool_id,
     )
 
-    jwks_url = "{tokenIssuer}/.well-known/jwks.json".format(tokenIssuer=token_issuer)
+    # Signing keys are cached across requests,
+    # loaded from a local file if one is configured
+    jwks_path = flask.current_app.config["COGNITO_JWKS_PATH"]
+    jwks_url = None
+    if jwks_path is None:
+        jwks_url = "{tokenIssuer}/.well-known/jwks.json".format(
+            tokenIssuer=token_issuer
+        )
 
-    jwks_client = jwt.PyJWKClient(jwks_url)
-    signing_key = jwks_client.get_signing_key_from_jwt(authorization_token)
+    jwks_cache = signing_keys.signing_key_cache(
+        jwks_url=jwks_url,
+        jwks_path=jwks_path,
+        ttl=flask.current_app.config["COGNITO_JWKS_TTL"],
+        refresh_interval=flask.current_app.config["COGNITO_JWKS_REFRESH_INTERVAL"],
+    )
+
+    try:
+        signing_key = jwks_cache.get_signing_key_from_jwt(token=authorization_token)
+    except jwt.exceptions.InvalidTokenError:
+        request_utils.abort_not_authorized("Invalid token error.")
+    if signing_key is None:
+        request_utils.abort_not_authorized("Signing key not found.")
 
     try:
         authorization_data = jwt.decode(
@@ -64,30 +238,32 @@ def authenticated_identities(
         request_utils.abort_not_authorized()
 
     verified_cognito_id = authorization_data["sub"]
+    token_cache_generation = token_cache.generation
 
-    verified_patient_identity = None
-    patient_identities = scope.database.patients.get_patient_identities(
-        database=database
+    verified_patient_identity = (
+        scope.database.patients.get_patient_identity_by_cognito_id(
+            database=database,
+            cognito_id=verified_cognito_id,
+        )
     )
-    for patient_identity_current in patient_identities:
-        account_current = patient_identity_current.get("cognitoAccount", {})
-        cognito_id_current = account_current.get("cognitoId", None)
 
-        if cognito_id_current == verified_cognito_id:
-            verified_patient_identity = patient_identity_current
-
-    verified_provider_identity = None
-    provider_identities = scope.database.providers.get_provider_identities(
-        database=database
+    verified_provider_identity = (
+        scope.database.providers.get_provider_identity_by_cognito_id(
+            database=database,
+            cognito_id=verified_cognito_id,
+        )
     )
-    for provider_identity_current in provider_identities:
-        account_current = provider_identity_current.get("cognitoAccount", {})
-        cognito_id_current = account_current.get("cognitoId", None)
-
-        if cognito_id_current == verified_cognito_id:
-            verified_provider_identity = provider_identity_current
 
-    return AuthenticatedIdentities(
+    verified_identities = AuthenticatedIdentities(
         patient_identity=verified_patient_identity,
         provider_identity=verified_provider_identity,
     )
+
+    token_cache.put(
+        token=authorization_token,
+        claims=authorization_data,
+        identities=verified_identities,
+        generation=token_cache_generation,
+    )
+
+    return verified_identities
@@ -1,7 +1,6 @@
 import flask
 import flask_json
 
-import authorization_utils
 import request_context
 import request_utils
 import scope.database.patients
@@ -21,9 +20,7 @@ identities_blueprint = flask.Blueprint(
 def get_identities():
     context = request_context.authorization_unverified()
 
-    authenticated_identities = authorization_utils.authenticated_identities(
-        database=context.database
-    )
+    authenticated_identities = context.authenticated_identities
 
     if not any(
         [
@@ -54,9 +51,7 @@ def get_identities():
 def get_patient_identity():
     context = request_context.authorization_unverified()
 
-    authenticated_identities = authorization_utils.authenticated_identities(
-        database=context.database
-    )
+    authenticated_identities = context.authenticated_identities
 
     if not authenticated_identities.patient_identity:
         request_utils.abort_not_authorized()
@@ -74,9 +69,7 @@ def get_patient_identity():
 def get_provider_identity():
     context = request_context.authorization_unverified()
 
-    authenticated_identities = authorization_utils.authenticated_identities(
-        database=context.database
-    )
+    authenticated_identities = context.authenticated_identities
 
     if not authenticated_identities.provider_identity:
         request_utils.abort_not_authorized()
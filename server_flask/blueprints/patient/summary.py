@@ -2,7 +2,8 @@ import datetime
 
 import flask
 import flask_json
-from typing import List
+import pytz
+from typing import List, Optional
 
 import request_context
 import request_utils
@@ -22,8 +23,11 @@ def compute_patient_summary(
     safety_plan_document: dict,
     scheduled_assessment_documents: List[dict],
     values_inventory_document: dict,
+    summary_datetime: Optional[datetime.datetime] = None,
 ) -> dict:
     """
+    Compute a summary as of summary_datetime in UTC, defaulting to now.
+
     {
         # assignedValuesInventory <- True, if assigned is True, and not a single activity exists in values inventory singleton
         assignedValuesInventory: boolean;
@@ -35,6 +39,10 @@ def compute_patient_summary(
         assignedScheduledAssessments: IScheduledAssessment[];
     }
     """
+    if summary_datetime is None:
+        summary_datetime = pytz.utc.localize(datetime.datetime.utcnow())
+    date_utils.raise_on_not_datetime_utc_aware(summary_datetime)
+
     # assignedValuesInventory
     assigned_values_inventory: bool = values_inventory_document["assigned"]
     if assigned_values_inventory:
@@ -64,7 +72,7 @@ def compute_patient_summary(
                     date_utils.parse_date(
                         scheduled_assessment_current["dueDate"]
                     ).date()
-                    <= datetime.date.today()
+                    <= summary_datetime.date()
                 )
             ),
             scheduled_assessment_documents,
@@ -91,12 +99,24 @@ def get_patient_summary(patient_id):
     context = request_context.authorized_for_patient(patient_id=patient_id)
     patient_collection = context.patient_collection(patient_id=patient_id)
 
+    # Query and summary are both as of the same time
+    summary_datetime = pytz.utc.localize(datetime.datetime.utcnow())
+
     safety_plan_document = scope.database.patient.safety_plan.get_safety_plan(
         collection=patient_collection,
     )
+    # Query only incomplete scheduled assessments that could be due today or earlier,
+    # allowing for the time zone of a due date
     scheduled_assessment_documents = (
         scope.database.patient.scheduled_assessments.get_scheduled_assessments(
             collection=patient_collection,
+            due_before=pytz.utc.localize(
+                datetime.datetime.combine(
+                    summary_datetime.date() + datetime.timedelta(days=2),
+                    datetime.time(),
+                )
+            ),
+            completed=False,
         )
     )
     scheduled_assessment_documents = scheduled_assessment_documents or []
@@ -118,4 +138,5 @@ def get_patient_summary(patient_id):
         safety_plan_document=safety_plan_document,
         scheduled_assessment_documents=scheduled_assessment_documents,
         values_inventory_document=values_inventory_document,
+        summary_datetime=summary_datetime,
     )
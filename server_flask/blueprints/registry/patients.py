@@ -1,10 +1,15 @@
+import concurrent.futures
 import copy
 import flask
 import flask_json
 import pymongo.collection
+import pymongo.database
+import threading
+from typing import List, Optional
 
 import request_utils
 import request_context
+import scope.database.collection_utils
 import scope.database.patient.activity_logs
 import scope.database.patient.activities
 import scope.database.patient.assessment_logs
@@ -26,6 +31,53 @@ patients_blueprint = flask.Blueprint(
 )
 
 
+# Singletons included in a patient document, keyed by their field in the patient document
+PATIENT_DOCUMENT_SINGLETONS = {
+    "profile": scope.database.patient.patient_profile.DOCUMENT_TYPE,
+    "clinicalHistory": scope.database.patient.clinical_history.DOCUMENT_TYPE,
+    "valuesInventory": scope.database.patient.values_inventory.DOCUMENT_TYPE,
+    "safetyPlan": scope.database.patient.safety_plan.DOCUMENT_TYPE,
+}
+
+# Sets included in a patient document, keyed by their field in the patient document
+PATIENT_DOCUMENT_SETS = {
+    "sessions": scope.database.patient.sessions.DOCUMENT_TYPE,
+    "caseReviews": scope.database.patient.case_reviews.DOCUMENT_TYPE,
+    "assessments": scope.database.patient.assessments.DOCUMENT_TYPE,
+    "scheduledAssessments": scope.database.patient.scheduled_assessments.DOCUMENT_TYPE,
+    "assessmentLogs": scope.database.patient.assessment_logs.DOCUMENT_TYPE,
+    "activities": scope.database.patient.activities.DOCUMENT_TYPE,
+    "scheduledActivities": scope.database.patient.scheduled_activities.DOCUMENT_TYPE,
+    "activityLogs": scope.database.patient.activity_logs.DOCUMENT_TYPE,
+    "moodLogs": scope.database.patient.mood_logs.DOCUMENT_TYPE,
+}
+
+
+# Executor shared by every GET of patients, created on first use
+_patients_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_patients_executor_lock = threading.Lock()
+
+
+def patients_executor(*, concurrency: int) -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Obtain the process-level executor for constructing patient documents.
+
+    Its concurrency is fixed by the first call,
+    so concurrent requests together construct at most that many documents at once.
+    """
+
+    global _patients_executor
+
+    with _patients_executor_lock:
+        if _patients_executor is None:
+            _patients_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=concurrency,
+                thread_name_prefix="patients",
+            )
+
+        return _patients_executor
+
+
 def _construct_patient_document(
     *,
     patient_identity: dict,
@@ -38,102 +90,58 @@ def _construct_patient_document(
     # Identity
     patient_document["identity"] = copy.deepcopy(patient_identity)
 
-    # Profile
-    profile = scope.database.patient.patient_profile.get_patient_profile(
-        collection=patient_collection
-    )
-    if profile:
-        patient_document["profile"] = profile
-
-    # Clinical history
-    clinical_history = scope.database.patient.clinical_history.get_clinical_history(
-        collection=patient_collection
-    )
-    if clinical_history:
-        patient_document["clinicalHistory"] = clinical_history
-
-    # Values inventory
-    values_inventory = scope.database.patient.values_inventory.get_values_inventory(
-        collection=patient_collection
-    )
-    if values_inventory:
-        patient_document["valuesInventory"] = values_inventory
-
-    # Safety plan
-    safety_plan = scope.database.patient.safety_plan.get_safety_plan(
-        collection=patient_collection
-    )
-    if safety_plan:
-        patient_document["safetyPlan"] = safety_plan
-
-    # Sessions
-    sessions = scope.database.patient.sessions.get_sessions(
-        collection=patient_collection
-    )
-    if sessions:
-        patient_document["sessions"] = sessions
-
-    # Case reviews
-    case_reviews = scope.database.patient.case_reviews.get_case_reviews(
-        collection=patient_collection
-    )
-    if case_reviews:
-        patient_document["caseReviews"] = case_reviews
-
-    # Assessments
-    assessments = scope.database.patient.assessments.get_assessments(
-        collection=patient_collection
-    )
-    if assessments:
-        patient_document["assessments"] = assessments
+    # Obtain every singleton and set in a single query
+    documents = scope.database.collection_utils.get_types(
+        collection=patient_collection,
+        singleton_types=list(PATIENT_DOCUMENT_SINGLETONS.values()),
+        set_types=list(PATIENT_DOCUMENT_SETS.values()),
+    )
+
+    # Singletons
+    for key_current, document_type_current in PATIENT_DOCUMENT_SINGLETONS.items():
+        document_current = documents[document_type_current]
+        if document_current:
+            patient_document[key_current] = document_current
+
+    # Sets, which may retain deleted elements (e.g., scheduled items)
+    for key_current, document_type_current in PATIENT_DOCUMENT_SETS.items():
+        documents_current = documents[document_type_current]
+        if documents_current:
+            documents_current = [
+                document_current
+                for document_current in documents_current
+                if not document_current.get("_deleted", False)
+            ]
+        if documents_current:
+            patient_document[key_current] = documents_current
 
-    # Scheduled Assessments
-    scheduled_assessments = (
-        scope.database.patient.scheduled_assessments.get_scheduled_assessments(
-            collection=patient_collection
-        )
-    )
-    if scheduled_assessments:
-        patient_document["scheduledAssessments"] = scheduled_assessments
+    return patient_document
 
-    # Assessment Logs
-    assessment_logs = scope.database.patient.assessment_logs.get_assessment_logs(
-        collection=patient_collection
-    )
-    if assessment_logs:
-        patient_document["assessmentLogs"] = assessment_logs
 
-    # Activities
-    activities = scope.database.patient.activities.get_activities(
-        collection=patient_collection
-    )
-    if activities:
-        patient_document["activities"] = activities
-
-    # Schedule activities
-    scheduled_activities = (
-        scope.database.patient.scheduled_activities.get_scheduled_activities(
-            collection=patient_collection
+def _construct_patient_documents(
+    *,
+    database: pymongo.database.Database,
+    patient_identities: List[dict],
+    concurrency: int,
+) -> List[dict]:
+    """
+    Construct a full patient document for each patient identity, in the same order.
+
+    Documents are constructed concurrently, sharing the connection pool of the database client.
+    """
+
+    if not patient_identities:
+        return []
+
+    def _construct(patient_identity: dict) -> dict:
+        return _construct_patient_document(
+            patient_identity=patient_identity,
+            patient_collection=database.get_collection(patient_identity["collection"]),
         )
-    )
-    if scheduled_activities:
-        patient_document["scheduledActivities"] = scheduled_activities
 
-    # Activity Logs
-    activity_logs = scope.database.patient.activity_logs.get_activity_logs(
-        collection=patient_collection
+    return list(
+        patients_executor(concurrency=concurrency).map(_construct, patient_identities)
     )
-    if activity_logs:
-        patient_document["activityLogs"] = activity_logs
-
-    # Mood logs
-    mood_logs = scope.database.patient.mood_logs.get_mood_logs(
-        collection=patient_collection
-    )
-    if mood_logs:
-        patient_document["moodLogs"] = mood_logs
-
-    return patient_document
 
 
 @patients_blueprint.route(
@@ -145,28 +153,51 @@ def get_patients():
     context = request_context.authorized_for_everything()
     database = context.database
 
-    # List of documents from the patient identities collection
-    patient_identities = scope.database.patients.get_patient_identities(
-        database=database,
-    )
+    # Pagination is requested by either a limit or a cursor
+    limit = None
+    if "limit" in flask.request.args:
+        try:
+            limit = int(flask.request.args["limit"])
+        except ValueError:
+            request_utils.abort_invalid_query_parameter(parameter="limit")
+        if not (1 <= limit <= flask.current_app.config["PATIENTS_LIMIT_MAX"]):
+            request_utils.abort_invalid_query_parameter(parameter="limit")
+    cursor = flask.request.args.get("cursor", None)
+    paginated = limit is not None or cursor is not None
 
-    # Construct a full patient document for each
-    patient_documents = []
-    for patient_identity_current in patient_identities:
-        patient_collection = database.get_collection(
-            patient_identity_current["collection"]
+    # List of documents from the patient identities collection
+    if paginated:
+        patient_identities_page = scope.database.patients.get_patient_identities_page(
+            database=database,
+            limit=limit or flask.current_app.config["PATIENTS_LIMIT_MAX"],
+            after_patient_id=cursor,
         )
-
-        patient_documents.append(
-            _construct_patient_document(
-                patient_identity=patient_identity_current,
-                patient_collection=patient_collection,
+        patient_identities = patient_identities_page.documents
+    else:
+        # Without a limit or a cursor, every patient is returned.
+        # This is unbounded, but is how the registry obtains its list of patients.
+        patient_identities = (
+            scope.database.patients.get_patient_identities(
+                database=database,
             )
+            or []
         )
 
-    return {
+    # Construct a full patient document for each
+    patient_documents = _construct_patient_documents(
+        database=database,
+        patient_identities=patient_identities,
+        concurrency=flask.current_app.config["PATIENTS_CONCURRENCY"],
+    )
+
+    result = {
         "patients": patient_documents,
     }
+    if paginated:
+        # Cursor for the next page, None if this is the last page
+        result["cursor"] = patient_identities_page.next_set_id
+
+    return result
 
 
 @patients_blueprint.route(
@@ -179,10 +210,7 @@ def get_patient(patient_id):
     database = context.database
 
     # Document from the patient identities collection
-    patient_identity = scope.database.patients.get_patient_identity(
-        database=context.database,
-        patient_id=patient_id,
-    )
+    patient_identity = context.patient_identity(patient_id=patient_id)
     if patient_identity is None:
         request_utils.abort_patient_not_found()
 
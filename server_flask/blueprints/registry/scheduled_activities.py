@@ -23,8 +23,12 @@ def get_scheduled_activities(patient_id):
     context = request_context.authorized_for_patient(patient_id=patient_id)
     patient_collection = context.patient_collection(patient_id=patient_id)
 
+    # Optionally query by due datetime and by whether completed
     documents = scope.database.patient.scheduled_activities.get_scheduled_activities(
         collection=patient_collection,
+        due_after=request_utils.query_parameter_datetime(parameter="due_after"),
+        due_before=request_utils.query_parameter_datetime(parameter="due_before"),
+        completed=request_utils.query_parameter_bool(parameter="completed"),
     )
 
     # Validate and normalize the response
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -85,3 +86,92 @@ class Config:
     #
     # Additional fixed configuration
     #
+
+    COGNITO_JWKS_PATH: Optional[str] = None
+    """
+    Path of a local JWKS document for the Cognito user pool.
+    If None, the JWKS document is fetched from the user pool.
+    """
+
+    COGNITO_JWKS_TTL: int = 3600
+    """
+    Seconds a JWKS document is cached before it is reloaded.
+    """
+
+    COGNITO_JWKS_REFRESH_INTERVAL: int = 60
+    """
+    Minimum seconds between reloads of a JWKS document caused by an unknown signing key.
+    """
+
+    PATIENTS_CONCURRENCY: int = 8
+    """
+    Maximum number of patient documents assembled concurrently by all GETs of patients,
+    which share one executor.
+    """
+
+    PATIENTS_LIMIT_MAX: int = 100
+    """
+    Maximum number of patients in a page of a GET of patients.
+    A GET without a limit or a cursor is not paginated, and returns every patient.
+    """
+
+    AUTHORIZATION_TOKEN_CACHE_SIZE: int = 1024
+    """
+    Maximum number of verified tokens cached with their resolved identities.
+    """
+
+    AUTHORIZATION_TOKEN_CACHE_MAX_AGE: int = 300
+    """
+    Maximum seconds a verified token is cached, even if it expires later.
+    Bounds how long an identity write in another process can go unobserved.
+    """
+
+    PATIENT_COLLECTION_CACHE_SIZE: int = 4096
+    """
+    Maximum number of patient ids cached with the name of their collection.
+    """
+
+    PATIENT_COLLECTION_CACHE_MAX_AGE: int = 3600
+    """
+    Maximum seconds a patient collection name is cached.
+    Bounds how long a patient delete in another process can go unobserved.
+    """
+
+    PATIENT_COLLECTION_CACHE_WARM: bool = False
+    """
+    Whether to populate the patient collection cache from every patient identity at startup.
+    """
+
+    APP_CONTENT_RELOAD_INTERVAL: Optional[float] = None
+    """
+    Seconds between checks for modified app configuration content, or None to load content only once.
+    """
+
+    VALIDATION_POLICY: str = "strict"
+    """
+    Validation of documents generated within scope.database: "strict", "boundary", or "sampled".
+    Request bodies are always validated.
+    """
+
+    VALIDATION_SAMPLE_RATE: float = 0.01
+    """
+    Fraction of generated documents validated under the "sampled" validation policy.
+    """
+
+    SCHEDULED_ITEM_MAINTENANCE_ENQUEUE: bool = False
+    """
+    Whether a write of an activity or assessment enqueues maintenance of its scheduled items
+    as a Celery task, rather than performing it before responding.
+    """
+
+    SCHEDULED_ITEM_HORIZON_EXTENSION: bool = False
+    """
+    Whether server_celery extends the horizon of every patient's scheduled items each night,
+    so a write of an activity or assessment schedules items through only a short horizon.
+    If False, a write schedules items through the full extended horizon.
+    """
+
+    CELERY_BROKER_PATH: str = "../server_celery/broker"
+    """
+    Path of the Celery filesystem broker and results shared with server_celery.
+    """
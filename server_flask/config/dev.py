@@ -30,3 +30,6 @@ class DevelopmentConfig(Config):
     # Otherwise all Flask tests currently fail.
     #
     AUTHORIZATION_DISABLED_FOR_TESTING = True
+
+    # Reload app configuration content while it is being edited.
+    APP_CONTENT_RELOAD_INTERVAL = 1
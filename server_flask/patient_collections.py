@@ -0,0 +1,142 @@
+import collections
+import dataclasses
+import flask
+import pymongo.database
+import threading
+import time
+from typing import Optional, Tuple
+
+import scope.database.identity_events
+import scope.database.patients
+
+
+@dataclasses.dataclass(frozen=True)
+class PatientCollectionCacheMetrics:
+    hits: int
+    misses: int
+
+
+class PatientCollectionCache:
+    """
+    Process-level LRU cache mapping a patient id to the name of its collection.
+
+    A collection name does not change after a patient is created,
+    so an entry is invalidated only by a write or delete of the patient identity.
+    Identity writes are observed only within this process,
+    so max_age bounds how long a delete elsewhere can go unobserved.
+    """
+
+    def __init__(self, *, max_size: int, max_age: float):
+        self._max_size = max_size
+        self._max_age = max_age
+
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[
+            Tuple[str, str], Tuple[str, float]
+        ] = collections.OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+
+        scope.database.identity_events.register_identity_write_callback(
+            self.invalidate_identity
+        )
+
+    @property
+    def metrics(self) -> PatientCollectionCacheMetrics:
+        with self._lock:
+            return PatientCollectionCacheMetrics(
+                hits=self._hits,
+                misses=self._misses,
+            )
+
+    def get(self, *, database_name: str, patient_id: str) -> Optional[str]:
+        key = (database_name, patient_id)
+
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+            return entry[0]
+
+    def put(self, *, database_name: str, patient_identity: dict) -> None:
+        expiration = time.monotonic() + self._max_age
+
+        with self._lock:
+            for patient_id_current in {
+                patient_identity["_set_id"],
+                patient_identity[
+                    scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID
+                ],
+            }:
+                key = (database_name, patient_id_current)
+                self._entries[key] = (patient_identity["collection"], expiration)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_identity(self, identity: dict) -> None:
+        if identity["_type"] != scope.database.patients.PATIENT_IDENTITY_DOCUMENT_TYPE:
+            return
+
+        patient_ids = {
+            identity["_set_id"],
+            identity.get(
+                scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID,
+                identity["_set_id"],
+            ),
+        }
+
+        with self._lock:
+            for key_current in list(self._entries.keys()):
+                if key_current[1] in patient_ids:
+                    del self._entries[key_current]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def warm(self, *, database: pymongo.database.Database) -> None:
+        """
+        Populate the cache from every existing patient identity.
+        """
+
+        patient_identities = scope.database.patients.get_patient_identities(
+            database=database,
+        )
+        for patient_identity_current in patient_identities or []:
+            self.put(
+                database_name=database.name,
+                patient_identity=patient_identity_current,
+            )
+
+
+_patient_collection_cache: Optional[PatientCollectionCache] = None
+_patient_collection_cache_lock = threading.Lock()
+
+
+def patient_collection_cache() -> PatientCollectionCache:
+    """
+    Obtain the process-level patient collection cache, sized by the current app configuration.
+    """
+
+    global _patient_collection_cache
+
+    with _patient_collection_cache_lock:
+        if _patient_collection_cache is None:
+            _patient_collection_cache = PatientCollectionCache(
+                max_size=flask.current_app.config["PATIENT_COLLECTION_CACHE_SIZE"],
+                max_age=flask.current_app.config["PATIENT_COLLECTION_CACHE_MAX_AGE"],
+            )
+
+        return _patient_collection_cache
@@ -1,14 +1,29 @@
 import flask
 import pymongo.collection
 import pymongo.database
-from typing import cast
+from typing import cast, Dict, Optional
 
 import authorization_utils
+import patient_collections
 import request_utils
 import scope.database.patients
 
 
 class RequestContext:
+    """
+    Context for a single request.
+
+    Memoizes identity documents and collections for the lifetime of the request,
+    so each is obtained from the database at most once.
+    """
+
+    def __init__(self):
+        self._authenticated_identities: Optional[
+            authorization_utils.AuthenticatedIdentities
+        ] = None
+        self._patient_identities: Dict[str, Optional[dict]] = {}
+        self._patient_collections: Dict[str, pymongo.collection.Collection] = {}
+
     @property
     def database(self) -> pymongo.database.Database:
         # noinspection PyUnresolvedReferences
@@ -17,34 +32,85 @@ class RequestContext:
             flask.current_app.database_must_not_be_directly_accessed,
         )
 
+    @property
+    def authenticated_identities(self) -> authorization_utils.AuthenticatedIdentities:
+        if self._authenticated_identities is None:
+            self._authenticated_identities = (
+                authorization_utils.authenticated_identities(database=self.database)
+            )
+
+            # The authenticated patient identity is likely to be requested again
+            authenticated_patient_identity = (
+                self._authenticated_identities.patient_identity
+            )
+            if authenticated_patient_identity:
+                self._patient_identities.setdefault(
+                    authenticated_patient_identity[
+                        scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID
+                    ],
+                    authenticated_patient_identity,
+                )
+
+        return self._authenticated_identities
+
+    def patient_identity(self, *, patient_id: str) -> Optional[dict]:
+        if patient_id not in self._patient_identities:
+            self._patient_identities[
+                patient_id
+            ] = scope.database.patients.get_patient_identity(
+                database=self.database,
+                patient_id=patient_id,
+            )
+
+        return self._patient_identities[patient_id]
+
     def patient_collection(self, *, patient_id: str) -> pymongo.collection.Collection:
-        # Use patient ID to confirm validity and obtain collection
-        # TODO: As part of authentication, determine if we can cache this.
-        #       Otherwise, maybe an annotation or enhance context to reduce code repetition.
-        patient_identity_document = scope.database.patients.get_patient_identity(
-            database=self.database,
-            patient_id=patient_id,
-        )
-        if patient_identity_document is None:
-            request_utils.abort_patient_not_found()
+        if patient_id not in self._patient_collections:
+            # Collection names are also cached across requests
+            collection_cache = patient_collections.patient_collection_cache()
+            collection_name = collection_cache.get(
+                database_name=self.database.name,
+                patient_id=patient_id,
+            )
 
-        # Obtain patient collection
-        patient_collection = self.database.get_collection(
-            patient_identity_document["collection"]
-        )
+            if collection_name is None:
+                # Use patient ID to confirm validity and obtain collection
+                patient_identity_document = self.patient_identity(patient_id=patient_id)
+                if patient_identity_document is None:
+                    request_utils.abort_patient_not_found()
+
+                collection_name = patient_identity_document["collection"]
+                collection_cache.put(
+                    database_name=self.database.name,
+                    patient_identity=patient_identity_document,
+                )
+
+            # Obtain patient collection
+            self._patient_collections[patient_id] = self.database.get_collection(
+                collection_name
+            )
+
+        return self._patient_collections[patient_id]
+
+
+def _request_context() -> RequestContext:
+    """
+    Obtain the context of the current request, shared by every call within the request.
+    """
+
+    if "request_context" not in flask.g:
+        flask.g.request_context = RequestContext()
 
-        return patient_collection
+    return flask.g.request_context
 
 
 def authorized_for_everything() -> RequestContext:
-    request_context = RequestContext()
+    request_context = _request_context()
 
     if flask.current_app.config.get("AUTHORIZATION_DISABLED_FOR_TESTING", False):
         return request_context
 
-    authenticated_identities = authorization_utils.authenticated_identities(
-        database=request_context.database
-    )
+    authenticated_identities = request_context.authenticated_identities
 
     authorized = False
 
@@ -59,14 +125,12 @@ def authorized_for_everything() -> RequestContext:
 
 
 def authorized_for_patient(patient_id: str) -> RequestContext:
-    request_context = RequestContext()
+    request_context = _request_context()
 
     if flask.current_app.config.get("AUTHORIZATION_DISABLED_FOR_TESTING", False):
         return request_context
 
-    authenticated_identities = authorization_utils.authenticated_identities(
-        database=request_context.database
-    )
+    authenticated_identities = request_context.authenticated_identities
 
     authorized = False
 
@@ -90,4 +154,4 @@ def authorized_for_patient(patient_id: str) -> RequestContext:
 
 
 def authorization_unverified() -> RequestContext:
-    return RequestContext()
+    return _request_context()
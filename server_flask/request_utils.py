@@ -1,9 +1,13 @@
+import datetime
 import flask
 import functools
 import http
 import jschon
 from typing import List, NoReturn, Optional
 
+import scope.database.date_utils as date_utils
+import scope.schema_validators
+
 
 def _flask_abort(response: dict, status: int) -> NoReturn:
     flask.abort(
@@ -23,6 +27,15 @@ def abort_document_not_found() -> NoReturn:
     )
 
 
+def abort_invalid_query_parameter(*, parameter: str) -> NoReturn:
+    _flask_abort(
+        {
+            "message": 'Invalid query parameter "{}".'.format(parameter),
+        },
+        http.HTTPStatus.BAD_REQUEST,
+    )
+
+
 def abort_not_authorized(reason: str = None) -> NoReturn:
     response = {
         "message": "Not authorized.",
@@ -122,6 +135,34 @@ def abort_revision_conflict(*, document: dict) -> NoReturn:
     )
 
 
+def query_parameter_bool(*, parameter: str) -> Optional[bool]:
+    """
+    Obtain an optional query parameter of "true" or "false".
+    """
+
+    value = flask.request.args.get(parameter, None)
+    if value is None:
+        return None
+    if value not in ["true", "false"]:
+        abort_invalid_query_parameter(parameter=parameter)
+
+    return value == "true"
+
+
+def query_parameter_datetime(*, parameter: str) -> Optional[datetime.datetime]:
+    """
+    Obtain an optional query parameter in our datetime format.
+    """
+
+    value = flask.request.args.get(parameter, None)
+    if value is None:
+        return None
+    try:
+        return date_utils.parse_datetime(value)
+    except ValueError:
+        abort_invalid_query_parameter(parameter=parameter)
+
+
 def set_get_response_validate(*, documents: List[dict]) -> List[dict]:
     # If database get found None, return an empty list
     if documents is None:
@@ -253,10 +294,11 @@ def validate_schema(
 
                 document = document[key]
 
-            # Argument needs to be of type jschon.json.JSON
-            result = schema.evaluate(jschon.JSON(document))
+            if not scope.schema_validators.is_valid(data=document, schema=schema):
+                # Evaluate again with jschon for detailed output,
+                # argument needs to be of type jschon.json.JSON
+                result = schema.evaluate(jschon.JSON(document))
 
-            if not result.output("flag")["valid"]:
                 flask.abort(
                     flask.make_response(
                         flask.jsonify(
@@ -0,0 +1,104 @@
+import collections
+import flask
+import threading
+from typing import Optional
+
+import scope.config.celery
+import scope.database.scheduled_item_maintenance as scheduled_item_maintenance
+
+# Task registered by server_celery
+MAINTAIN_SCHEDULED_ITEMS_TASK = "scheduled_items.maintain_scheduled_items"
+
+# Maximum number of enqueued tasks retained for waiting
+MAX_TRACKED_RESULTS = 1024
+
+
+class ScheduledItemMaintenanceQueue:
+    """
+    Flask extension to enqueue maintenance of scheduled items as Celery tasks,
+    so a write of an activity or assessment returns without waiting for maintenance.
+
+    Each task is identified by the key of its maintenance,
+    and a task computed from a replaced revision is dropped by the worker.
+    """
+
+    def __init__(self, *, celery_app: "celery.Celery"):
+        self._celery_app = celery_app
+
+        self._lock = threading.Lock()
+        self._results: collections.OrderedDict[
+            str, "celery.result.AsyncResult"
+        ] = collections.OrderedDict()
+
+    @staticmethod
+    def init_app(
+        *,
+        app: flask.Flask,
+    ):
+        if not app.config["SCHEDULED_ITEM_MAINTENANCE_ENQUEUE"]:
+            scheduled_item_maintenance.set_scheduled_item_maintenance_dispatcher(None)
+            app.scheduled_item_maintenance_queue = None
+            return
+
+        # Imported only when enabled, so Celery is not required to run without enqueuing
+        import celery
+
+        celery_app = celery.Celery("celery")
+        celery_app.conf.update(
+            scope.config.celery.celery_broker_config(
+                broker_path=app.config["CELERY_BROKER_PATH"],
+            )
+        )
+
+        queue = ScheduledItemMaintenanceQueue(celery_app=celery_app)
+        scheduled_item_maintenance.set_scheduled_item_maintenance_dispatcher(
+            queue.enqueue
+        )
+
+        # Store the queue on the Flask app
+        app.scheduled_item_maintenance_queue = queue
+
+    def enqueue(
+        self,
+        maintenance: scheduled_item_maintenance.ScheduledItemMaintenance,
+    ) -> None:
+        result = self._celery_app.send_task(
+            MAINTAIN_SCHEDULED_ITEMS_TASK,
+            kwargs={
+                "collection_name": maintenance.collection_name,
+                "document_type": maintenance.document_type,
+                "set_id": maintenance.set_id,
+                "rev": maintenance.rev,
+            },
+            task_id=maintenance.key,
+        )
+
+        with self._lock:
+            self._results[maintenance.key] = result
+            while len(self._results) > MAX_TRACKED_RESULTS:
+                self._results.popitem(last=False)
+
+    def wait(
+        self,
+        *,
+        maintenance: Optional[
+            scheduled_item_maintenance.ScheduledItemMaintenance
+        ] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Wait for completion of enqueued maintenance, so a test can observe its result.
+
+        If maintenance is provided, wait for that maintenance, even if enqueued by another process.
+        Otherwise wait for all maintenance enqueued by this process.
+        """
+
+        if maintenance is not None:
+            results = [self._celery_app.AsyncResult(maintenance.key)]
+        else:
+            with self._lock:
+                results = list(self._results.values())
+                self._results.clear()
+
+        for result_current in results:
+            result_current.get(timeout=timeout)
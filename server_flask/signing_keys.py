@@ -0,0 +1,179 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+from typing import Dict, Optional
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class SigningKeyCache:
+    """
+    Process-level cache of the signing keys in a JWKS document.
+
+    A JWKS document is loaded from either a URL or a local file,
+    then reloaded when it is older than its TTL.
+    A token signed by a key that is not in the cache also causes a reload,
+    as the key may have been rotated since the last load.
+    Such reloads are limited to one per refresh_interval,
+    so tokens with unknown keys cannot cause a fetch on every request.
+
+    A reload is performed by one thread at a time without holding the cache lock,
+    and a failed reload is logged and retained keys continue to be served.
+    """
+
+    def __init__(
+        self,
+        *,
+        jwks_url: Optional[str] = None,
+        jwks_path: Optional[str] = None,
+        ttl: float,
+        refresh_interval: float,
+    ):
+        if (jwks_url is None) == (jwks_path is None):
+            raise ValueError("Exactly one of jwks_url or jwks_path is required")
+
+        self._jwks_url = jwks_url
+        self._jwks_path = jwks_path
+        self._ttl = ttl
+        self._refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._signing_keys: Dict[str, jwt.PyJWK] = {}
+        self._loaded_time: Optional[float] = None
+        self._failed_time: Optional[float] = None
+        # Incremented by each reload, so a thread waiting to reload can detect one has completed
+        self._generation = 0
+
+        # Held by the one thread performing a reload
+        self._refresh_lock = threading.Lock()
+
+    def _load_jwks(self) -> dict:
+        if self._jwks_path is not None:
+            with open(self._jwks_path, encoding="utf-8") as jwks_file:
+                return json.load(jwks_file)
+
+        with urllib.request.urlopen(self._jwks_url, timeout=10) as jwks_response:
+            return json.load(jwks_response)
+
+    def _refresh_due(self, *, kid: str, now: float) -> bool:
+        # Do not retry a failed reload more than once per refresh_interval
+        if (
+            self._failed_time is not None
+            and now - self._failed_time < self._refresh_interval
+        ):
+            return False
+
+        # Reload a document that has expired
+        if self._loaded_time is None or now - self._loaded_time >= self._ttl:
+            return True
+
+        # Reload a document that may be missing a rotated key
+        return (
+            kid not in self._signing_keys
+            and now - self._loaded_time >= self._refresh_interval
+        )
+
+    def _refresh(self, *, generation: int) -> None:
+        with self._lock:
+            # Another thread completed a reload while this thread waited
+            if self._generation != generation:
+                return
+
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(self._load_jwks())
+        except (OSError, ValueError, jwt.exceptions.PyJWTError):
+            logger.exception(
+                "Failed to load JWKS document %s, retaining %d signing keys",
+                self._jwks_url or self._jwks_path,
+                len(self._signing_keys),
+            )
+            with self._lock:
+                self._failed_time = time.monotonic()
+                self._generation += 1
+            return
+
+        signing_keys = {
+            signing_key_current.key_id: signing_key_current
+            for signing_key_current in jwk_set.keys
+            if signing_key_current.public_key_use in ["sig", None]
+        }
+
+        with self._lock:
+            self._signing_keys = signing_keys
+            self._loaded_time = time.monotonic()
+            self._failed_time = None
+            self._generation += 1
+
+    def get_signing_key(self, *, kid: str) -> Optional[jwt.PyJWK]:
+        """
+        Obtain the signing key with the provided key id.
+
+        If the key is not found, even after any allowed refresh, return None.
+        """
+
+        with self._lock:
+            signing_key = self._signing_keys.get(kid, None)
+            refresh_due = self._refresh_due(kid=kid, now=time.monotonic())
+            generation = self._generation
+
+        if refresh_due:
+            # A cached key is served while another thread reloads,
+            # otherwise wait for that reload to complete
+            if self._refresh_lock.acquire(blocking=signing_key is None):
+                try:
+                    self._refresh(generation=generation)
+                finally:
+                    self._refresh_lock.release()
+
+                with self._lock:
+                    signing_key = self._signing_keys.get(kid, None)
+
+        return signing_key
+
+    def get_signing_key_from_jwt(self, *, token: str) -> Optional[jwt.PyJWK]:
+        """
+        Obtain the signing key for a token, based on the key id in its unverified header.
+
+        Raises jwt.exceptions.InvalidTokenError if the header cannot be decoded.
+        If the key is not found, return None.
+        """
+
+        unverified_header = jwt.get_unverified_header(token)
+        kid = unverified_header.get("kid", None)
+        if kid is None:
+            return None
+
+        return self.get_signing_key(kid=kid)
+
+
+_signing_key_caches: Dict[tuple, SigningKeyCache] = {}
+_signing_key_caches_lock = threading.Lock()
+
+
+def signing_key_cache(
+    *,
+    jwks_url: Optional[str] = None,
+    jwks_path: Optional[str] = None,
+    ttl: float,
+    refresh_interval: float,
+) -> SigningKeyCache:
+    """
+    Obtain the process-level signing key cache for a JWKS document.
+    """
+
+    cache_key = (jwks_url, jwks_path, ttl, refresh_interval)
+
+    with _signing_key_caches_lock:
+        if cache_key not in _signing_key_caches:
+            _signing_key_caches[cache_key] = SigningKeyCache(
+                jwks_url=jwks_url,
+                jwks_path=jwks_path,
+                ttl=ttl,
+                refresh_interval=refresh_interval,
+            )
+
+        return _signing_key_caches[cache_key]
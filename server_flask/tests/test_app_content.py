@@ -0,0 +1,109 @@
+import flask
+import http
+import json
+import os
+from pathlib import Path
+import pytest
+import shutil
+
+import app_content
+import blueprints.app.config
+
+APP_CONFIG_PATH = Path(Path(__file__).parent, "../app_config")
+
+
+def _app(*, app_config_path: Path, reload_interval=None) -> flask.Flask:
+    app = flask.Flask(__name__)
+    app.app_content = app_content.AppContent(
+        app_config_path=app_config_path,
+        auth={"poolid": "poolid", "clientid": "clientid"},
+        reload_interval=reload_interval,
+    )
+    app.register_blueprint(
+        blueprints.app.config.app_config_blueprint,
+        url_prefix="/app",
+    )
+
+    return app
+
+
+def test_app_config_etag():
+    """
+    The config should be served with an ETag, and not re-sent to a client with a current copy.
+    """
+
+    client = _app(app_config_path=APP_CONFIG_PATH).test_client()
+
+    response = client.get("/app/config")
+    assert response.status_code == http.HTTPStatus.OK
+    assert response.json["auth"] == {"poolid": "poolid", "clientid": "clientid"}
+    assert set(response.json["content"].keys()) == {
+        "assessments",
+        "lifeAreas",
+        "patientresources",
+        "registryresources",
+    }
+    assert response.headers["ETag"]
+
+    response_not_modified = client.get(
+        "/app/config",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response_not_modified.status_code == http.HTTPStatus.NOT_MODIFIED
+    assert response_not_modified.data == b""
+
+    response_modified = client.get(
+        "/app/config",
+        headers={"If-None-Match": '"other"'},
+    )
+    assert response_modified.status_code == http.HTTPStatus.OK
+    assert response_modified.data == response.data
+
+
+def test_app_content_reload(tmp_path: Path):
+    """
+    Modified content should be reloaded only if a reload interval is configured.
+    """
+
+    app_config_path = Path(tmp_path, "app_config")
+    shutil.copytree(APP_CONFIG_PATH, app_config_path)
+
+    content_static = app_content.AppContent(
+        app_config_path=app_config_path,
+        auth={},
+    )
+    content_reload = app_content.AppContent(
+        app_config_path=app_config_path,
+        auth={},
+        reload_interval=0,
+    )
+    version_static = content_static.current()
+    version_reload = content_reload.current()
+    assert content_reload.current() is version_reload
+
+    quotes_path = Path(app_config_path, app_content.APP_QUOTES_FILENAME)
+    quotes_path.write_text(json.dumps(["quote"]), encoding="utf-8")
+    os.utime(quotes_path, ns=(0, quotes_path.stat().st_mtime_ns + 1))
+
+    assert content_static.current() is version_static
+    assert content_reload.current().quotes == ["quote"]
+    assert content_reload.current().config_etag == version_reload.config_etag
+
+
+def test_app_content_invalid(tmp_path: Path):
+    """
+    Content that does not match the schema should fail to load.
+    """
+
+    app_config_path = Path(tmp_path, "app_config")
+    shutil.copytree(APP_CONFIG_PATH, app_config_path)
+    Path(app_config_path, "life_areas", "invalid.json").write_text(
+        json.dumps({"invalid": "invalid"}),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError):
+        app_content.AppContent(
+            app_config_path=app_config_path,
+            auth={},
+        )
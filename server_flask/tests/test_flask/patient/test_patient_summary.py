@@ -1,5 +1,6 @@
 import copy
 import datetime
+import pytz
 import requests
 from typing import Callable, List
 from urllib.parse import urljoin
@@ -279,3 +280,25 @@ def test_compute_patient_summary_scheduled_assessments(
     )
     assert summary["assignedScheduledAssessments"] != []
     _patient_summary_assertions(summary=summary)
+
+    # OPTION 5 - today is the date of the provided summary_datetime in UTC.
+    summary_datetime = pytz.utc.localize(datetime.datetime(2022, 3, 14, 23, 59, 59))
+    for scheduled_assessment_current in scheduled_assessments:
+        scheduled_assessment_current["completed"] = False
+        scheduled_assessment_current["dueDate"] = date_utils.format_date(
+            datetime.date(2022, 3, 15)
+        )
+    summary = blueprints.patient.summary.compute_patient_summary(
+        safety_plan_document=safety_plan,
+        scheduled_assessment_documents=scheduled_assessments,
+        values_inventory_document=values_inventory,
+        summary_datetime=summary_datetime,
+    )
+    assert summary["assignedScheduledAssessments"] == []
+    summary = blueprints.patient.summary.compute_patient_summary(
+        safety_plan_document=safety_plan,
+        scheduled_assessment_documents=scheduled_assessments,
+        values_inventory_document=values_inventory,
+        summary_datetime=summary_datetime + datetime.timedelta(seconds=1),
+    )
+    assert summary["assignedScheduledAssessments"] != []
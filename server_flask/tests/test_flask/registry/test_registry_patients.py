@@ -64,6 +64,82 @@ def test_patients_get(
     )
 
 
+def test_patients_get_paginated(
+    database_temp_patient_factory: Callable[
+        [],
+        scope.testing.fixtures_database_temp_patient.DatabaseTempPatient,
+    ],
+    flask_client_config: scope.config.FlaskClientConfig,
+    flask_session_unauthenticated_factory: Callable[[], requests.Session],
+):
+    """
+    Test retrieving patients one page at a time.
+    """
+
+    session = flask_session_unauthenticated_factory()
+
+    created_ids = [database_temp_patient_factory().patient_id for _ in range(5)]
+
+    retrieved_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+
+        response = session.get(
+            url=urljoin(
+                flask_client_config.baseurl,
+                QUERY_PATIENTS,
+            ),
+            params=params,
+        )
+        assert response.ok
+
+        patient_documents = response.json()["patients"]
+        assert len(patient_documents) <= 2
+        schema_utils.assert_schema(
+            data=patient_documents,
+            schema=scope.schema.patients_schema,
+        )
+
+        retrieved_ids.extend(
+            patient_document_current["identity"][
+                scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID
+            ]
+            for patient_document_current in patient_documents
+        )
+
+        cursor = response.json()["cursor"]
+        if cursor is None:
+            break
+
+    # Pages are ordered and do not overlap
+    assert retrieved_ids == sorted(set(retrieved_ids))
+    assert all(patient_id in retrieved_ids for patient_id in created_ids)
+
+
+def test_patients_get_invalid_limit(
+    flask_client_config: scope.config.FlaskClientConfig,
+    flask_session_unauthenticated_factory: Callable[[], requests.Session],
+):
+    """
+    Test an invalid limit yields 400.
+    """
+
+    session = flask_session_unauthenticated_factory()
+
+    for limit_current in ["invalid", "0", "-1"]:
+        response = session.get(
+            url=urljoin(
+                flask_client_config.baseurl,
+                QUERY_PATIENTS,
+            ),
+            params={"limit": limit_current},
+        )
+        assert response.status_code == http.HTTPStatus.BAD_REQUEST
+
+
 def test_patientidentities_get(
     database_temp_patient_factory: Callable[
         [],
@@ -0,0 +1,77 @@
+import patient_collections
+import scope.database.identity_events
+import scope.database.patients
+
+
+def _patient_identity(*, patient_id: str) -> dict:
+    return {
+        "_type": scope.database.patients.PATIENT_IDENTITY_DOCUMENT_TYPE,
+        "_set_id": patient_id,
+        scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID: patient_id,
+        "collection": "patient_{}".format(patient_id),
+    }
+
+
+def test_patient_collection_cache():
+    """
+    Collection names should be cached until evicted, expired, or invalidated.
+    """
+
+    cache = patient_collections.PatientCollectionCache(max_size=2, max_age=3600)
+    try:
+        assert cache.get(database_name="database", patient_id="patient1") is None
+
+        cache.put(
+            database_name="database",
+            patient_identity=_patient_identity(patient_id="patient1"),
+        )
+        assert (
+            cache.get(database_name="database", patient_id="patient1")
+            == "patient_patient1"
+        )
+        assert cache.get(database_name="other", patient_id="patient1") is None
+
+        # The least recently used patient is evicted
+        cache.put(
+            database_name="database",
+            patient_identity=_patient_identity(patient_id="patient2"),
+        )
+        cache.put(
+            database_name="database",
+            patient_identity=_patient_identity(patient_id="patient3"),
+        )
+        assert cache.get(database_name="database", patient_id="patient1") is None
+
+        # An identity write invalidates that patient
+        scope.database.identity_events.notify_identity_write(
+            identity=_patient_identity(patient_id="patient2")
+        )
+        assert cache.get(database_name="database", patient_id="patient2") is None
+        assert cache.get(database_name="database", patient_id="patient3") is not None
+
+        assert cache.metrics == patient_collections.PatientCollectionCacheMetrics(
+            hits=2,
+            misses=4,
+        )
+    finally:
+        scope.database.identity_events.unregister_identity_write_callback(
+            cache.invalidate_identity
+        )
+
+
+def test_patient_collection_cache_max_age():
+    """
+    Collection names should not be cached beyond the maximum age.
+    """
+
+    cache = patient_collections.PatientCollectionCache(max_size=2, max_age=0)
+    try:
+        cache.put(
+            database_name="database",
+            patient_identity=_patient_identity(patient_id="patient1"),
+        )
+        assert cache.get(database_name="database", patient_id="patient1") is None
+    finally:
+        scope.database.identity_events.unregister_identity_write_callback(
+            cache.invalidate_identity
+        )
@@ -0,0 +1,110 @@
+import flask
+from unittest import mock
+
+import authorization_utils
+import config.base
+import patient_collections
+import request_context
+import scope.database.identity_events
+import scope.database.patients
+
+
+def _app() -> flask.Flask:
+    app = flask.Flask(__name__)
+    app.config.from_object(config.base.Config)
+    app.database_must_not_be_directly_accessed = mock.MagicMock()
+    app.database_must_not_be_directly_accessed.name = "database"
+
+    # Start without any patient collections cached across requests
+    with app.app_context():
+        patient_collections.patient_collection_cache().clear()
+
+    return app
+
+
+def _patient_identity(*, patient_id: str) -> dict:
+    return {
+        "_type": scope.database.patients.PATIENT_IDENTITY_DOCUMENT_TYPE,
+        "_set_id": patient_id,
+        scope.database.patients.PATIENT_IDENTITY_SEMANTIC_SET_ID: patient_id,
+        "collection": "patient_{}".format(patient_id),
+    }
+
+
+def test_request_context_reuses_authenticated_patient_identity():
+    """
+    A patient accessing their own data should not require another identity lookup.
+    """
+
+    authenticated_identities = authorization_utils.AuthenticatedIdentities(
+        patient_identity=_patient_identity(patient_id="patient1"),
+        provider_identity=None,
+    )
+
+    with _app().test_request_context():
+        with mock.patch.object(
+            authorization_utils,
+            "authenticated_identities",
+            return_value=authenticated_identities,
+        ) as mock_authenticated_identities, mock.patch.object(
+            scope.database.patients,
+            "get_patient_identity",
+        ) as mock_get_patient_identity:
+            context = request_context.authorized_for_patient(patient_id="patient1")
+            context.patient_collection(patient_id="patient1")
+
+            # Another context within the request shares the same memoization
+            context = request_context.authorized_for_patient(patient_id="patient1")
+            context.patient_collection(patient_id="patient1")
+
+            assert mock_authenticated_identities.call_count == 1
+            assert mock_get_patient_identity.call_count == 0
+
+
+def test_request_context_memoizes_patient_identity():
+    """
+    A provider accessing a patient should require only one identity lookup,
+    and a later request should find the patient collection already cached.
+    """
+
+    authenticated_identities = authorization_utils.AuthenticatedIdentities(
+        patient_identity=None,
+        provider_identity={"_type": "providerIdentity", "_set_id": "provider1"},
+    )
+
+    app = _app()
+    for expected_call_count in [1, 0]:
+        with app.test_request_context():
+            with mock.patch.object(
+                authorization_utils,
+                "authenticated_identities",
+                return_value=authenticated_identities,
+            ), mock.patch.object(
+                scope.database.patients,
+                "get_patient_identity",
+                return_value=_patient_identity(patient_id="patient1"),
+            ) as mock_get_patient_identity:
+                context = request_context.authorized_for_patient(patient_id="patient1")
+                context.patient_collection(patient_id="patient1")
+                context.patient_collection(patient_id="patient1")
+
+                assert mock_get_patient_identity.call_count == expected_call_count
+
+    # An identity write invalidates the cached collection
+    scope.database.identity_events.notify_identity_write(
+        identity=_patient_identity(patient_id="patient1")
+    )
+    with app.test_request_context():
+        with mock.patch.object(
+            authorization_utils,
+            "authenticated_identities",
+            return_value=authenticated_identities,
+        ), mock.patch.object(
+            scope.database.patients,
+            "get_patient_identity",
+            return_value=_patient_identity(patient_id="patient1"),
+        ) as mock_get_patient_identity:
+            context = request_context.authorized_for_patient(patient_id="patient1")
+            context.patient_collection(patient_id="patient1")
+
+            assert mock_get_patient_identity.call_count == 1
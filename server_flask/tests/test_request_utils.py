@@ -0,0 +1,46 @@
+import datetime
+import flask
+import http
+import pytest
+import pytz
+import werkzeug.exceptions
+
+import request_utils
+
+
+def test_query_parameter_bool():
+    """
+    A boolean query parameter should be "true" or "false", or absent.
+    """
+
+    app = flask.Flask(__name__)
+
+    with app.test_request_context(query_string={"completed": "true"}):
+        assert request_utils.query_parameter_bool(parameter="completed") is True
+    with app.test_request_context(query_string={"completed": "false"}):
+        assert request_utils.query_parameter_bool(parameter="completed") is False
+    with app.test_request_context():
+        assert request_utils.query_parameter_bool(parameter="completed") is None
+    with app.test_request_context(query_string={"completed": "yes"}):
+        with pytest.raises(werkzeug.exceptions.HTTPException) as exc_info:
+            request_utils.query_parameter_bool(parameter="completed")
+        assert exc_info.value.response.status_code == http.HTTPStatus.BAD_REQUEST
+
+
+def test_query_parameter_datetime():
+    """
+    A datetime query parameter should be in our datetime format, or absent.
+    """
+
+    app = flask.Flask(__name__)
+
+    with app.test_request_context(query_string={"due_before": "2022-03-14T15:00:00Z"}):
+        assert request_utils.query_parameter_datetime(
+            parameter="due_before"
+        ) == pytz.utc.localize(datetime.datetime(2022, 3, 14, 15))
+    with app.test_request_context():
+        assert request_utils.query_parameter_datetime(parameter="due_before") is None
+    with app.test_request_context(query_string={"due_before": "2022-03-14"}):
+        with pytest.raises(werkzeug.exceptions.HTTPException) as exc_info:
+            request_utils.query_parameter_datetime(parameter="due_before")
+        assert exc_info.value.response.status_code == http.HTTPStatus.BAD_REQUEST
@@ -0,0 +1,56 @@
+from unittest import mock
+
+import scheduled_item_maintenance
+import scope.database.scheduled_item_maintenance
+
+
+def _maintenance(
+    *, rev: int
+) -> scope.database.scheduled_item_maintenance.ScheduledItemMaintenance:
+    return scope.database.scheduled_item_maintenance.ScheduledItemMaintenance(
+        collection_name="patient_patient1",
+        document_type="activity",
+        set_id="activity1",
+        rev=rev,
+    )
+
+
+def test_scheduled_item_maintenance_queue_enqueue_wait():
+    """
+    Maintenance should be sent as a task identified by its key, and waiting should await each task.
+    """
+
+    celery_app = mock.MagicMock()
+    queue = scheduled_item_maintenance.ScheduledItemMaintenanceQueue(
+        celery_app=celery_app
+    )
+
+    queue.enqueue(_maintenance(rev=1))
+    queue.enqueue(_maintenance(rev=2))
+
+    assert celery_app.send_task.call_count == 2
+    assert celery_app.send_task.call_args.args == (
+        scheduled_item_maintenance.MAINTAIN_SCHEDULED_ITEMS_TASK,
+    )
+    assert celery_app.send_task.call_args.kwargs == {
+        "kwargs": {
+            "collection_name": "patient_patient1",
+            "document_type": "activity",
+            "set_id": "activity1",
+            "rev": 2,
+        },
+        "task_id": "patient_patient1:activity:activity1:2",
+    }
+
+    # Waiting awaits every enqueued task, and then none remain
+    queue.wait(timeout=1)
+    assert celery_app.send_task.return_value.get.call_count == 2
+    queue.wait(timeout=1)
+    assert celery_app.send_task.return_value.get.call_count == 2
+
+    # Waiting for specific maintenance obtains its result by key
+    queue.wait(maintenance=_maintenance(rev=2), timeout=1)
+    celery_app.AsyncResult.assert_called_once_with(
+        "patient_patient1:activity:activity1:2"
+    )
+    celery_app.AsyncResult.return_value.get.assert_called_once_with(timeout=1)
@@ -0,0 +1,207 @@
+import json
+from pathlib import Path
+import threading
+from typing import List
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+import jwt
+
+import signing_keys
+
+
+def _write_jwks(*, jwks_path: Path, kids: list) -> dict:
+    """
+    Write a JWKS document with an RSA key for each kid, returning the private keys.
+    """
+
+    private_keys = {}
+    jwks = {"keys": []}
+    for kid_current in kids:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_keys[kid_current] = private_key
+
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": kid_current, "use": "sig", "alg": "RS256"})
+        jwks["keys"].append(jwk)
+
+    jwks_path.write_text(json.dumps(jwks), encoding="utf-8")
+
+    return private_keys
+
+
+def _count_loads(*, cache: signing_keys.SigningKeyCache) -> List[dict]:
+    """
+    Record each load of the JWKS document by a cache, returning the list of loaded documents.
+    """
+
+    loads = []
+    load_jwks = cache._load_jwks
+
+    def _load_jwks() -> dict:
+        jwks = load_jwks()
+        loads.append(jwks)
+        return jwks
+
+    cache._load_jwks = _load_jwks
+
+    return loads
+
+
+def test_signing_key_cache_hit(tmp_path: Path):
+    """
+    After the first load, signing keys should be obtained without reloading.
+    """
+
+    jwks_path = tmp_path / "jwks.json"
+    private_keys = _write_jwks(jwks_path=jwks_path, kids=["kid1"])
+
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=3600,
+        refresh_interval=60,
+    )
+    loads = _count_loads(cache=cache)
+
+    token = jwt.encode(
+        {"sub": "test"},
+        private_keys["kid1"],
+        algorithm="RS256",
+        headers={"kid": "kid1"},
+    )
+    for _ in range(3):
+        signing_key = cache.get_signing_key_from_jwt(token=token)
+        assert signing_key is not None
+        assert jwt.decode(token, key=signing_key.key, algorithms=["RS256"]) == {
+            "sub": "test"
+        }
+
+    assert len(loads) == 1
+
+
+def test_signing_key_cache_kid_miss(tmp_path: Path):
+    """
+    An unknown kid should reload the document, but no more than once per refresh interval.
+    """
+
+    jwks_path = tmp_path / "jwks.json"
+    _write_jwks(jwks_path=jwks_path, kids=["kid1"])
+
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=3600,
+        refresh_interval=0,
+    )
+    loads = _count_loads(cache=cache)
+    assert cache.get_signing_key(kid="kid1") is not None
+
+    # Rotate the keys
+    _write_jwks(jwks_path=jwks_path, kids=["kid2"])
+    assert cache.get_signing_key(kid="kid2") is not None
+    assert cache.get_signing_key(kid="kid1") is None
+    assert len(loads) == 3
+
+    # Unknown kids do not reload within the refresh interval
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=3600,
+        refresh_interval=3600,
+    )
+    loads = _count_loads(cache=cache)
+    assert cache.get_signing_key(kid="kid2") is not None
+    for _ in range(3):
+        assert cache.get_signing_key(kid="unknown") is None
+
+    assert len(loads) == 1
+
+
+def test_signing_key_cache_ttl(tmp_path: Path):
+    """
+    An expired document should be reloaded.
+    """
+
+    jwks_path = tmp_path / "jwks.json"
+    _write_jwks(jwks_path=jwks_path, kids=["kid1"])
+
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=0,
+        refresh_interval=3600,
+    )
+    loads = _count_loads(cache=cache)
+    for _ in range(3):
+        assert cache.get_signing_key(kid="kid1") is not None
+
+    assert len(loads) == 3
+
+
+def test_signing_key_cache_failed_refresh(tmp_path: Path):
+    """
+    A failed reload should retain the previous keys, and not be retried within the refresh interval.
+    """
+
+    jwks_path = tmp_path / "jwks.json"
+    _write_jwks(jwks_path=jwks_path, kids=["kid1"])
+
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=0,
+        refresh_interval=3600,
+    )
+    assert cache.get_signing_key(kid="kid1") is not None
+
+    attempts = []
+
+    def _load_jwks_failed() -> dict:
+        attempts.append(None)
+        raise OSError("JWKS document unavailable")
+
+    cache._load_jwks = _load_jwks_failed
+    for _ in range(3):
+        assert cache.get_signing_key(kid="kid1") is not None
+        assert cache.get_signing_key(kid="unknown") is None
+
+    assert len(attempts) == 1
+
+
+def test_signing_key_cache_refresh_outside_lock(tmp_path: Path):
+    """
+    While one thread reloads the document, cached keys should be served without waiting.
+    """
+
+    jwks_path = tmp_path / "jwks.json"
+    _write_jwks(jwks_path=jwks_path, kids=["kid1"])
+
+    cache = signing_keys.SigningKeyCache(
+        jwks_path=str(jwks_path),
+        ttl=0,
+        refresh_interval=0,
+    )
+    assert cache.get_signing_key(kid="kid1") is not None
+
+    load_started = threading.Event()
+    load_release = threading.Event()
+    loads = _count_loads(cache=cache)
+    load_jwks = cache._load_jwks
+
+    def _load_jwks_blocked() -> dict:
+        load_started.set()
+        assert load_release.wait(timeout=10)
+        return load_jwks()
+
+    cache._load_jwks = _load_jwks_blocked
+
+    refresh_thread = threading.Thread(
+        target=cache.get_signing_key, kwargs={"kid": "kid1"}
+    )
+    refresh_thread.start()
+    try:
+        assert load_started.wait(timeout=10)
+
+        # Served from the cache while the reload is in progress
+        for _ in range(3):
+            assert cache.get_signing_key(kid="kid1") is not None
+    finally:
+        load_release.set()
+        refresh_thread.join()
+
+    assert len(loads) == 1
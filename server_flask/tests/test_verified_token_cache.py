@@ -0,0 +1,153 @@
+import time
+from typing import Optional
+
+import authorization_utils
+import scope.database.identity_events
+
+
+def _claims(*, sub: str, exp_in: float = 3600) -> dict:
+    return {
+        "sub": sub,
+        "exp": time.time() + exp_in,
+    }
+
+
+def _identities(
+    *, provider_id: Optional[str] = None
+) -> authorization_utils.AuthenticatedIdentities:
+    provider_identity = None
+    if provider_id:
+        provider_identity = {
+            "_type": "providerIdentity",
+            "_set_id": provider_id,
+            "providerId": provider_id,
+        }
+
+    return authorization_utils.AuthenticatedIdentities(
+        patient_identity=None,
+        provider_identity=provider_identity,
+    )
+
+
+def test_verified_token_cache_get_put():
+    """
+    A cached token should resolve to its identities, bounded by size and by expiration.
+    """
+
+    cache = authorization_utils.VerifiedTokenCache(max_size=2, max_age=3600)
+    try:
+        assert cache.get(token="token1") is None
+
+        cache.put(
+            token="token1",
+            claims=_claims(sub="sub1"),
+            identities=_identities(provider_id="provider1"),
+            generation=cache.generation,
+        )
+        assert cache.get(token="token1") == _identities(provider_id="provider1")
+
+        # An expired token is not retained
+        cache.put(
+            token="token2",
+            claims=_claims(sub="sub2", exp_in=-1),
+            identities=_identities(),
+            generation=cache.generation,
+        )
+        assert cache.get(token="token2") is None
+
+        # The least recently used token is evicted
+        cache.put(
+            token="token2",
+            claims=_claims(sub="sub2"),
+            identities=_identities(),
+            generation=cache.generation,
+        )
+        assert cache.get(token="token1") is not None
+        cache.put(
+            token="token3",
+            claims=_claims(sub="sub3"),
+            identities=_identities(),
+            generation=cache.generation,
+        )
+        assert cache.get(token="token1") is not None
+        assert cache.get(token="token2") is None
+        assert cache.get(token="token3") is not None
+    finally:
+        scope.database.identity_events.unregister_identity_write_callback(
+            cache.invalidate_identity
+        )
+
+
+def test_verified_token_cache_max_age():
+    """
+    A token should not be retained beyond the maximum age, even if it expires later.
+    """
+
+    cache = authorization_utils.VerifiedTokenCache(max_size=2, max_age=0)
+    try:
+        cache.put(
+            token="token1",
+            claims=_claims(sub="sub1"),
+            identities=_identities(),
+            generation=cache.generation,
+        )
+        assert cache.get(token="token1") is None
+    finally:
+        scope.database.identity_events.unregister_identity_write_callback(
+            cache.invalidate_identity
+        )
+
+
+def test_verified_token_cache_identity_write():
+    """
+    An identity write should invalidate tokens that resolved to that identity,
+    and tokens for the Cognito account now associated with that identity.
+    """
+
+    cache = authorization_utils.VerifiedTokenCache(max_size=10, max_age=3600)
+    try:
+        cache.put(
+            token="token1",
+            claims=_claims(sub="sub1"),
+            identities=_identities(provider_id="provider1"),
+            generation=cache.generation,
+        )
+        cache.put(
+            token="token2",
+            claims=_claims(sub="sub2"),
+            identities=_identities(),
+            generation=cache.generation,
+        )
+        cache.put(
+            token="token3",
+            claims=_claims(sub="sub3"),
+            identities=_identities(provider_id="provider3"),
+            generation=cache.generation,
+        )
+
+        # Account "sub2" is associated with "provider1"
+        generation = cache.generation
+        scope.database.identity_events.notify_identity_write(
+            identity={
+                "_type": "providerIdentity",
+                "_set_id": "provider1",
+                "cognitoAccount": {"cognitoId": "sub2", "email": "email"},
+            }
+        )
+
+        assert cache.get(token="token1") is None
+        assert cache.get(token="token2") is None
+        assert cache.get(token="token3") is not None
+
+        # Identities resolved before the write are not cached
+        cache.put(
+            token="token1",
+            claims=_claims(sub="sub1"),
+            identities=_identities(provider_id="provider1"),
+            generation=generation,
+        )
+        assert cache.get(token="token1") is None
+    finally:
+        scope.database.identity_events.unregister_identity_write_callback(
+            cache.invalidate_identity
+        )
@@ -0,0 +1,10 @@
+import pytest
+
+import tests.testing_config
+
+TESTING_CONFIGS = tests.testing_config.DEVELOPMENT_TESTING_CONFIGS
+
+from scope.testing.test_benchmarks import *
+
+# Benchmarks are slow and only print measurements, so are deselected by default
+pytestmark = pytest.mark.benchmark